@@ -0,0 +1,150 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+package v1alpha1
+
+import (
+	ackv1alpha1 "github.com/aws-controllers-k8s/runtime/apis/core/v1alpha1"
+	metav1 "k8s.io/apimachinery/pkg/apis/meta/v1"
+)
+
+// JobRunSetSpec defines the desired state of JobRunSet.
+//
+// A JobRunSet starts one job run per member. Every member shares the job run
+// described by Template and differs from the others only in its parameters,
+// given either as an explicit list of Members or as a numeric Range.
+// +kubebuilder:validation:XValidation:rule="has(self.members) != has(self.range)",message="Exactly one of members and range must be set"
+type JobRunSetSpec struct {
+
+	// The maximum number of StartJobRun calls the controller makes concurrently
+	// for the set. Defaults to 10.
+	// +kubebuilder:validation:Minimum=1
+	MaxConcurrentSubmissions *int64 `json:"maxConcurrentSubmissions,omitempty"`
+	// The parameters of each member, one entry per member.
+	// +kubebuilder:validation:XValidation:rule="self == oldSelf",message="Value is immutable once set"
+	Members []*JobRunSetMember `json:"members,omitempty"`
+	// Generates one member per value of the range. Every occurrence of
+	// `$(value)` in the template's entry point arguments and Spark submit
+	// parameters is replaced by the member's value.
+	// +kubebuilder:validation:XValidation:rule="self == oldSelf",message="Value is immutable once set"
+	Range *JobRunSetRange `json:"range,omitempty"`
+	// The job run shared by every member of the set.
+	// +kubebuilder:validation:Required
+	// +kubebuilder:validation:XValidation:rule="self == oldSelf",message="Value is immutable once set"
+	Template *JobRunTemplate `json:"template"`
+}
+
+// JobRunTemplate is the part of a job run shared by every member of a
+// JobRunSet.
+type JobRunTemplate struct {
+	ConfigurationOverrides *string `json:"configurationOverrides,omitempty"`
+	// The execution role ARN for the job runs.
+	ExecutionRoleARN *string `json:"executionRoleARN,omitempty"`
+	// The job driver for the job runs.
+	JobDriver *JobDriver `json:"jobDriver,omitempty"`
+	// The prefix of the job run names. Members are named `<name>-<index>`.
+	// Defaults to the name of the JobRunSet.
+	Name *string `json:"name,omitempty"`
+	// The Amazon EMR release version to use for the job runs.
+	ReleaseLabel *string `json:"releaseLabel,omitempty"`
+	// The tags assigned to the job runs.
+	Tags map[string]*string `json:"tags,omitempty"`
+	// The virtual cluster ID for which the job runs are submitted.
+	VirtualClusterID *string `json:"virtualClusterID,omitempty"`
+}
+
+// JobRunSetMember holds the parameters of a single member of a JobRunSet.
+type JobRunSetMember struct {
+	// Replaces the entry point arguments of the template.
+	EntryPointArguments []*string `json:"entryPointArguments,omitempty"`
+	// Appended to the Spark submit parameters of the template.
+	SparkSubmitParameters *string `json:"sparkSubmitParameters,omitempty"`
+}
+
+// JobRunSetMemberError records why a member of a JobRunSet could not be
+// started.
+type JobRunSetMemberError struct {
+	// The index of the member.
+	Index int64 `json:"index"`
+	// The error returned by StartJobRun.
+	Message *string `json:"message,omitempty"`
+}
+
+// JobRunSetRange generates the members of a JobRunSet from a range of
+// integers.
+type JobRunSetRange struct {
+	// The first value of the range.
+	From int64 `json:"from"`
+	// The last value of the range, inclusive.
+	To int64 `json:"to"`
+	// The difference between two consecutive values. Defaults to 1.
+	// +kubebuilder:validation:Minimum=1
+	Step *int64 `json:"step,omitempty"`
+}
+
+// JobRunSetStatus defines the observed state of JobRunSet
+type JobRunSetStatus struct {
+	// All CRs managed by ACK have a common `Status.ACKResourceMetadata` member
+	// that is used to contain resource sync state, account ownership,
+	// constructed ARN for the resource
+	// +kubebuilder:validation:Optional
+	ACKResourceMetadata *ackv1alpha1.ResourceMetadata `json:"ackResourceMetadata"`
+	// All CRs managed by ACK have a common `Status.Conditions` member that
+	// contains a collection of `ackv1alpha1.Condition` objects that describe
+	// the various terminal states of the CR and its backend AWS service API
+	// resource
+	// +kubebuilder:validation:Optional
+	Conditions []*ackv1alpha1.Condition `json:"conditions"`
+	// The job run ID of each member, by member index. Members that have not
+	// been started yet have an empty ID.
+	// +kubebuilder:validation:Optional
+	JobRunIDs []string `json:"jobRunIDs,omitempty"`
+	// The state of each member, by member index, one character per member:
+	// `-` not started, `E` could not be started (see StartErrors), `P` PENDING,
+	// `S` SUBMITTED, `R` RUNNING, `c` CANCEL_PENDING, `X` CANCELLED, `F`
+	// FAILED, `C` COMPLETED.
+	// +kubebuilder:validation:Optional
+	MemberStates *string `json:"memberStates,omitempty"`
+	// The members that StartJobRun rejected with a terminal error. They are
+	// not started again; the other members of the set are unaffected.
+	// +kubebuilder:validation:Optional
+	StartErrors []*JobRunSetMemberError `json:"startErrors,omitempty"`
+	// The number of members in each job run state.
+	// +kubebuilder:validation:Optional
+	StateCounts map[string]*int64 `json:"stateCounts,omitempty"`
+}
+
+// JobRunSet is the Schema for the JobRunSets API
+// +kubebuilder:object:root=true
+// +kubebuilder:subresource:status
+// +kubebuilder:printcolumn:name="RUNNING",type=integer,priority=0,JSONPath=`.status.stateCounts.RUNNING`
+// +kubebuilder:printcolumn:name="COMPLETED",type=integer,priority=0,JSONPath=`.status.stateCounts.COMPLETED`
+// +kubebuilder:printcolumn:name="FAILED",type=integer,priority=0,JSONPath=`.status.stateCounts.FAILED`
+type JobRunSet struct {
+	metav1.TypeMeta   `json:",inline"`
+	metav1.ObjectMeta `json:"metadata,omitempty"`
+	Spec              JobRunSetSpec   `json:"spec,omitempty"`
+	Status            JobRunSetStatus `json:"status,omitempty"`
+}
+
+// JobRunSetList contains a list of JobRunSet
+// +kubebuilder:object:root=true
+type JobRunSetList struct {
+	metav1.TypeMeta `json:",inline"`
+	metav1.ListMeta `json:"metadata,omitempty"`
+	Items           []JobRunSet `json:"items"`
+}
+
+func init() {
+	SchemeBuilder.Register(&JobRunSet{}, &JobRunSetList{})
+}
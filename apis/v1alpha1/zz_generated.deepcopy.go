@@ -288,6 +288,245 @@ func (in *JobRunList) DeepCopyObject() runtime.Object {
 	return nil
 }
 
+// DeepCopyInto is an autogenerated deepcopy function, copying the receiver, writing into out. in must be non-nil.
+func (in *JobRunSet) DeepCopyInto(out *JobRunSet) {
+	*out = *in
+	out.TypeMeta = in.TypeMeta
+	in.ObjectMeta.DeepCopyInto(&out.ObjectMeta)
+	in.Spec.DeepCopyInto(&out.Spec)
+	in.Status.DeepCopyInto(&out.Status)
+}
+
+// DeepCopy is an autogenerated deepcopy function, copying the receiver, creating a new JobRunSet.
+func (in *JobRunSet) DeepCopy() *JobRunSet {
+	if in == nil {
+		return nil
+	}
+	out := new(JobRunSet)
+	in.DeepCopyInto(out)
+	return out
+}
+
+// DeepCopyObject is an autogenerated deepcopy function, copying the receiver, creating a new runtime.Object.
+func (in *JobRunSet) DeepCopyObject() runtime.Object {
+	if c := in.DeepCopy(); c != nil {
+		return c
+	}
+	return nil
+}
+
+// DeepCopyInto is an autogenerated deepcopy function, copying the receiver, writing into out. in must be non-nil.
+func (in *JobRunSetList) DeepCopyInto(out *JobRunSetList) {
+	*out = *in
+	out.TypeMeta = in.TypeMeta
+	in.ListMeta.DeepCopyInto(&out.ListMeta)
+	if in.Items != nil {
+		in, out := &in.Items, &out.Items
+		*out = make([]JobRunSet, len(*in))
+		for i := range *in {
+			(*in)[i].DeepCopyInto(&(*out)[i])
+		}
+	}
+}
+
+// DeepCopy is an autogenerated deepcopy function, copying the receiver, creating a new JobRunSetList.
+func (in *JobRunSetList) DeepCopy() *JobRunSetList {
+	if in == nil {
+		return nil
+	}
+	out := new(JobRunSetList)
+	in.DeepCopyInto(out)
+	return out
+}
+
+// DeepCopyObject is an autogenerated deepcopy function, copying the receiver, creating a new runtime.Object.
+func (in *JobRunSetList) DeepCopyObject() runtime.Object {
+	if c := in.DeepCopy(); c != nil {
+		return c
+	}
+	return nil
+}
+
+// DeepCopyInto is an autogenerated deepcopy function, copying the receiver, writing into out. in must be non-nil.
+func (in *JobRunSetMember) DeepCopyInto(out *JobRunSetMember) {
+	*out = *in
+	if in.EntryPointArguments != nil {
+		in, out := &in.EntryPointArguments, &out.EntryPointArguments
+		*out = make([]*string, len(*in))
+		for i := range *in {
+			if (*in)[i] != nil {
+				in, out := &(*in)[i], &(*out)[i]
+				*out = new(string)
+				**out = **in
+			}
+		}
+	}
+	if in.SparkSubmitParameters != nil {
+		in, out := &in.SparkSubmitParameters, &out.SparkSubmitParameters
+		*out = new(string)
+		**out = **in
+	}
+}
+
+// DeepCopy is an autogenerated deepcopy function, copying the receiver, creating a new JobRunSetMember.
+func (in *JobRunSetMember) DeepCopy() *JobRunSetMember {
+	if in == nil {
+		return nil
+	}
+	out := new(JobRunSetMember)
+	in.DeepCopyInto(out)
+	return out
+}
+
+// DeepCopyInto is an autogenerated deepcopy function, copying the receiver, writing into out. in must be non-nil.
+func (in *JobRunSetMemberError) DeepCopyInto(out *JobRunSetMemberError) {
+	*out = *in
+	if in.Message != nil {
+		in, out := &in.Message, &out.Message
+		*out = new(string)
+		**out = **in
+	}
+}
+
+// DeepCopy is an autogenerated deepcopy function, copying the receiver, creating a new JobRunSetMemberError.
+func (in *JobRunSetMemberError) DeepCopy() *JobRunSetMemberError {
+	if in == nil {
+		return nil
+	}
+	out := new(JobRunSetMemberError)
+	in.DeepCopyInto(out)
+	return out
+}
+
+// DeepCopyInto is an autogenerated deepcopy function, copying the receiver, writing into out. in must be non-nil.
+func (in *JobRunSetRange) DeepCopyInto(out *JobRunSetRange) {
+	*out = *in
+	if in.Step != nil {
+		in, out := &in.Step, &out.Step
+		*out = new(int64)
+		**out = **in
+	}
+}
+
+// DeepCopy is an autogenerated deepcopy function, copying the receiver, creating a new JobRunSetRange.
+func (in *JobRunSetRange) DeepCopy() *JobRunSetRange {
+	if in == nil {
+		return nil
+	}
+	out := new(JobRunSetRange)
+	in.DeepCopyInto(out)
+	return out
+}
+
+// DeepCopyInto is an autogenerated deepcopy function, copying the receiver, writing into out. in must be non-nil.
+func (in *JobRunSetSpec) DeepCopyInto(out *JobRunSetSpec) {
+	*out = *in
+	if in.MaxConcurrentSubmissions != nil {
+		in, out := &in.MaxConcurrentSubmissions, &out.MaxConcurrentSubmissions
+		*out = new(int64)
+		**out = **in
+	}
+	if in.Members != nil {
+		in, out := &in.Members, &out.Members
+		*out = make([]*JobRunSetMember, len(*in))
+		for i := range *in {
+			if (*in)[i] != nil {
+				in, out := &(*in)[i], &(*out)[i]
+				*out = new(JobRunSetMember)
+				(*in).DeepCopyInto(*out)
+			}
+		}
+	}
+	if in.Range != nil {
+		in, out := &in.Range, &out.Range
+		*out = new(JobRunSetRange)
+		(*in).DeepCopyInto(*out)
+	}
+	if in.Template != nil {
+		in, out := &in.Template, &out.Template
+		*out = new(JobRunTemplate)
+		(*in).DeepCopyInto(*out)
+	}
+}
+
+// DeepCopy is an autogenerated deepcopy function, copying the receiver, creating a new JobRunSetSpec.
+func (in *JobRunSetSpec) DeepCopy() *JobRunSetSpec {
+	if in == nil {
+		return nil
+	}
+	out := new(JobRunSetSpec)
+	in.DeepCopyInto(out)
+	return out
+}
+
+// DeepCopyInto is an autogenerated deepcopy function, copying the receiver, writing into out. in must be non-nil.
+func (in *JobRunSetStatus) DeepCopyInto(out *JobRunSetStatus) {
+	*out = *in
+	if in.ACKResourceMetadata != nil {
+		in, out := &in.ACKResourceMetadata, &out.ACKResourceMetadata
+		*out = new(corev1alpha1.ResourceMetadata)
+		(*in).DeepCopyInto(*out)
+	}
+	if in.Conditions != nil {
+		in, out := &in.Conditions, &out.Conditions
+		*out = make([]*corev1alpha1.Condition, len(*in))
+		for i := range *in {
+			if (*in)[i] != nil {
+				in, out := &(*in)[i], &(*out)[i]
+				*out = new(corev1alpha1.Condition)
+				(*in).DeepCopyInto(*out)
+			}
+		}
+	}
+	if in.JobRunIDs != nil {
+		in, out := &in.JobRunIDs, &out.JobRunIDs
+		*out = make([]string, len(*in))
+		copy(*out, *in)
+	}
+	if in.MemberStates != nil {
+		in, out := &in.MemberStates, &out.MemberStates
+		*out = new(string)
+		**out = **in
+	}
+	if in.StartErrors != nil {
+		in, out := &in.StartErrors, &out.StartErrors
+		*out = make([]*JobRunSetMemberError, len(*in))
+		for i := range *in {
+			if (*in)[i] != nil {
+				in, out := &(*in)[i], &(*out)[i]
+				*out = new(JobRunSetMemberError)
+				(*in).DeepCopyInto(*out)
+			}
+		}
+	}
+	if in.StateCounts != nil {
+		in, out := &in.StateCounts, &out.StateCounts
+		*out = make(map[string]*int64, len(*in))
+		for key, val := range *in {
+			var outVal *int64
+			if val == nil {
+				(*out)[key] = nil
+			} else {
+				inVal := (*in)[key]
+				in, out := &inVal, &outVal
+				*out = new(int64)
+				**out = **in
+			}
+			(*out)[key] = outVal
+		}
+	}
+}
+
+// DeepCopy is an autogenerated deepcopy function, copying the receiver, creating a new JobRunSetStatus.
+func (in *JobRunSetStatus) DeepCopy() *JobRunSetStatus {
+	if in == nil {
+		return nil
+	}
+	out := new(JobRunSetStatus)
+	in.DeepCopyInto(out)
+	return out
+}
+
 // DeepCopyInto is an autogenerated deepcopy function, copying the receiver, writing into out. in must be non-nil.
 func (in *JobRunSpec) DeepCopyInto(out *JobRunSpec) {
 	*out = *in
@@ -400,6 +639,67 @@ func (in *JobRunStatus) DeepCopy() *JobRunStatus {
 	return out
 }
 
+// DeepCopyInto is an autogenerated deepcopy function, copying the receiver, writing into out. in must be non-nil.
+func (in *JobRunTemplate) DeepCopyInto(out *JobRunTemplate) {
+	*out = *in
+	if in.ConfigurationOverrides != nil {
+		in, out := &in.ConfigurationOverrides, &out.ConfigurationOverrides
+		*out = new(string)
+		**out = **in
+	}
+	if in.ExecutionRoleARN != nil {
+		in, out := &in.ExecutionRoleARN, &out.ExecutionRoleARN
+		*out = new(string)
+		**out = **in
+	}
+	if in.JobDriver != nil {
+		in, out := &in.JobDriver, &out.JobDriver
+		*out = new(JobDriver)
+		(*in).DeepCopyInto(*out)
+	}
+	if in.Name != nil {
+		in, out := &in.Name, &out.Name
+		*out = new(string)
+		**out = **in
+	}
+	if in.ReleaseLabel != nil {
+		in, out := &in.ReleaseLabel, &out.ReleaseLabel
+		*out = new(string)
+		**out = **in
+	}
+	if in.Tags != nil {
+		in, out := &in.Tags, &out.Tags
+		*out = make(map[string]*string, len(*in))
+		for key, val := range *in {
+			var outVal *string
+			if val == nil {
+				(*out)[key] = nil
+			} else {
+				inVal := (*in)[key]
+				in, out := &inVal, &outVal
+				*out = new(string)
+				**out = **in
+			}
+			(*out)[key] = outVal
+		}
+	}
+	if in.VirtualClusterID != nil {
+		in, out := &in.VirtualClusterID, &out.VirtualClusterID
+		*out = new(string)
+		**out = **in
+	}
+}
+
+// DeepCopy is an autogenerated deepcopy function, copying the receiver, creating a new JobRunTemplate.
+func (in *JobRunTemplate) DeepCopy() *JobRunTemplate {
+	if in == nil {
+		return nil
+	}
+	out := new(JobRunTemplate)
+	in.DeepCopyInto(out)
+	return out
+}
+
 // DeepCopyInto is an autogenerated deepcopy function, copying the receiver, writing into out. in must be non-nil.
 func (in *JobRun_SDK) DeepCopyInto(out *JobRun_SDK) {
 	*out = *in
@@ -41,6 +41,7 @@ import (
 	svcresource "github.com/aws-controllers-k8s/emrcontainers-controller/pkg/resource"
 
 	_ "github.com/aws-controllers-k8s/emrcontainers-controller/pkg/resource/job_run"
+	_ "github.com/aws-controllers-k8s/emrcontainers-controller/pkg/resource/job_run_set"
 	_ "github.com/aws-controllers-k8s/emrcontainers-controller/pkg/resource/virtual_cluster"
 
 	"github.com/aws-controllers-k8s/emrcontainers-controller/pkg/version"
@@ -64,6 +65,8 @@ func init() {
 func main() {
 	var ackCfg ackcfg.Config
 	ackCfg.BindFlags()
+	var shardCfg shardConfig
+	shardCfg.BindFlags()
 	flag.Parse()
 	ackCfg.SetupLogger()
 
@@ -127,7 +130,7 @@ func main() {
 		},
 		Metrics:                 metricsserver.Options{BindAddress: ackCfg.MetricsAddr},
 		LeaderElection:          ackCfg.EnableLeaderElection,
-		LeaderElectionID:        "ack-" + awsServiceAPIGroup,
+		LeaderElectionID:        shardCfg.LeaderElectionID("ack-" + awsServiceAPIGroup),
 		LeaderElectionNamespace: ackCfg.LeaderElectionNamespace,
 		HealthProbeBindAddress:  ackCfg.HealthzAddr,
 		LivenessEndpointName:    "/healthz",
@@ -0,0 +1,48 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+package main
+
+import (
+	flag "github.com/spf13/pflag"
+)
+
+const flagShardName = "shard-name"
+
+// shardConfig identifies this controller instance when the controller is
+// deployed as several shards, each watching its own namespaces or label
+// selectors. Every shard elects its leader independently, so that the
+// replicas of one shard do not compete with the other shards for a single
+// lease.
+type shardConfig struct {
+	ShardName string
+}
+
+// BindFlags defines the shard flags, next to the ones of ackcfg.Config.BindFlags.
+func (cfg *shardConfig) BindFlags() {
+	flag.StringVar(
+		&cfg.ShardName, flagShardName,
+		"",
+		"Name of the controller shard. Shards elect their leader independently; "+
+			"leave empty when running a single controller.",
+	)
+}
+
+// LeaderElectionID returns the name of the shard's leader election lease,
+// given the name used by an unsharded controller.
+func (cfg *shardConfig) LeaderElectionID(id string) string {
+	if cfg.ShardName != "" {
+		id += "-" + cfg.ShardName
+	}
+	return id
+}
@@ -0,0 +1,78 @@
+{{/* Whether the controller is deployed as several shards */}}
+{{- define "ack-emrcontainers-controller.sharded" -}}
+{{- if gt (int .Values.sharding.shards) 1 -}}
+true
+{{- end -}}
+{{- end -}}
+
+{{/*
+The name of a shard's Deployment. Like the shard helpers below, it takes a dict
+with the root context as "root" and the shard number as "shard".
+*/}}
+{{- define "ack-emrcontainers-controller.shard.fullname" -}}
+{{- $fullname := include "ack-emrcontainers-controller.app.fullname" .root -}}
+{{- if include "ack-emrcontainers-controller.sharded" .root -}}
+{{- printf "%s-shard-%d" ($fullname | trunc 55 | trimSuffix "-") (int .shard) -}}
+{{- else -}}
+{{- $fullname -}}
+{{- end -}}
+{{- end -}}
+
+{{/*
+The namespaces split between shards in namespace mode: sharding.namespaces, or
+the watched namespaces when it is empty.
+*/}}
+{{- define "ack-emrcontainers-controller.sharding.namespaces" -}}
+{{- if .Values.sharding.namespaces -}}
+{{ join "," .Values.sharding.namespaces }}
+{{- else -}}
+{{ include "ack-emrcontainers-controller.watch-namespace" . }}
+{{- end -}}
+{{- end -}}
+
+{{/* The namespaces watched by a shard */}}
+{{- define "ack-emrcontainers-controller.shard.watch-namespace" -}}
+{{- $root := .root -}}
+{{- $shards := int $root.Values.sharding.shards -}}
+{{- if and (gt $shards 1) (eq $root.Values.sharding.mode "namespace") -}}
+{{- $namespaces := include "ack-emrcontainers-controller.sharding.namespaces" $root | splitList "," | compact -}}
+{{- if lt (len $namespaces) $shards -}}
+{{- fail (printf "sharding.namespaces must list at least %d namespaces to run %d shards" $shards $shards) -}}
+{{- end -}}
+{{- $watched := list -}}
+{{- range $i, $namespace := $namespaces -}}
+{{- if eq (int (mod $i $shards)) (int $.shard) -}}
+{{- $watched = append $watched $namespace -}}
+{{- end -}}
+{{- end -}}
+{{ join "," $watched }}
+{{- else -}}
+{{ include "ack-emrcontainers-controller.watch-namespace" $root }}
+{{- end -}}
+{{- end -}}
+
+{{/* The label selectors of a shard */}}
+{{- define "ack-emrcontainers-controller.shard.watch-selectors" -}}
+{{- $root := .root -}}
+{{- $shards := int $root.Values.sharding.shards -}}
+{{- if and (gt $shards 1) (eq $root.Values.sharding.mode "label") -}}
+{{- $buckets := int $root.Values.sharding.buckets -}}
+{{- if lt $buckets $shards -}}
+{{- fail (printf "sharding.buckets must be at least %d to run %d shards" $shards $shards) -}}
+{{- end -}}
+{{- $watched := list -}}
+{{- range $bucket := until $buckets -}}
+{{- if eq (int (mod $bucket $shards)) (int $.shard) -}}
+{{- $watched = append $watched (toString $bucket) -}}
+{{- end -}}
+{{- end -}}
+{{- $selector := printf "%s in (%s)" $root.Values.sharding.label (join "," $watched) -}}
+{{- if $root.Values.watchSelectors -}}
+{{ $root.Values.watchSelectors }},{{ $selector }}
+{{- else -}}
+{{ $selector }}
+{{- end -}}
+{{- else -}}
+{{ $root.Values.watchSelectors }}
+{{- end -}}
+{{- end -}}
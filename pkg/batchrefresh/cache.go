@@ -0,0 +1,208 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+// Package batchrefresh provides a short-lived cache that lets the resource
+// managers refresh many resources with one List call instead of one Describe
+// call per resource.
+//
+// Batched refresh is disabled unless ACK_EMRCONTAINERS_BATCH_REFRESH_TTL_SECONDS
+// is set to a positive value. When enabled, the first ReadOne for a resource in
+// a group (e.g. all JobRuns of one virtual cluster) lists the whole group and
+// caches the result for the TTL; subsequent ReadOnes in that window are served
+// from the cache. Resources missing from the listing fall back to Describe.
+// The resource managers invalidate a group after calls that change it, such as
+// starting or cancelling a JobRun, and groups are dropped once they expire.
+package batchrefresh
+
+import (
+	"context"
+	"os"
+	"strconv"
+	"strings"
+	"sync"
+	"time"
+)
+
+const (
+	// EnvTTLSeconds is the environment variable holding the cache TTL, in
+	// seconds. Zero or unset disables batched refresh.
+	EnvTTLSeconds = "ACK_EMRCONTAINERS_BATCH_REFRESH_TTL_SECONDS"
+	// EnvWindowHours is the environment variable holding how far back, in
+	// hours, JobRun listings reach (the ListJobRuns createdAfter filter).
+	EnvWindowHours = "ACK_EMRCONTAINERS_BATCH_REFRESH_WINDOW_HOURS"
+	// EnvJobRunStates is the environment variable holding a comma-separated
+	// list of JobRun states to list. Empty lists every state.
+	EnvJobRunStates = "ACK_EMRCONTAINERS_BATCH_REFRESH_JOB_RUN_STATES"
+
+	defaultWindow = 24 * time.Hour
+)
+
+// Config is the batched refresh configuration.
+type Config struct {
+	// TTL is how long a listing is served from the cache.
+	TTL time.Duration
+	// Window bounds JobRun listings to runs created within it.
+	Window time.Duration
+	// JobRunStates, if not empty, restricts JobRun listings to these states.
+	JobRunStates []string
+}
+
+// Enabled returns whether batched refresh is turned on.
+func (c Config) Enabled() bool {
+	return c.TTL > 0
+}
+
+var (
+	configOnce sync.Once
+	config     Config
+)
+
+// ConfigFromEnv returns the configuration read from the environment. The
+// environment is only read once.
+func ConfigFromEnv() Config {
+	configOnce.Do(func() {
+		config = ParseConfig(os.Getenv)
+	})
+	return config
+}
+
+// ParseConfig builds a Config from the supplied environment lookup function.
+// Invalid values leave the corresponding setting at its default.
+func ParseConfig(getenv func(string) string) Config {
+	cfg := Config{Window: defaultWindow}
+	if ttl, err := strconv.Atoi(getenv(EnvTTLSeconds)); err == nil && ttl > 0 {
+		cfg.TTL = time.Duration(ttl) * time.Second
+	}
+	if window, err := strconv.Atoi(getenv(EnvWindowHours)); err == nil && window > 0 {
+		cfg.Window = time.Duration(window) * time.Hour
+	}
+	for _, state := range strings.Split(getenv(EnvJobRunStates), ",") {
+		if state = strings.TrimSpace(state); state != "" {
+			cfg.JobRunStates = append(cfg.JobRunStates, strings.ToUpper(state))
+		}
+	}
+	return cfg
+}
+
+// ListFunc lists every item of a group, keyed by item identifier.
+type ListFunc[T any] func(ctx context.Context) (map[string]T, error)
+
+// Cache holds the most recent listing of each group for a TTL.
+type Cache[T any] struct {
+	ttl time.Duration
+	now func() time.Time
+
+	mu     sync.Mutex
+	groups map[string]*group[T]
+	// sweptAt is when expired groups were last dropped from groups.
+	sweptAt time.Time
+}
+
+type group[T any] struct {
+	// mu is held while the group is being refreshed, so that concurrent
+	// lookups wait for a single List call instead of issuing their own.
+	mu          sync.Mutex
+	refreshedAt time.Time
+	items       map[string]T
+}
+
+// NewCache returns an empty cache whose listings expire after ttl.
+func NewCache[T any](ttl time.Duration) *Cache[T] {
+	return &Cache[T]{
+		ttl:    ttl,
+		now:    time.Now,
+		groups: map[string]*group[T]{},
+	}
+}
+
+func (c *Cache[T]) group(key string) *group[T] {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	if now := c.now(); now.Sub(c.sweptAt) >= c.ttl {
+		c.dropExpired(now)
+		c.sweptAt = now
+	}
+	g, ok := c.groups[key]
+	if !ok {
+		g = &group[T]{}
+		c.groups[key] = g
+	}
+	return g
+}
+
+// dropExpired removes the groups whose listing is older than the TTL, so that
+// groups that are no longer looked up (e.g. of deleted virtual clusters) do not
+// stay in memory. Groups being refreshed are left alone. Must be called with
+// c.mu held.
+func (c *Cache[T]) dropExpired(now time.Time) {
+	for key, g := range c.groups {
+		if !g.mu.TryLock() {
+			continue
+		}
+		if g.items == nil || now.Sub(g.refreshedAt) >= c.ttl {
+			delete(c.groups, key)
+		}
+		g.mu.Unlock()
+	}
+}
+
+// Lookup returns the item itemKey from the listing of group groupKey,
+// refreshing the listing with list if it is older than the TTL. found is false
+// when the item is not in the listing. If list fails, the error is returned
+// and the stale listing is dropped.
+func (c *Cache[T]) Lookup(
+	ctx context.Context,
+	groupKey string,
+	itemKey string,
+	list ListFunc[T],
+) (item T, found bool, err error) {
+	g := c.group(groupKey)
+	g.mu.Lock()
+	defer g.mu.Unlock()
+
+	if g.items == nil || c.now().Sub(g.refreshedAt) >= c.ttl {
+		items, err := list(ctx)
+		if err != nil {
+			g.items = nil
+			return item, false, err
+		}
+		g.items = items
+		g.refreshedAt = c.now()
+	}
+	item, found = g.items[itemKey]
+	return item, found, nil
+}
+
+// Invalidate drops the listing of group groupKey, so that the next Lookup
+// lists it again. A refresh already in progress for the group does not
+// repopulate it.
+func (c *Cache[T]) Invalidate(groupKey string) {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	delete(c.groups, groupKey)
+}
+
+// Caches holds one Cache per key, typically per AWS SDK client, so that
+// resource managers for different accounts and regions do not share listings.
+type Caches[T any] struct {
+	caches sync.Map
+}
+
+// For returns the cache for key, creating it with the given TTL if needed.
+func (c *Caches[T]) For(key any, ttl time.Duration) *Cache[T] {
+	if cache, ok := c.caches.Load(key); ok {
+		return cache.(*Cache[T])
+	}
+	cache, _ := c.caches.LoadOrStore(key, NewCache[T](ttl))
+	return cache.(*Cache[T])
+}
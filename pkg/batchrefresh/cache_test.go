@@ -0,0 +1,229 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+package batchrefresh
+
+import (
+	"context"
+	"errors"
+	"sync"
+	"sync/atomic"
+	"testing"
+	"time"
+
+	"github.com/stretchr/testify/assert"
+)
+
+func TestParseConfig(t *testing.T) {
+	tests := []struct {
+		name     string
+		env      map[string]string
+		expected Config
+	}{
+		{
+			name:     "unset disables batched refresh",
+			env:      map[string]string{},
+			expected: Config{Window: defaultWindow},
+		},
+		{
+			name: "all settings",
+			env: map[string]string{
+				EnvTTLSeconds:   "15",
+				EnvWindowHours:  "6",
+				EnvJobRunStates: "pending, Running,,SUBMITTED",
+			},
+			expected: Config{
+				TTL:          15 * time.Second,
+				Window:       6 * time.Hour,
+				JobRunStates: []string{"PENDING", "RUNNING", "SUBMITTED"},
+			},
+		},
+		{
+			name: "invalid values are ignored",
+			env: map[string]string{
+				EnvTTLSeconds:  "-1",
+				EnvWindowHours: "soon",
+			},
+			expected: Config{Window: defaultWindow},
+		},
+	}
+
+	for _, tt := range tests {
+		t.Run(tt.name, func(t *testing.T) {
+			cfg := ParseConfig(func(key string) string { return tt.env[key] })
+			assert.Equal(t, tt.expected, cfg)
+			assert.Equal(t, tt.expected.TTL > 0, cfg.Enabled())
+		})
+	}
+}
+
+func TestCacheLookup_ServesFromListingUntilTTLExpires(t *testing.T) {
+	now := time.Unix(0, 0)
+	cache := NewCache[string](10 * time.Second)
+	cache.now = func() time.Time { return now }
+
+	calls := 0
+	list := func(ctx context.Context) (map[string]string, error) {
+		calls++
+		return map[string]string{"a": "RUNNING", "b": "PENDING"}, nil
+	}
+
+	item, found, err := cache.Lookup(context.Background(), "vc", "a", list)
+	assert.NoError(t, err)
+	assert.True(t, found)
+	assert.Equal(t, "RUNNING", item)
+
+	_, found, err = cache.Lookup(context.Background(), "vc", "b", list)
+	assert.NoError(t, err)
+	assert.True(t, found)
+
+	_, found, err = cache.Lookup(context.Background(), "vc", "missing", list)
+	assert.NoError(t, err)
+	assert.False(t, found)
+	assert.Equal(t, 1, calls)
+
+	now = now.Add(10 * time.Second)
+	_, _, err = cache.Lookup(context.Background(), "vc", "a", list)
+	assert.NoError(t, err)
+	assert.Equal(t, 2, calls)
+}
+
+func TestCacheLookup_GroupsAreIndependent(t *testing.T) {
+	cache := NewCache[string](time.Minute)
+	calls := map[string]int{}
+	listFor := func(group string) ListFunc[string] {
+		return func(ctx context.Context) (map[string]string, error) {
+			calls[group]++
+			return map[string]string{group: group}, nil
+		}
+	}
+
+	_, found, _ := cache.Lookup(context.Background(), "vc-1", "vc-1", listFor("vc-1"))
+	assert.True(t, found)
+	_, found, _ = cache.Lookup(context.Background(), "vc-2", "vc-1", listFor("vc-2"))
+	assert.False(t, found)
+	assert.Equal(t, map[string]int{"vc-1": 1, "vc-2": 1}, calls)
+}
+
+func TestCacheLookup_ErrorDropsListing(t *testing.T) {
+	cache := NewCache[string](time.Minute)
+	listErr := errors.New("ThrottlingException")
+
+	_, found, err := cache.Lookup(context.Background(), "vc", "a", func(ctx context.Context) (map[string]string, error) {
+		return nil, listErr
+	})
+	assert.ErrorIs(t, err, listErr)
+	assert.False(t, found)
+
+	calls := 0
+	_, found, err = cache.Lookup(context.Background(), "vc", "a", func(ctx context.Context) (map[string]string, error) {
+		calls++
+		return map[string]string{"a": "RUNNING"}, nil
+	})
+	assert.NoError(t, err)
+	assert.True(t, found)
+	assert.Equal(t, 1, calls)
+}
+
+func TestCacheLookup_ConcurrentLookupsShareOneList(t *testing.T) {
+	cache := NewCache[int](time.Minute)
+	var calls int32
+	list := func(ctx context.Context) (map[string]int, error) {
+		atomic.AddInt32(&calls, 1)
+		time.Sleep(10 * time.Millisecond)
+		return map[string]int{"a": 1}, nil
+	}
+
+	var wg sync.WaitGroup
+	for i := 0; i < 50; i++ {
+		wg.Add(1)
+		go func() {
+			defer wg.Done()
+			_, found, err := cache.Lookup(context.Background(), "vc", "a", list)
+			assert.NoError(t, err)
+			assert.True(t, found)
+		}()
+	}
+	wg.Wait()
+	assert.Equal(t, int32(1), atomic.LoadInt32(&calls))
+}
+
+func TestCacheInvalidate(t *testing.T) {
+	cache := NewCache[int](time.Minute)
+	calls := 0
+	list := func(ctx context.Context) (map[string]int, error) {
+		calls++
+		return map[string]int{"a": 1}, nil
+	}
+
+	cache.Lookup(context.Background(), "vc", "a", list)
+	cache.Invalidate("vc")
+	cache.Lookup(context.Background(), "vc", "a", list)
+	assert.Equal(t, 2, calls)
+}
+
+func TestCacheInvalidate_DuringRefresh(t *testing.T) {
+	cache := NewCache[string](time.Minute)
+	listing := make(chan struct{})
+	release := make(chan struct{})
+	done := make(chan struct{})
+	go func() {
+		defer close(done)
+		cache.Lookup(context.Background(), "vc", "a", func(ctx context.Context) (map[string]string, error) {
+			close(listing)
+			<-release
+			return map[string]string{}, nil
+		})
+	}()
+
+	// The JobRun is started while the listing is in flight
+	<-listing
+	cache.Invalidate("vc")
+	close(release)
+	<-done
+
+	_, found, err := cache.Lookup(context.Background(), "vc", "a", func(ctx context.Context) (map[string]string, error) {
+		return map[string]string{"a": "SUBMITTED"}, nil
+	})
+	assert.NoError(t, err)
+	assert.True(t, found)
+}
+
+func TestCacheLookup_DropsExpiredGroups(t *testing.T) {
+	now := time.Unix(0, 0)
+	cache := NewCache[int](10 * time.Second)
+	cache.now = func() time.Time { return now }
+	list := func(ctx context.Context) (map[string]int, error) {
+		return map[string]int{"a": 1}, nil
+	}
+
+	cache.Lookup(context.Background(), "vc-1", "a", list)
+	cache.Lookup(context.Background(), "vc-2", "a", list)
+	assert.Len(t, cache.groups, 2)
+
+	now = now.Add(5 * time.Second)
+	cache.Lookup(context.Background(), "vc-2", "a", list)
+	assert.Len(t, cache.groups, 2)
+
+	now = now.Add(10 * time.Second)
+	cache.Lookup(context.Background(), "vc-2", "a", list)
+	assert.Len(t, cache.groups, 1)
+	assert.Contains(t, cache.groups, "vc-2")
+}
+
+func TestCachesFor(t *testing.T) {
+	var caches Caches[int]
+	a := caches.For("client-a", time.Minute)
+	assert.Same(t, a, caches.For("client-a", time.Minute))
+	assert.NotSame(t, a, caches.For("client-b", time.Minute))
+}
@@ -0,0 +1,181 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+package job_run
+
+import (
+	"context"
+	"time"
+
+	ackv1alpha1 "github.com/aws-controllers-k8s/runtime/apis/core/v1alpha1"
+	ackrtlog "github.com/aws-controllers-k8s/runtime/pkg/runtime/log"
+	"github.com/aws/aws-sdk-go-v2/aws"
+	svcsdk "github.com/aws/aws-sdk-go-v2/service/emrcontainers"
+	svcsdktypes "github.com/aws/aws-sdk-go-v2/service/emrcontainers/types"
+
+	svcapitypes "github.com/aws-controllers-k8s/emrcontainers-controller/apis/v1alpha1"
+	"github.com/aws-controllers-k8s/emrcontainers-controller/pkg/batchrefresh"
+)
+
+// listJobRunsPageSize is the page size requested from ListJobRuns.
+const listJobRunsPageSize = 50
+
+var (
+	// jobRunCaches holds, per SDK client, the latest ListJobRuns result of
+	// each virtual cluster.
+	jobRunCaches batchrefresh.Caches[svcsdktypes.JobRun]
+	// batchRefreshConfig returns the batched refresh configuration. Replaced
+	// in tests.
+	batchRefreshConfig = batchrefresh.ConfigFromEnv
+)
+
+// readOneFromBatchCache returns the latest state of the JobRun from a
+// ListJobRuns listing of its virtual cluster, shared by every JobRun of that
+// virtual cluster for the configured TTL. It returns false when batched
+// refresh is disabled, the listing fails, or the JobRun is not in the listing,
+// in which case the caller falls back to DescribeJobRun.
+func (rm *resourceManager) readOneFromBatchCache(
+	ctx context.Context,
+	r *resource,
+) (*resource, bool) {
+	cfg := batchRefreshConfig()
+	if !cfg.Enabled() {
+		return nil, false
+	}
+	rlog := ackrtlog.FromContext(ctx)
+
+	virtualClusterID := *r.ko.Spec.VirtualClusterID
+	cache := jobRunCaches.For(rm.sdkapi, cfg.TTL)
+	jobRun, found, err := cache.Lookup(ctx, virtualClusterID, *r.ko.Status.ID,
+		func(ctx context.Context) (map[string]svcsdktypes.JobRun, error) {
+			return rm.listJobRuns(ctx, virtualClusterID, cfg)
+		},
+	)
+	if err != nil {
+		rlog.Debug("batched JobRun refresh failed, falling back to DescribeJobRun", "error", err)
+		return nil, false
+	}
+	if !found {
+		return nil, false
+	}
+	latest, err := rm.resourceFromJobRun(r, &jobRun)
+	if err != nil {
+		return nil, false
+	}
+	return latest, true
+}
+
+// invalidateBatchCache drops the cached listing of the virtual cluster after a
+// call that changes its JobRuns, so that the next ReadOne does not miss a
+// JobRun just started or report a cancelled one as still running.
+func (rm *resourceManager) invalidateBatchCache(virtualClusterID *string) {
+	cfg := batchRefreshConfig()
+	if !cfg.Enabled() || virtualClusterID == nil {
+		return
+	}
+	jobRunCaches.For(rm.sdkapi, cfg.TTL).Invalidate(*virtualClusterID)
+}
+
+// listJobRuns pages through ListJobRuns for the virtual cluster and returns
+// the JobRuns keyed by ID.
+func (rm *resourceManager) listJobRuns(
+	ctx context.Context,
+	virtualClusterID string,
+	cfg batchrefresh.Config,
+) (map[string]svcsdktypes.JobRun, error) {
+	input := &svcsdk.ListJobRunsInput{
+		VirtualClusterId: aws.String(virtualClusterID),
+		CreatedAfter:     aws.Time(time.Now().Add(-cfg.Window)),
+		MaxResults:       aws.Int32(listJobRunsPageSize),
+	}
+	for _, state := range cfg.JobRunStates {
+		input.States = append(input.States, svcsdktypes.JobRunState(state))
+	}
+
+	jobRuns := map[string]svcsdktypes.JobRun{}
+	for {
+		resp, err := rm.sdkapi.ListJobRuns(ctx, input)
+		rm.metrics.RecordAPICall("READ_MANY", "ListJobRuns", err)
+		if err != nil {
+			return nil, err
+		}
+		for _, jobRun := range resp.JobRuns {
+			if jobRun.Id != nil {
+				jobRuns[*jobRun.Id] = jobRun
+			}
+		}
+		if resp.NextToken == nil {
+			return jobRuns, nil
+		}
+		input.NextToken = resp.NextToken
+	}
+}
+
+// resourceFromJobRun merges a JobRun returned by ListJobRuns into a copy of
+// the supplied resource, setting the same fields sdkFind sets from
+// DescribeJobRun.
+func (rm *resourceManager) resourceFromJobRun(
+	r *resource,
+	jobRun *svcsdktypes.JobRun,
+) (*resource, error) {
+	var err error
+	ko := r.ko.DeepCopy()
+	if jobRun.ConfigurationOverrides != nil {
+		ko.Spec.ConfigurationOverrides, err = configurationOverridesToString(jobRun.ConfigurationOverrides)
+		if err != nil {
+			return nil, err
+		}
+	}
+
+	if ko.Status.ACKResourceMetadata == nil {
+		ko.Status.ACKResourceMetadata = &ackv1alpha1.ResourceMetadata{}
+	}
+	if jobRun.Arn != nil {
+		arn := ackv1alpha1.AWSResourceName(*jobRun.Arn)
+		ko.Status.ACKResourceMetadata.ARN = &arn
+	}
+	ko.Spec.ExecutionRoleARN = jobRun.ExecutionRoleArn
+	ko.Status.ID = jobRun.Id
+	if jobRun.JobDriver != nil {
+		jobDriver := &svcapitypes.JobDriver{}
+		if jobRun.JobDriver.SparkSubmitJobDriver != nil {
+			sparkSubmit := &svcapitypes.SparkSubmitJobDriver{
+				EntryPoint:            jobRun.JobDriver.SparkSubmitJobDriver.EntryPoint,
+				SparkSubmitParameters: jobRun.JobDriver.SparkSubmitJobDriver.SparkSubmitParameters,
+			}
+			if jobRun.JobDriver.SparkSubmitJobDriver.EntryPointArguments != nil {
+				sparkSubmit.EntryPointArguments = aws.StringSlice(jobRun.JobDriver.SparkSubmitJobDriver.EntryPointArguments)
+			}
+			jobDriver.SparkSubmitJobDriver = sparkSubmit
+		}
+		ko.Spec.JobDriver = jobDriver
+	} else {
+		ko.Spec.JobDriver = nil
+	}
+	ko.Spec.Name = jobRun.Name
+	ko.Spec.ReleaseLabel = jobRun.ReleaseLabel
+	if jobRun.State != "" {
+		ko.Status.State = aws.String(string(jobRun.State))
+	} else {
+		ko.Status.State = nil
+	}
+	if jobRun.Tags != nil {
+		ko.Spec.Tags = aws.StringMap(jobRun.Tags)
+	} else {
+		ko.Spec.Tags = nil
+	}
+	ko.Spec.VirtualClusterID = jobRun.VirtualClusterId
+
+	rm.setStatusDefaults(ko)
+	return &resource{ko}, nil
+}
@@ -0,0 +1,153 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+package job_run
+
+import (
+	"context"
+	"io"
+	"net/http"
+	"strings"
+	"testing"
+	"time"
+
+	"github.com/aws/aws-sdk-go-v2/aws"
+	svcsdk "github.com/aws/aws-sdk-go-v2/service/emrcontainers"
+	"github.com/stretchr/testify/assert"
+	"github.com/stretchr/testify/mock"
+
+	svcapitypes "github.com/aws-controllers-k8s/emrcontainers-controller/apis/v1alpha1"
+	"github.com/aws-controllers-k8s/emrcontainers-controller/pkg/batchrefresh"
+	"github.com/aws-controllers-k8s/runtime/pkg/metrics"
+)
+
+func newBatchRefreshJobRun(id string) *resource {
+	return &resource{
+		ko: &svcapitypes.JobRun{
+			Status: svcapitypes.JobRunStatus{
+				State: aws.String("SUBMITTED"),
+				ID:    aws.String(id),
+			},
+			Spec: svcapitypes.JobRunSpec{
+				VirtualClusterID: aws.String("test-cluster-id"),
+			},
+		},
+	}
+}
+
+func withBatchRefreshConfig(t *testing.T, cfg batchrefresh.Config) {
+	previous := batchRefreshConfig
+	batchRefreshConfig = func() batchrefresh.Config { return cfg }
+	t.Cleanup(func() { batchRefreshConfig = previous })
+}
+
+// Validate that JobRuns of the same virtual cluster are refreshed from a
+// single ListJobRuns call.
+func TestReadOneFromBatchCache_SharesListJobRuns(t *testing.T) {
+	withBatchRefreshConfig(t, batchrefresh.Config{TTL: time.Minute, Window: time.Hour})
+
+	body := `{"jobRuns":[` +
+		`{"id":"run-1","virtualClusterId":"test-cluster-id","name":"one","state":"RUNNING"},` +
+		`{"id":"run-2","virtualClusterId":"test-cluster-id","name":"two","state":"COMPLETED"}]}`
+	mockHttpClient := &MockHttpClient{}
+	mockHttpClient.On("Do", mock.Anything).Return(&http.Response{
+		StatusCode: 200,
+		Status:     "200 OK",
+		Body:       io.NopCloser(strings.NewReader(body)),
+	}, nil).Once()
+
+	emrClient := svcsdk.New(svcsdk.Options{
+		HTTPClient: mockHttpClient,
+		Region:     "no-region",
+	})
+	rm := &resourceManager{
+		sdkapi:  emrClient,
+		metrics: metrics.NewMetrics("test-emr"),
+	}
+
+	first, ok := rm.readOneFromBatchCache(context.Background(), newBatchRefreshJobRun("run-1"))
+	assert.True(t, ok)
+	assert.Equal(t, "RUNNING", *first.ko.Status.State)
+	assert.Equal(t, "one", *first.ko.Spec.Name)
+
+	second, ok := rm.readOneFromBatchCache(context.Background(), newBatchRefreshJobRun("run-2"))
+	assert.True(t, ok)
+	assert.Equal(t, "COMPLETED", *second.ko.Status.State)
+
+	// A JobRun missing from the listing falls back to DescribeJobRun.
+	_, ok = rm.readOneFromBatchCache(context.Background(), newBatchRefreshJobRun("run-3"))
+	assert.False(t, ok)
+
+	mockHttpClient.AssertNumberOfCalls(t, "Do", 1)
+}
+
+// Validate that readOneFromBatchCache makes no API calls when batched refresh
+// is disabled.
+func TestReadOneFromBatchCache_Disabled(t *testing.T) {
+	withBatchRefreshConfig(t, batchrefresh.Config{})
+
+	mockHttpClient := &MockHttpClient{}
+	emrClient := svcsdk.New(svcsdk.Options{
+		HTTPClient: mockHttpClient,
+		Region:     "no-region",
+	})
+	rm := &resourceManager{
+		sdkapi:  emrClient,
+		metrics: metrics.NewMetrics("test-emr"),
+	}
+
+	latest, ok := rm.readOneFromBatchCache(context.Background(), newBatchRefreshJobRun("run-1"))
+
+	assert.False(t, ok)
+	assert.Nil(t, latest)
+	mockHttpClient.AssertNotCalled(t, "Do", mock.Anything)
+}
+
+// Validate that a JobRun started after the virtual cluster was listed is read
+// from a new listing once the cache is invalidated.
+func TestReadOneFromBatchCache_InvalidatedAfterStart(t *testing.T) {
+	withBatchRefreshConfig(t, batchrefresh.Config{TTL: time.Minute, Window: time.Hour})
+
+	listings := []string{
+		`{"jobRuns":[{"id":"run-1","virtualClusterId":"test-cluster-id","state":"RUNNING"}]}`,
+		`{"jobRuns":[{"id":"run-1","virtualClusterId":"test-cluster-id","state":"RUNNING"},` +
+			`{"id":"run-2","virtualClusterId":"test-cluster-id","state":"SUBMITTED"}]}`,
+	}
+	mockHttpClient := &MockHttpClient{}
+	for _, body := range listings {
+		mockHttpClient.On("Do", mock.Anything).Return(&http.Response{
+			StatusCode: 200,
+			Status:     "200 OK",
+			Body:       io.NopCloser(strings.NewReader(body)),
+		}, nil).Once()
+	}
+
+	emrClient := svcsdk.New(svcsdk.Options{
+		HTTPClient: mockHttpClient,
+		Region:     "no-region",
+	})
+	rm := &resourceManager{
+		sdkapi:  emrClient,
+		metrics: metrics.NewMetrics("test-emr"),
+	}
+
+	_, ok := rm.readOneFromBatchCache(context.Background(), newBatchRefreshJobRun("run-1"))
+	assert.True(t, ok)
+
+	rm.invalidateBatchCache(aws.String("test-cluster-id"))
+
+	started, ok := rm.readOneFromBatchCache(context.Background(), newBatchRefreshJobRun("run-2"))
+	assert.True(t, ok)
+	assert.Equal(t, "SUBMITTED", *started.ko.Status.State)
+	mockHttpClient.AssertNumberOfCalls(t, "Do", 2)
+}
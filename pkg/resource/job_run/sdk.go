@@ -74,6 +74,9 @@ func (rm *resourceManager) sdkFind(
 	if err != nil {
 		return nil, err
 	}
+	if cached, ok := rm.readOneFromBatchCache(ctx, r); ok {
+		return cached, nil
+	}
 
 	var resp *svcsdk.DescribeJobRunOutput
 	resp, err = rm.sdkapi.DescribeJobRun(ctx, input)
@@ -218,6 +221,7 @@ func (rm *resourceManager) sdkCreate(
 	_ = resp
 	resp, err = rm.sdkapi.StartJobRun(ctx, input)
 	rm.metrics.RecordAPICall("CREATE", "StartJobRun", err)
+	rm.invalidateBatchCache(input.VirtualClusterId)
 	if err != nil {
 		return nil, err
 	}
@@ -328,6 +332,7 @@ func (rm *resourceManager) sdkDelete(
 	_ = resp
 	resp, err = rm.sdkapi.CancelJobRun(ctx, input)
 	rm.metrics.RecordAPICall("DELETE", "CancelJobRun", err)
+	rm.invalidateBatchCache(r.ko.Spec.VirtualClusterID)
 
 	// If the job has already reached a state where it has finished we can
 	// consider the delete operation completed.
@@ -0,0 +1,57 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+package job_run_set
+
+import (
+	ackcompare "github.com/aws-controllers-k8s/runtime/pkg/compare"
+	"k8s.io/apimachinery/pkg/api/equality"
+)
+
+// newResourceDelta returns a new `ackcompare.Delta` used to compare two
+// resources
+func newResourceDelta(
+	a *resource,
+	b *resource,
+) *ackcompare.Delta {
+	delta := ackcompare.NewDelta()
+	if (a == nil && b != nil) ||
+		(a != nil && b == nil) {
+		delta.Add("", a, b)
+		return delta
+	}
+
+	if ackcompare.HasNilDifference(a.ko.Spec.MaxConcurrentSubmissions, b.ko.Spec.MaxConcurrentSubmissions) {
+		delta.Add("Spec.MaxConcurrentSubmissions", a.ko.Spec.MaxConcurrentSubmissions, b.ko.Spec.MaxConcurrentSubmissions)
+	} else if a.ko.Spec.MaxConcurrentSubmissions != nil && b.ko.Spec.MaxConcurrentSubmissions != nil {
+		if *a.ko.Spec.MaxConcurrentSubmissions != *b.ko.Spec.MaxConcurrentSubmissions {
+			delta.Add("Spec.MaxConcurrentSubmissions", a.ko.Spec.MaxConcurrentSubmissions, b.ko.Spec.MaxConcurrentSubmissions)
+		}
+	}
+	if !equality.Semantic.Equalities.DeepEqual(a.ko.Spec.Members, b.ko.Spec.Members) {
+		delta.Add("Spec.Members", a.ko.Spec.Members, b.ko.Spec.Members)
+	}
+	if !equality.Semantic.Equalities.DeepEqual(a.ko.Spec.Range, b.ko.Spec.Range) {
+		delta.Add("Spec.Range", a.ko.Spec.Range, b.ko.Spec.Range)
+	}
+	if !equality.Semantic.Equalities.DeepEqual(a.ko.Spec.Template, b.ko.Spec.Template) {
+		delta.Add("Spec.Template", a.ko.Spec.Template, b.ko.Spec.Template)
+	}
+	// Members that could not be started by sdkCreate (throttling, for
+	// example) are started by sdkUpdate.
+	if unstartedMembers(b) > 0 {
+		delta.Add("Status.JobRunIDs", a.ko.Status.JobRunIDs, b.ko.Status.JobRunIDs)
+	}
+
+	return delta
+}
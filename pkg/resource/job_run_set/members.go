@@ -0,0 +1,285 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+package job_run_set
+
+import (
+	"fmt"
+	"strconv"
+	"strings"
+
+	"github.com/aws/aws-sdk-go-v2/aws"
+	svcsdk "github.com/aws/aws-sdk-go-v2/service/emrcontainers"
+	svcsdktypes "github.com/aws/aws-sdk-go-v2/service/emrcontainers/types"
+	"github.com/ghodss/yaml"
+
+	svcapitypes "github.com/aws-controllers-k8s/emrcontainers-controller/apis/v1alpha1"
+)
+
+const (
+	// defaultMaxConcurrentSubmissions is the number of StartJobRun calls made
+	// concurrently for a set that does not set MaxConcurrentSubmissions.
+	defaultMaxConcurrentSubmissions = 10
+	// maxMembers bounds the size of a set so that its status stays well below
+	// the size limit of a Kubernetes object.
+	maxMembers = 10000
+	// rangeValuePlaceholder is replaced by the member's value in the template
+	// of a set generated from a range.
+	rangeValuePlaceholder = "$(value)"
+	// notStartedState is the MemberStates code of a member that has not been
+	// started yet.
+	notStartedState = '-'
+	// startFailedState is the MemberStates code of a member that StartJobRun
+	// rejected with a terminal error.
+	startFailedState = 'E'
+	// unknownState is the MemberStates code of a member whose state could not
+	// be read.
+	unknownState = '?'
+)
+
+// memberStateCodes maps job run states to their MemberStates code.
+var memberStateCodes = map[svcsdktypes.JobRunState]byte{
+	svcsdktypes.JobRunStatePending:       'P',
+	svcsdktypes.JobRunStateSubmitted:     'S',
+	svcsdktypes.JobRunStateRunning:       'R',
+	svcsdktypes.JobRunStateCancelPending: 'c',
+	svcsdktypes.JobRunStateCancelled:     'X',
+	svcsdktypes.JobRunStateFailed:        'F',
+	svcsdktypes.JobRunStateCompleted:     'C',
+}
+
+// memberStates maps MemberStates codes back to job run states.
+var memberStates = func() map[byte]svcsdktypes.JobRunState {
+	states := make(map[byte]svcsdktypes.JobRunState, len(memberStateCodes))
+	for state, code := range memberStateCodes {
+		states[code] = state
+	}
+	return states
+}()
+
+// memberCount returns the number of members of the set.
+func memberCount(ko *svcapitypes.JobRunSet) (int, error) {
+	var count int64
+	switch {
+	case ko.Spec.Members != nil && ko.Spec.Range != nil:
+		return 0, fmt.Errorf("only one of members and range may be set")
+	case ko.Spec.Members != nil:
+		count = int64(len(ko.Spec.Members))
+	case ko.Spec.Range != nil:
+		step := int64(1)
+		if ko.Spec.Range.Step != nil {
+			step = *ko.Spec.Range.Step
+		}
+		if step < 1 {
+			return 0, fmt.Errorf("range step must be at least 1")
+		}
+		if ko.Spec.Range.To >= ko.Spec.Range.From {
+			count = (ko.Spec.Range.To-ko.Spec.Range.From)/step + 1
+		}
+	default:
+		return 0, fmt.Errorf("one of members and range must be set")
+	}
+	if count > maxMembers {
+		return 0, fmt.Errorf("the set has %d members, more than the maximum of %d", count, maxMembers)
+	}
+	return int(count), nil
+}
+
+// maxConcurrentSubmissions returns the number of StartJobRun calls that may
+// be made concurrently for the set.
+func maxConcurrentSubmissions(ko *svcapitypes.JobRunSet) int {
+	if ko.Spec.MaxConcurrentSubmissions != nil && *ko.Spec.MaxConcurrentSubmissions > 0 {
+		return int(*ko.Spec.MaxConcurrentSubmissions)
+	}
+	return defaultMaxConcurrentSubmissions
+}
+
+// memberName returns the job run name of the member at index.
+func memberName(ko *svcapitypes.JobRunSet, index int) string {
+	prefix := ko.Name
+	if ko.Spec.Template != nil && ko.Spec.Template.Name != nil {
+		prefix = *ko.Spec.Template.Name
+	}
+	return fmt.Sprintf("%s-%d", prefix, index)
+}
+
+// memberClientToken returns the idempotency token used to start the member at
+// index, so that a member started by a reconcile whose status update was lost
+// is not started twice.
+func memberClientToken(ko *svcapitypes.JobRunSet, index int) string {
+	return fmt.Sprintf("%s-%d", ko.UID, index)
+}
+
+// newMemberRequestPayload returns the StartJobRun input of the member at
+// index.
+func newMemberRequestPayload(
+	ko *svcapitypes.JobRunSet,
+	index int,
+) (*svcsdk.StartJobRunInput, error) {
+	template := ko.Spec.Template
+	if template == nil {
+		return nil, fmt.Errorf("template must be set")
+	}
+	res := &svcsdk.StartJobRunInput{
+		ClientToken:      aws.String(memberClientToken(ko, index)),
+		ExecutionRoleArn: template.ExecutionRoleARN,
+		Name:             aws.String(memberName(ko, index)),
+		ReleaseLabel:     template.ReleaseLabel,
+		VirtualClusterId: template.VirtualClusterID,
+	}
+	if template.Tags != nil {
+		res.Tags = aws.ToStringMap(template.Tags)
+	}
+	if template.ConfigurationOverrides != nil {
+		var config svcsdktypes.ConfigurationOverrides
+		if err := yaml.Unmarshal([]byte(*template.ConfigurationOverrides), &config); err != nil {
+			return nil, err
+		}
+		res.ConfigurationOverrides = &config
+	}
+
+	if template.JobDriver == nil || template.JobDriver.SparkSubmitJobDriver == nil {
+		return res, nil
+	}
+	sparkSubmit := template.JobDriver.SparkSubmitJobDriver
+	driver := &svcsdktypes.SparkSubmitJobDriver{
+		EntryPoint:            sparkSubmit.EntryPoint,
+		EntryPointArguments:   aws.ToStringSlice(sparkSubmit.EntryPointArguments),
+		SparkSubmitParameters: sparkSubmit.SparkSubmitParameters,
+	}
+	switch {
+	case ko.Spec.Members != nil:
+		member := ko.Spec.Members[index]
+		if member != nil && member.EntryPointArguments != nil {
+			driver.EntryPointArguments = aws.ToStringSlice(member.EntryPointArguments)
+		}
+		if member != nil && member.SparkSubmitParameters != nil {
+			parameters := *member.SparkSubmitParameters
+			if driver.SparkSubmitParameters != nil && *driver.SparkSubmitParameters != "" {
+				parameters = *driver.SparkSubmitParameters + " " + parameters
+			}
+			driver.SparkSubmitParameters = aws.String(parameters)
+		}
+	case ko.Spec.Range != nil:
+		step := int64(1)
+		if ko.Spec.Range.Step != nil {
+			step = *ko.Spec.Range.Step
+		}
+		value := strconv.FormatInt(ko.Spec.Range.From+int64(index)*step, 10)
+		for i, argument := range driver.EntryPointArguments {
+			driver.EntryPointArguments[i] = strings.ReplaceAll(argument, rangeValuePlaceholder, value)
+		}
+		if driver.SparkSubmitParameters != nil {
+			driver.SparkSubmitParameters = aws.String(strings.ReplaceAll(*driver.SparkSubmitParameters, rangeValuePlaceholder, value))
+		}
+	}
+	res.JobDriver = &svcsdktypes.JobDriver{SparkSubmitJobDriver: driver}
+	return res, nil
+}
+
+// startedJobRunIDs returns the job run IDs of the set's members, by member
+// index, with an empty ID for members not started yet.
+func startedJobRunIDs(ko *svcapitypes.JobRunSet, count int) []string {
+	ids := make([]string, count)
+	copy(ids, ko.Status.JobRunIDs)
+	return ids
+}
+
+// startFailures returns the indexes of the members that StartJobRun rejected
+// with a terminal error.
+func startFailures(ko *svcapitypes.JobRunSet) map[int]bool {
+	failed := make(map[int]bool, len(ko.Status.StartErrors))
+	for _, startErr := range ko.Status.StartErrors {
+		if startErr != nil {
+			failed[int(startErr.Index)] = true
+		}
+	}
+	return failed
+}
+
+// unstartedMembers returns the number of members of the set that have not
+// been started yet and are still to be started, that is, excluding the
+// members that failed to start with a terminal error.
+func unstartedMembers(r *resource) int {
+	count, err := memberCount(r.ko)
+	if err != nil {
+		return 0
+	}
+	failed := startFailures(r.ko)
+	unstarted := 0
+	for i, id := range startedJobRunIDs(r.ko, count) {
+		if id == "" && !failed[i] {
+			unstarted++
+		}
+	}
+	return unstarted
+}
+
+// memberState returns the last observed state of the member at index, or
+// false if the member has not been started or its state is unknown.
+func memberState(ko *svcapitypes.JobRunSet, index int) (svcsdktypes.JobRunState, bool) {
+	if ko.Status.MemberStates == nil || index >= len(*ko.Status.MemberStates) {
+		return "", false
+	}
+	state, ok := memberStates[(*ko.Status.MemberStates)[index]]
+	return state, ok
+}
+
+// setMemberStatus records the members' job run IDs and states in the
+// status of the set. states holds the state of each started member, by job
+// run ID. The start errors must already be recorded in ko.
+func setMemberStatus(
+	ko *svcapitypes.JobRunSet,
+	ids []string,
+	states map[string]svcsdktypes.JobRunState,
+) {
+	failed := startFailures(ko)
+	codes := make([]byte, len(ids))
+	counts := map[string]*int64{}
+	for i, id := range ids {
+		if id == "" {
+			codes[i] = notStartedState
+			if failed[i] {
+				codes[i] = startFailedState
+			}
+			continue
+		}
+		state, found := states[id]
+		code, known := memberStateCodes[state]
+		if !found || !known {
+			codes[i] = unknownState
+			continue
+		}
+		codes[i] = code
+		if counts[string(state)] == nil {
+			counts[string(state)] = aws.Int64(0)
+		}
+		*counts[string(state)]++
+	}
+	ko.Status.JobRunIDs = ids
+	ko.Status.MemberStates = aws.String(string(codes))
+	ko.Status.StateCounts = counts
+}
+
+// isCancellable returns whether a job run in the state can be cancelled.
+func isCancellable(state svcsdktypes.JobRunState) bool {
+	switch state {
+	case svcsdktypes.JobRunStateCompleted,
+		svcsdktypes.JobRunStateCancelPending,
+		svcsdktypes.JobRunStateCancelled,
+		svcsdktypes.JobRunStateFailed:
+		return false
+	default:
+		return true
+	}
+}
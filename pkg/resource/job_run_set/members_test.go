@@ -0,0 +1,128 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+package job_run_set
+
+import (
+	"testing"
+
+	"github.com/aws/aws-sdk-go-v2/aws"
+	svcsdktypes "github.com/aws/aws-sdk-go-v2/service/emrcontainers/types"
+	"github.com/stretchr/testify/assert"
+	"github.com/stretchr/testify/require"
+	metav1 "k8s.io/apimachinery/pkg/apis/meta/v1"
+
+	svcapitypes "github.com/aws-controllers-k8s/emrcontainers-controller/apis/v1alpha1"
+)
+
+func newTestJobRunSet() *svcapitypes.JobRunSet {
+	return &svcapitypes.JobRunSet{
+		ObjectMeta: metav1.ObjectMeta{
+			Name: "nightly",
+			UID:  "4c1d4c2e-0d7e-4d4a-9d0c-0a1b2c3d4e5f",
+		},
+		Spec: svcapitypes.JobRunSetSpec{
+			Template: &svcapitypes.JobRunTemplate{
+				ExecutionRoleARN: aws.String("arn:aws:iam::111122223333:role/emr"),
+				ReleaseLabel:     aws.String("emr-6.3.0-latest"),
+				VirtualClusterID: aws.String("vc1"),
+				JobDriver: &svcapitypes.JobDriver{
+					SparkSubmitJobDriver: &svcapitypes.SparkSubmitJobDriver{
+						EntryPoint:            aws.String("local:///job.py"),
+						EntryPointArguments:   aws.StringSlice([]string{"--day", "$(value)"}),
+						SparkSubmitParameters: aws.String("--conf spark.executor.instances=2"),
+					},
+				},
+			},
+		},
+	}
+}
+
+func TestMemberCount(t *testing.T) {
+	ko := newTestJobRunSet()
+	_, err := memberCount(ko)
+	assert.Error(t, err, "neither members nor range")
+
+	ko.Spec.Range = &svcapitypes.JobRunSetRange{From: 1, To: 10, Step: aws.Int64(3)}
+	count, err := memberCount(ko)
+	require.NoError(t, err)
+	assert.Equal(t, 4, count) // 1, 4, 7, 10
+
+	ko.Spec.Range = &svcapitypes.JobRunSetRange{From: 5, To: 4}
+	count, err = memberCount(ko)
+	require.NoError(t, err)
+	assert.Equal(t, 0, count)
+
+	ko.Spec.Range = &svcapitypes.JobRunSetRange{From: 0, To: maxMembers}
+	_, err = memberCount(ko)
+	assert.Error(t, err, "more than maxMembers")
+
+	ko.Spec.Members = []*svcapitypes.JobRunSetMember{{}}
+	_, err = memberCount(ko)
+	assert.Error(t, err, "both members and range")
+}
+
+func TestNewMemberRequestPayload_Range(t *testing.T) {
+	ko := newTestJobRunSet()
+	ko.Spec.Range = &svcapitypes.JobRunSetRange{From: 10, To: 20, Step: aws.Int64(5)}
+
+	input, err := newMemberRequestPayload(ko, 2)
+	require.NoError(t, err)
+
+	assert.Equal(t, "nightly-2", *input.Name)
+	assert.Equal(t, "4c1d4c2e-0d7e-4d4a-9d0c-0a1b2c3d4e5f-2", *input.ClientToken)
+	assert.Equal(t, []string{"--day", "20"}, input.JobDriver.SparkSubmitJobDriver.EntryPointArguments)
+	// The template is left untouched.
+	assert.Equal(t, "$(value)", *ko.Spec.Template.JobDriver.SparkSubmitJobDriver.EntryPointArguments[1])
+}
+
+func TestNewMemberRequestPayload_Members(t *testing.T) {
+	ko := newTestJobRunSet()
+	ko.Spec.Template.Name = aws.String("report")
+	ko.Spec.Members = []*svcapitypes.JobRunSetMember{
+		{EntryPointArguments: aws.StringSlice([]string{"--region", "eu"})},
+		{SparkSubmitParameters: aws.String("--conf spark.executor.memory=4G")},
+	}
+
+	first, err := newMemberRequestPayload(ko, 0)
+	require.NoError(t, err)
+	assert.Equal(t, "report-0", *first.Name)
+	assert.Equal(t, []string{"--region", "eu"}, first.JobDriver.SparkSubmitJobDriver.EntryPointArguments)
+
+	second, err := newMemberRequestPayload(ko, 1)
+	require.NoError(t, err)
+	assert.Equal(t, []string{"--day", "$(value)"}, second.JobDriver.SparkSubmitJobDriver.EntryPointArguments)
+	assert.Equal(t,
+		"--conf spark.executor.instances=2 --conf spark.executor.memory=4G",
+		*second.JobDriver.SparkSubmitJobDriver.SparkSubmitParameters,
+	)
+}
+
+func TestSetMemberStatus(t *testing.T) {
+	ko := newTestJobRunSet()
+	ids := []string{"a", "", "b", "c"}
+	setMemberStatus(ko, ids, map[string]svcsdktypes.JobRunState{
+		"a": svcsdktypes.JobRunStateRunning,
+		"b": svcsdktypes.JobRunStateCompleted,
+	})
+
+	assert.Equal(t, "R-C?", *ko.Status.MemberStates)
+	assert.Equal(t, int64(1), *ko.Status.StateCounts["RUNNING"])
+	assert.Equal(t, int64(1), *ko.Status.StateCounts["COMPLETED"])
+
+	state, ok := memberState(ko, 2)
+	assert.True(t, ok)
+	assert.Equal(t, svcsdktypes.JobRunStateCompleted, state)
+	_, ok = memberState(ko, 1)
+	assert.False(t, ok)
+}
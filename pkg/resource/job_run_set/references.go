@@ -0,0 +1,38 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+package job_run_set
+
+import (
+	"context"
+
+	acktypes "github.com/aws-controllers-k8s/runtime/pkg/types"
+	"sigs.k8s.io/controller-runtime/pkg/client"
+)
+
+// ClearResolvedReferences returns a copy of the input AWSResource. JobRunSets
+// have no reference fields.
+func (rm *resourceManager) ClearResolvedReferences(res acktypes.AWSResource) acktypes.AWSResource {
+	return &resource{rm.concreteResource(res).ko.DeepCopy()}
+}
+
+// ResolveReferences returns the input AWSResource and false. JobRunSets have
+// no reference fields; the template takes the virtual cluster ID and
+// execution role ARN directly.
+func (rm *resourceManager) ResolveReferences(
+	ctx context.Context,
+	apiReader client.Reader,
+	res acktypes.AWSResource,
+) (acktypes.AWSResource, bool, error) {
+	return res, false, nil
+}
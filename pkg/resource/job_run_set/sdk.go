@@ -0,0 +1,474 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+package job_run_set
+
+import (
+	"context"
+	"errors"
+	"sort"
+	"strings"
+	"sync"
+	"time"
+
+	ackv1alpha1 "github.com/aws-controllers-k8s/runtime/apis/core/v1alpha1"
+	ackcompare "github.com/aws-controllers-k8s/runtime/pkg/compare"
+	ackerr "github.com/aws-controllers-k8s/runtime/pkg/errors"
+	ackrtlog "github.com/aws-controllers-k8s/runtime/pkg/runtime/log"
+	"github.com/aws/aws-sdk-go-v2/aws"
+	svcsdk "github.com/aws/aws-sdk-go-v2/service/emrcontainers"
+	svcsdktypes "github.com/aws/aws-sdk-go-v2/service/emrcontainers/types"
+	smithy "github.com/aws/smithy-go"
+	corev1 "k8s.io/api/core/v1"
+
+	svcapitypes "github.com/aws-controllers-k8s/emrcontainers-controller/apis/v1alpha1"
+)
+
+const (
+	// listJobRunsPageSize is the page size requested from ListJobRuns.
+	listJobRunsPageSize = 50
+	// listJobRunsClockSkew widens the ListJobRuns creation window to allow
+	// for clock skew between the API server and the service.
+	listJobRunsClockSkew = 5 * time.Minute
+)
+
+var errTemplateVirtualClusterIDRequired = errors.New("template.virtualClusterID must be set")
+
+// sdkFind returns the latest state of the set's members. Member states are
+// read with one paged ListJobRuns listing of the virtual cluster, restricted
+// to job runs created after the set, rather than one DescribeJobRun per
+// member.
+func (rm *resourceManager) sdkFind(
+	ctx context.Context,
+	r *resource,
+) (latest *resource, err error) {
+	rlog := ackrtlog.FromContext(ctx)
+	exit := rlog.Trace("rm.sdkFind")
+	defer func() {
+		exit(err)
+	}()
+	count, err := memberCount(r.ko)
+	if err != nil {
+		return nil, ackerr.NewTerminalError(err)
+	}
+	if r.ko.Spec.Template == nil || r.ko.Spec.Template.VirtualClusterID == nil {
+		return nil, ackerr.NewTerminalError(errTemplateVirtualClusterIDRequired)
+	}
+	ids := startedJobRunIDs(r.ko, count)
+	started := map[string]bool{}
+	for _, id := range ids {
+		if id != "" {
+			started[id] = true
+		}
+	}
+	// Nothing has been started or rejected yet, so the set does not exist as
+	// far as the service is concerned.
+	if len(started) == 0 && len(r.ko.Status.StartErrors) == 0 {
+		return nil, ackerr.NotFound
+	}
+
+	states := map[string]svcsdktypes.JobRunState{}
+	if len(started) > 0 {
+		states, err = rm.listMemberStates(ctx, r, started)
+		if err != nil {
+			return nil, err
+		}
+	}
+	var missing []string
+	for id := range started {
+		if _, ok := states[id]; !ok {
+			missing = append(missing, id)
+		}
+	}
+	if len(missing) > 0 {
+		rlog.Debug("job runs missing from ListJobRuns, describing them", "count", len(missing))
+		var mu sync.Mutex
+		err = forEach(ctx, len(missing), maxConcurrentSubmissions(r.ko), func(ctx context.Context, i int) error {
+			resp, err := rm.sdkapi.DescribeJobRun(ctx, &svcsdk.DescribeJobRunInput{
+				Id:               aws.String(missing[i]),
+				VirtualClusterId: r.ko.Spec.Template.VirtualClusterID,
+			})
+			rm.metrics.RecordAPICall("READ_ONE", "DescribeJobRun", err)
+			if err != nil {
+				return err
+			}
+			mu.Lock()
+			states[missing[i]] = resp.JobRun.State
+			mu.Unlock()
+			return nil
+		})
+		if err != nil {
+			return nil, err
+		}
+	}
+
+	ko := r.ko.DeepCopy()
+	setMemberStatus(ko, ids, states)
+	rm.setStatusDefaults(ko)
+	return &resource{ko}, nil
+}
+
+// listMemberStates pages through ListJobRuns for the set's virtual cluster and
+// returns the states of the started members, by job run ID.
+func (rm *resourceManager) listMemberStates(
+	ctx context.Context,
+	r *resource,
+	started map[string]bool,
+) (map[string]svcsdktypes.JobRunState, error) {
+	input := &svcsdk.ListJobRunsInput{
+		VirtualClusterId: r.ko.Spec.Template.VirtualClusterID,
+		CreatedAfter:     aws.Time(r.ko.CreationTimestamp.Add(-listJobRunsClockSkew)),
+		MaxResults:       aws.Int32(listJobRunsPageSize),
+	}
+	states := make(map[string]svcsdktypes.JobRunState, len(started))
+	for {
+		resp, err := rm.sdkapi.ListJobRuns(ctx, input)
+		rm.metrics.RecordAPICall("READ_MANY", "ListJobRuns", err)
+		if err != nil {
+			return nil, err
+		}
+		for _, jobRun := range resp.JobRuns {
+			if jobRun.Id != nil && started[*jobRun.Id] {
+				states[*jobRun.Id] = jobRun.State
+			}
+		}
+		if resp.NextToken == nil || len(states) == len(started) {
+			return states, nil
+		}
+		input.NextToken = resp.NextToken
+	}
+}
+
+// sdkCreate starts the members of the set.
+func (rm *resourceManager) sdkCreate(
+	ctx context.Context,
+	desired *resource,
+) (created *resource, err error) {
+	rlog := ackrtlog.FromContext(ctx)
+	exit := rlog.Trace("rm.sdkCreate")
+	defer func() {
+		exit(err)
+	}()
+	return rm.startMembers(ctx, desired)
+}
+
+// sdkUpdate starts the members that have not been started yet. Every other
+// field of the set is immutable.
+func (rm *resourceManager) sdkUpdate(
+	ctx context.Context,
+	desired *resource,
+	latest *resource,
+	delta *ackcompare.Delta,
+) (updated *resource, err error) {
+	rlog := ackrtlog.FromContext(ctx)
+	exit := rlog.Trace("rm.sdkUpdate")
+	defer func() {
+		exit(err)
+	}()
+	if delta.DifferentAt("Spec.Template") || delta.DifferentAt("Spec.Members") || delta.DifferentAt("Spec.Range") {
+		return nil, ackerr.NewTerminalError(errors.New("the template and members of a JobRunSet are immutable"))
+	}
+	ko := desired.ko.DeepCopy()
+	ko.Status = latest.ko.Status
+	return rm.startMembers(ctx, &resource{ko})
+}
+
+// startMembers starts every member of the set that has not been started yet,
+// making at most maxConcurrentSubmissions StartJobRun calls at a time. It
+// returns the set with the IDs of the members it started, together with the
+// retryable errors of the members it could not start. A member rejected with
+// a terminal error is recorded in Status.StartErrors and not started again;
+// it does not make the whole set terminal.
+func (rm *resourceManager) startMembers(
+	ctx context.Context,
+	desired *resource,
+) (*resource, error) {
+	count, err := memberCount(desired.ko)
+	if err != nil {
+		return nil, ackerr.NewTerminalError(err)
+	}
+	if desired.ko.Spec.Template == nil || desired.ko.Spec.Template.VirtualClusterID == nil {
+		return nil, ackerr.NewTerminalError(errTemplateVirtualClusterIDRequired)
+	}
+	ids := startedJobRunIDs(desired.ko, count)
+	failed := startFailures(desired.ko)
+	var pending []int
+	for i, id := range ids {
+		if id == "" && !failed[i] {
+			pending = append(pending, i)
+		}
+	}
+
+	states := map[string]svcsdktypes.JobRunState{}
+	for i, id := range ids {
+		if state, ok := memberState(desired.ko, i); ok && id != "" {
+			states[id] = state
+		}
+	}
+	var (
+		mu          sync.Mutex
+		startErrors []*svcapitypes.JobRunSetMemberError
+	)
+	startErr := forEach(ctx, len(pending), maxConcurrentSubmissions(desired.ko), func(ctx context.Context, i int) error {
+		index := pending[i]
+		id, err := rm.startMember(ctx, desired.ko, index)
+		if err == nil {
+			mu.Lock()
+			ids[index] = id
+			states[id] = svcsdktypes.JobRunStatePending
+			mu.Unlock()
+			return nil
+		}
+		var termErr *ackerr.TerminalError
+		if !rm.terminalAWSError(err) && !errors.As(err, &termErr) {
+			return err
+		}
+		mu.Lock()
+		startErrors = append(startErrors, &svcapitypes.JobRunSetMemberError{
+			Index:   int64(index),
+			Message: aws.String(err.Error()),
+		})
+		mu.Unlock()
+		return nil
+	})
+
+	ko := desired.ko.DeepCopy()
+	if len(startErrors) > 0 {
+		ko.Status.StartErrors = append(ko.Status.StartErrors, startErrors...)
+		sort.Slice(ko.Status.StartErrors, func(i, j int) bool {
+			return ko.Status.StartErrors[i].Index < ko.Status.StartErrors[j].Index
+		})
+	}
+	setMemberStatus(ko, ids, states)
+	rm.setStatusDefaults(ko)
+	return &resource{ko}, startErr
+}
+
+// startMember starts the member at index and returns its job run ID.
+func (rm *resourceManager) startMember(
+	ctx context.Context,
+	ko *svcapitypes.JobRunSet,
+	index int,
+) (string, error) {
+	input, err := newMemberRequestPayload(ko, index)
+	if err != nil {
+		return "", ackerr.NewTerminalError(err)
+	}
+	resp, err := rm.sdkapi.StartJobRun(ctx, input)
+	rm.metrics.RecordAPICall("CREATE", "StartJobRun", err)
+	if err != nil {
+		return "", err
+	}
+	return *resp.Id, nil
+}
+
+// sdkDelete cancels the members of the set that are still cancellable.
+func (rm *resourceManager) sdkDelete(
+	ctx context.Context,
+	r *resource,
+) (latest *resource, err error) {
+	rlog := ackrtlog.FromContext(ctx)
+	exit := rlog.Trace("rm.sdkDelete")
+	defer func() {
+		exit(err)
+	}()
+	if r.ko.Spec.Template == nil {
+		return nil, nil
+	}
+	var cancellable []string
+	for i, id := range r.ko.Status.JobRunIDs {
+		if id == "" {
+			continue
+		}
+		if state, ok := memberState(r.ko, i); ok && !isCancellable(state) {
+			continue
+		}
+		cancellable = append(cancellable, id)
+	}
+
+	err = forEach(ctx, len(cancellable), maxConcurrentSubmissions(r.ko), func(ctx context.Context, i int) error {
+		_, err := rm.sdkapi.CancelJobRun(ctx, &svcsdk.CancelJobRunInput{
+			Id:               aws.String(cancellable[i]),
+			VirtualClusterId: r.ko.Spec.Template.VirtualClusterID,
+		})
+		rm.metrics.RecordAPICall("DELETE", "CancelJobRun", err)
+		// The job run has already finished.
+		var awsErr smithy.APIError
+		if errors.As(err, &awsErr) && awsErr.ErrorCode() == "ValidationException" && strings.HasSuffix(awsErr.ErrorMessage(), "is not in a cancellable state") {
+			return nil
+		}
+		return err
+	})
+	return nil, err
+}
+
+// forEach calls fn for every index in [0, n), running at most limit calls at
+// a time, and returns the errors of the failed calls joined together.
+func forEach(
+	ctx context.Context,
+	n int,
+	limit int,
+	fn func(ctx context.Context, i int) error,
+) error {
+	var (
+		wg   sync.WaitGroup
+		mu   sync.Mutex
+		errs []error
+	)
+	sem := make(chan struct{}, limit)
+	for i := 0; i < n; i++ {
+		select {
+		case sem <- struct{}{}:
+		case <-ctx.Done():
+			wg.Wait()
+			return errors.Join(append(errs, ctx.Err())...)
+		}
+		wg.Add(1)
+		go func(i int) {
+			defer func() {
+				<-sem
+				wg.Done()
+			}()
+			if err := fn(ctx, i); err != nil {
+				mu.Lock()
+				errs = append(errs, err)
+				mu.Unlock()
+			}
+		}(i)
+	}
+	wg.Wait()
+	return errors.Join(errs...)
+}
+
+// setStatusDefaults sets default properties into supplied custom resource
+func (rm *resourceManager) setStatusDefaults(
+	ko *svcapitypes.JobRunSet,
+) {
+	if ko.Status.ACKResourceMetadata == nil {
+		ko.Status.ACKResourceMetadata = &ackv1alpha1.ResourceMetadata{}
+	}
+	if ko.Status.ACKResourceMetadata.Region == nil {
+		ko.Status.ACKResourceMetadata.Region = &rm.awsRegion
+	}
+	if ko.Status.ACKResourceMetadata.Partition == nil {
+		ko.Status.ACKResourceMetadata.Partition = &rm.awsPartition
+	}
+	if ko.Status.ACKResourceMetadata.OwnerAccountID == nil {
+		ko.Status.ACKResourceMetadata.OwnerAccountID = &rm.awsAccountID
+	}
+	if ko.Status.Conditions == nil {
+		ko.Status.Conditions = []*ackv1alpha1.Condition{}
+	}
+}
+
+// updateConditions returns updated resource, true; if conditions were updated
+// else it returns nil, false
+func (rm *resourceManager) updateConditions(
+	r *resource,
+	onSuccess bool,
+	err error,
+) (*resource, bool) {
+	ko := r.ko.DeepCopy()
+	rm.setStatusDefaults(ko)
+
+	// Terminal condition
+	var terminalCondition *ackv1alpha1.Condition = nil
+	var recoverableCondition *ackv1alpha1.Condition = nil
+	var syncCondition *ackv1alpha1.Condition = nil
+	for _, condition := range ko.Status.Conditions {
+		if condition.Type == ackv1alpha1.ConditionTypeTerminal {
+			terminalCondition = condition
+		}
+		if condition.Type == ackv1alpha1.ConditionTypeRecoverable {
+			recoverableCondition = condition
+		}
+		if condition.Type == ackv1alpha1.ConditionTypeResourceSynced {
+			syncCondition = condition
+		}
+	}
+	var termError *ackerr.TerminalError
+	if rm.terminalAWSError(err) || err == ackerr.SecretTypeNotSupported || err == ackerr.SecretNotFound || errors.As(err, &termError) {
+		if terminalCondition == nil {
+			terminalCondition = &ackv1alpha1.Condition{
+				Type: ackv1alpha1.ConditionTypeTerminal,
+			}
+			ko.Status.Conditions = append(ko.Status.Conditions, terminalCondition)
+		}
+		var errorMessage = ""
+		if err == ackerr.SecretTypeNotSupported || err == ackerr.SecretNotFound || errors.As(err, &termError) {
+			errorMessage = err.Error()
+		} else {
+			awsErr, _ := ackerr.AWSError(err)
+			errorMessage = awsErr.Error()
+		}
+		terminalCondition.Status = corev1.ConditionTrue
+		terminalCondition.Message = &errorMessage
+	} else {
+		// Clear the terminal condition if no longer present
+		if terminalCondition != nil {
+			terminalCondition.Status = corev1.ConditionFalse
+			terminalCondition.Message = nil
+		}
+		// Handling Recoverable Conditions
+		if err != nil {
+			if recoverableCondition == nil {
+				// Add a new Condition containing a non-terminal error
+				recoverableCondition = &ackv1alpha1.Condition{
+					Type: ackv1alpha1.ConditionTypeRecoverable,
+				}
+				ko.Status.Conditions = append(ko.Status.Conditions, recoverableCondition)
+			}
+			recoverableCondition.Status = corev1.ConditionTrue
+			awsErr, _ := ackerr.AWSError(err)
+			errorMessage := err.Error()
+			if awsErr != nil {
+				errorMessage = awsErr.Error()
+			}
+			recoverableCondition.Message = &errorMessage
+		} else if recoverableCondition != nil {
+			recoverableCondition.Status = corev1.ConditionFalse
+			recoverableCondition.Message = nil
+		}
+	}
+	if syncCondition == nil && onSuccess {
+		syncCondition = &ackv1alpha1.Condition{
+			Type:   ackv1alpha1.ConditionTypeResourceSynced,
+			Status: corev1.ConditionTrue,
+		}
+		ko.Status.Conditions = append(ko.Status.Conditions, syncCondition)
+	}
+	if terminalCondition != nil || recoverableCondition != nil || syncCondition != nil {
+		return &resource{ko}, true // updated
+	}
+	return nil, false // not updated
+}
+
+// terminalAWSError returns awserr, true; if the supplied error is an aws Error type
+// and if the exception indicates that it is a Terminal exception
+// 'Terminal' exception are specified in generator configuration
+func (rm *resourceManager) terminalAWSError(err error) bool {
+	if err == nil {
+		return false
+	}
+
+	var terminalErr smithy.APIError
+	if !errors.As(err, &terminalErr) {
+		return false
+	}
+	switch terminalErr.ErrorCode() {
+	case "ValidationException":
+		return true
+	default:
+		return false
+	}
+}
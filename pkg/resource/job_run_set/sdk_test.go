@@ -0,0 +1,191 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+package job_run_set
+
+import (
+	"context"
+	"encoding/json"
+	"fmt"
+	"io"
+	"net/http"
+	"strings"
+	"sync"
+	"sync/atomic"
+	"testing"
+	"time"
+
+	"github.com/aws-controllers-k8s/runtime/pkg/metrics"
+	"github.com/aws/aws-sdk-go-v2/aws"
+	svcsdk "github.com/aws/aws-sdk-go-v2/service/emrcontainers"
+	"github.com/stretchr/testify/assert"
+	"github.com/stretchr/testify/require"
+
+	svcapitypes "github.com/aws-controllers-k8s/emrcontainers-controller/apis/v1alpha1"
+)
+
+// fakeHTTPClient answers StartJobRun with a new job run ID, or with a
+// ValidationException for the job run names in rejected, and ListJobRuns with
+// every job run started so far, RUNNING.
+type fakeHTTPClient struct {
+	mu           sync.Mutex
+	started      []string
+	clientTokens map[string]bool
+	rejected     map[string]bool
+	startCalls   int32
+	inFlight     int32
+	maxInFlight  int32
+	listCalls    int32
+}
+
+func (c *fakeHTTPClient) Do(request *http.Request) (*http.Response, error) {
+	inFlight := atomic.AddInt32(&c.inFlight, 1)
+	defer atomic.AddInt32(&c.inFlight, -1)
+	for {
+		max := atomic.LoadInt32(&c.maxInFlight)
+		if inFlight <= max || atomic.CompareAndSwapInt32(&c.maxInFlight, max, inFlight) {
+			break
+		}
+	}
+	time.Sleep(time.Millisecond)
+
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	var body any
+	switch request.Method {
+	case http.MethodPost:
+		var input struct {
+			ClientToken string `json:"clientToken"`
+			Name        string `json:"name"`
+		}
+		payload, _ := io.ReadAll(request.Body)
+		_ = json.Unmarshal(payload, &input)
+		c.startCalls++
+		if c.rejected[input.Name] {
+			return &http.Response{
+				StatusCode: 400,
+				Status:     "400 Bad Request",
+				Header: http.Header{
+					"Content-Type":     []string{"application/json"},
+					"X-Amzn-Errortype": []string{"ValidationException"},
+				},
+				Body: io.NopCloser(strings.NewReader(`{"message":"invalid spark submit parameters"}`)),
+			}, nil
+		}
+		c.clientTokens[input.ClientToken] = true
+		id := fmt.Sprintf("jr%d", len(c.started))
+		c.started = append(c.started, id)
+		body = map[string]string{"id": id, "virtualClusterId": "vc1"}
+	case http.MethodGet:
+		atomic.AddInt32(&c.listCalls, 1)
+		jobRuns := []map[string]string{}
+		for _, id := range c.started {
+			jobRuns = append(jobRuns, map[string]string{"id": id, "state": "RUNNING"})
+		}
+		body = map[string]any{"jobRuns": jobRuns}
+	}
+	payload, _ := json.Marshal(body)
+	return &http.Response{
+		StatusCode: 200,
+		Status:     "200 OK",
+		Header:     http.Header{"Content-Type": []string{"application/json"}},
+		Body:       io.NopCloser(strings.NewReader(string(payload))),
+	}, nil
+}
+
+func newTestResourceManager(client *fakeHTTPClient) *resourceManager {
+	return &resourceManager{
+		sdkapi: svcsdk.New(svcsdk.Options{
+			HTTPClient: client,
+			Region:     "no-region",
+		}),
+		metrics: metrics.NewMetrics("test-emr"),
+	}
+}
+
+// Validate that sdkCreate starts every member once, with bounded concurrency,
+// and that sdkFind reads their states from a single ListJobRuns call.
+func TestSdkCreate_StartsMembersWithBoundedConcurrency(t *testing.T) {
+	client := &fakeHTTPClient{clientTokens: map[string]bool{}}
+	rm := newTestResourceManager(client)
+
+	ko := newTestJobRunSet()
+	ko.Spec.Range = &svcapitypes.JobRunSetRange{From: 1, To: 40}
+	ko.Spec.MaxConcurrentSubmissions = aws.Int64(4)
+
+	created, err := rm.sdkCreate(context.Background(), &resource{ko})
+	require.NoError(t, err)
+
+	assert.Len(t, client.started, 40)
+	assert.Len(t, client.clientTokens, 40)
+	assert.LessOrEqual(t, client.maxInFlight, int32(4))
+	assert.Equal(t, 0, unstartedMembers(created))
+	assert.Equal(t, strings.Repeat("P", 40), *created.ko.Status.MemberStates)
+
+	latest, err := rm.sdkFind(context.Background(), created)
+	require.NoError(t, err)
+	assert.Equal(t, strings.Repeat("R", 40), *latest.ko.Status.MemberStates)
+	assert.Equal(t, int64(40), *latest.ko.Status.StateCounts["RUNNING"])
+	assert.Equal(t, int32(1), client.listCalls)
+}
+
+// Validate that sdkUpdate only starts the members that are not started yet.
+func TestSdkUpdate_StartsRemainingMembers(t *testing.T) {
+	client := &fakeHTTPClient{clientTokens: map[string]bool{}}
+	rm := newTestResourceManager(client)
+
+	ko := newTestJobRunSet()
+	ko.Spec.Range = &svcapitypes.JobRunSetRange{From: 1, To: 3}
+	ko.Status.JobRunIDs = []string{"existing", "", ""}
+	latest := &resource{ko.DeepCopy()}
+
+	delta := newResourceDelta(&resource{ko}, latest)
+	assert.True(t, delta.DifferentAt("Status.JobRunIDs"))
+
+	updated, err := rm.sdkUpdate(context.Background(), &resource{ko}, latest, delta)
+	require.NoError(t, err)
+	assert.Len(t, client.started, 2)
+	assert.Equal(t, "existing", updated.ko.Status.JobRunIDs[0])
+	assert.Equal(t, 0, unstartedMembers(updated))
+	assert.False(t, newResourceDelta(updated, updated).DifferentAt("Status.JobRunIDs"))
+}
+
+// Validate that a member rejected with a terminal error is recorded in the
+// status of the set and not retried, while the other members are started.
+func TestSdkCreate_TerminalErrorIsScopedToMember(t *testing.T) {
+	client := &fakeHTTPClient{
+		clientTokens: map[string]bool{},
+		rejected:     map[string]bool{"nightly-1": true},
+	}
+	rm := newTestResourceManager(client)
+
+	ko := newTestJobRunSet()
+	ko.Spec.Range = &svcapitypes.JobRunSetRange{From: 1, To: 3}
+
+	created, err := rm.sdkCreate(context.Background(), &resource{ko})
+	require.NoError(t, err)
+	assert.Len(t, client.started, 2)
+	assert.Equal(t, "PEP", *created.ko.Status.MemberStates)
+	require.Len(t, created.ko.Status.StartErrors, 1)
+	assert.Equal(t, int64(1), created.ko.Status.StartErrors[0].Index)
+	assert.Contains(t, *created.ko.Status.StartErrors[0].Message, "ValidationException")
+	assert.Equal(t, 0, unstartedMembers(created))
+
+	latest, err := rm.sdkFind(context.Background(), created)
+	require.NoError(t, err)
+	assert.Equal(t, "RER", *latest.ko.Status.MemberStates)
+
+	_, err = rm.sdkUpdate(context.Background(), created, latest, newResourceDelta(created, latest))
+	require.NoError(t, err)
+	assert.Equal(t, int32(3), client.startCalls)
+}
@@ -0,0 +1,160 @@
+// Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License"). You may
+// not use this file except in compliance with the License. A copy of the
+// License is located at
+//
+//     http://aws.amazon.com/apache2.0/
+//
+// or in the "license" file accompanying this file. This file is distributed
+// on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+// express or implied. See the License for the specific language governing
+// permissions and limitations under the License.
+
+package virtual_cluster
+
+import (
+	"context"
+
+	ackv1alpha1 "github.com/aws-controllers-k8s/runtime/apis/core/v1alpha1"
+	ackrtlog "github.com/aws-controllers-k8s/runtime/pkg/runtime/log"
+	"github.com/aws/aws-sdk-go-v2/aws"
+	svcsdk "github.com/aws/aws-sdk-go-v2/service/emrcontainers"
+	svcsdktypes "github.com/aws/aws-sdk-go-v2/service/emrcontainers/types"
+
+	svcapitypes "github.com/aws-controllers-k8s/emrcontainers-controller/apis/v1alpha1"
+	"github.com/aws-controllers-k8s/emrcontainers-controller/pkg/batchrefresh"
+)
+
+// listVirtualClustersPageSize is the page size requested from
+// ListVirtualClusters.
+const listVirtualClustersPageSize = 50
+
+// virtualClustersGroup is the single cache group of a ListVirtualClusters
+// listing; virtual clusters are listed account-wide.
+const virtualClustersGroup = ""
+
+var (
+	// virtualClusterCaches holds, per SDK client, the latest
+	// ListVirtualClusters result.
+	virtualClusterCaches batchrefresh.Caches[svcsdktypes.VirtualCluster]
+	// batchRefreshConfig returns the batched refresh configuration. Replaced
+	// in tests.
+	batchRefreshConfig = batchrefresh.ConfigFromEnv
+)
+
+// readOneFromBatchCache returns the latest state of the VirtualCluster from a
+// ListVirtualClusters listing shared by every VirtualCluster for the
+// configured TTL. It returns false when batched refresh is disabled, the
+// listing fails, or the VirtualCluster is not in the listing, in which case
+// the caller falls back to DescribeVirtualCluster.
+func (rm *resourceManager) readOneFromBatchCache(
+	ctx context.Context,
+	r *resource,
+) (*resource, bool) {
+	cfg := batchRefreshConfig()
+	if !cfg.Enabled() {
+		return nil, false
+	}
+	rlog := ackrtlog.FromContext(ctx)
+
+	cache := virtualClusterCaches.For(rm.sdkapi, cfg.TTL)
+	virtualCluster, found, err := cache.Lookup(ctx, virtualClustersGroup, *r.ko.Status.ID,
+		rm.listVirtualClusters,
+	)
+	if err != nil {
+		rlog.Debug("batched VirtualCluster refresh failed, falling back to DescribeVirtualCluster", "error", err)
+		return nil, false
+	}
+	if !found {
+		return nil, false
+	}
+	return rm.resourceFromVirtualCluster(r, &virtualCluster), true
+}
+
+// invalidateBatchCache drops the cached virtual cluster listing after a call
+// that changes it, so that a deleted virtual cluster is not read back from a
+// listing taken before the delete.
+func (rm *resourceManager) invalidateBatchCache() {
+	cfg := batchRefreshConfig()
+	if !cfg.Enabled() {
+		return
+	}
+	virtualClusterCaches.For(rm.sdkapi, cfg.TTL).Invalidate(virtualClustersGroup)
+}
+
+// listVirtualClusters pages through ListVirtualClusters and returns the
+// virtual clusters keyed by ID.
+func (rm *resourceManager) listVirtualClusters(
+	ctx context.Context,
+) (map[string]svcsdktypes.VirtualCluster, error) {
+	input := &svcsdk.ListVirtualClustersInput{
+		MaxResults: aws.Int32(listVirtualClustersPageSize),
+	}
+
+	virtualClusters := map[string]svcsdktypes.VirtualCluster{}
+	for {
+		resp, err := rm.sdkapi.ListVirtualClusters(ctx, input)
+		rm.metrics.RecordAPICall("READ_MANY", "ListVirtualClusters", err)
+		if err != nil {
+			return nil, err
+		}
+		for _, virtualCluster := range resp.VirtualClusters {
+			if virtualCluster.Id != nil {
+				virtualClusters[*virtualCluster.Id] = virtualCluster
+			}
+		}
+		if resp.NextToken == nil {
+			return virtualClusters, nil
+		}
+		input.NextToken = resp.NextToken
+	}
+}
+
+// resourceFromVirtualCluster merges a VirtualCluster returned by
+// ListVirtualClusters into a copy of the supplied resource, setting the same
+// fields sdkFind sets from DescribeVirtualCluster.
+func (rm *resourceManager) resourceFromVirtualCluster(
+	r *resource,
+	virtualCluster *svcsdktypes.VirtualCluster,
+) *resource {
+	ko := r.ko.DeepCopy()
+
+	if ko.Status.ACKResourceMetadata == nil {
+		ko.Status.ACKResourceMetadata = &ackv1alpha1.ResourceMetadata{}
+	}
+	if virtualCluster.Arn != nil {
+		arn := ackv1alpha1.AWSResourceName(*virtualCluster.Arn)
+		ko.Status.ACKResourceMetadata.ARN = &arn
+	}
+	if virtualCluster.ContainerProvider != nil {
+		containerProvider := &svcapitypes.ContainerProvider{
+			ID: virtualCluster.ContainerProvider.Id,
+		}
+		if virtualCluster.ContainerProvider.Info != nil {
+			info := &svcapitypes.ContainerInfo{}
+			if eksInfo, ok := virtualCluster.ContainerProvider.Info.(*svcsdktypes.ContainerInfoMemberEksInfo); ok && eksInfo != nil {
+				info.EKSInfo = &svcapitypes.EKSInfo{
+					Namespace: eksInfo.Value.Namespace,
+				}
+			}
+			containerProvider.Info = info
+		}
+		if virtualCluster.ContainerProvider.Type != "" {
+			containerProvider.Type = aws.String(string(virtualCluster.ContainerProvider.Type))
+		}
+		ko.Spec.ContainerProvider = containerProvider
+	} else {
+		ko.Spec.ContainerProvider = nil
+	}
+	ko.Status.ID = virtualCluster.Id
+	ko.Spec.Name = virtualCluster.Name
+	if virtualCluster.Tags != nil {
+		ko.Spec.Tags = aws.StringMap(virtualCluster.Tags)
+	} else {
+		ko.Spec.Tags = nil
+	}
+
+	rm.setStatusDefaults(ko)
+	return &resource{ko}
+}
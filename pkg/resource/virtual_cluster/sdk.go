@@ -74,6 +74,9 @@ func (rm *resourceManager) sdkFind(
 	if err != nil {
 		return nil, err
 	}
+	if cached, ok := rm.readOneFromBatchCache(ctx, r); ok {
+		return cached, nil
+	}
 
 	var resp *svcsdk.DescribeVirtualClusterOutput
 	resp, err = rm.sdkapi.DescribeVirtualCluster(ctx, input)
@@ -313,6 +316,7 @@ func (rm *resourceManager) sdkDelete(
 	_ = resp
 	resp, err = rm.sdkapi.DeleteVirtualCluster(ctx, input)
 	rm.metrics.RecordAPICall("DELETE", "DeleteVirtualCluster", err)
+	rm.invalidateBatchCache()
 	return nil, err
 }
 
@@ -0,0 +1,11 @@
+{{- /*
+Overrides the generated kustomization to also install the JobRunSet CRD,
+which controller-gen builds from apis/v1alpha1/job_run_set.go.
+*/ -}}
+apiVersion: kustomize.config.k8s.io/v1beta1
+kind: Kustomization
+resources:
+  - common
+  - bases/emrcontainers.services.k8s.aws_jobruns.yaml
+  - bases/emrcontainers.services.k8s.aws_jobrunsets.yaml
+  - bases/emrcontainers.services.k8s.aws_virtualclusters.yaml
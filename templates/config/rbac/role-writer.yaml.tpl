@@ -0,0 +1,36 @@
+{{- /*
+Overrides the generated Role to also grant access to JobRunSets, which are
+written by hand in pkg/resource/job_run_set and unknown to the generator.
+*/ -}}
+---
+apiVersion: rbac.authorization.k8s.io/v1
+kind: Role
+metadata:
+  creationTimestamp: null
+  name: ack-emrcontainers-writer
+  namespace: default
+rules:
+- apiGroups:
+  - emrcontainers.services.k8s.aws
+  resources:
+  - jobruns
+  - jobrunsets
+  - virtualclusters
+  verbs:
+  - create
+  - delete
+  - get
+  - list
+  - patch
+  - update
+  - watch
+- apiGroups:
+  - emrcontainers.services.k8s.aws
+  resources:
+  - jobruns
+  - jobrunsets
+  - virtualclusters
+  verbs:
+  - get
+  - patch
+  - update
@@ -0,0 +1,43 @@
+{{- /*
+Overrides the generated Role to also grant access to JobRunSets, which are
+written by hand in pkg/resource/job_run_set and unknown to the generator.
+*/ -}}
+---
+apiVersion: rbac.authorization.k8s.io/v1
+kind: Role
+metadata:
+  creationTimestamp: null
+  name: {{ IncludeTemplate "app.fullname" }}-writer
+  namespace: {{ "{{ .Release.Namespace }}" }}
+  labels:
+    app.kubernetes.io/name: {{ IncludeTemplate "app.name" }}
+    app.kubernetes.io/instance: {{ "{{ .Release.Name }}" }}
+    app.kubernetes.io/managed-by: Helm
+    app.kubernetes.io/version: {{ "{{ .Chart.AppVersion | quote }}" }}
+    k8s-app: {{ IncludeTemplate "app.name" }}
+    helm.sh/chart: {{ IncludeTemplate "chart.name-version" }}
+rules:
+- apiGroups:
+  - emrcontainers.services.k8s.aws
+  resources:
+  - jobruns
+  - jobrunsets
+  - virtualclusters
+  verbs:
+  - create
+  - delete
+  - get
+  - list
+  - patch
+  - update
+  - watch
+- apiGroups:
+  - emrcontainers.services.k8s.aws
+  resources:
+  - jobruns
+  - jobrunsets
+  - virtualclusters
+  verbs:
+  - get
+  - patch
+  - update
@@ -0,0 +1 @@
+	rm.invalidateBatchCache(input.VirtualClusterId)
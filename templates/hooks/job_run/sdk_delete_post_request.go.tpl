@@ -1,3 +1,4 @@
+rm.invalidateBatchCache(r.ko.Spec.VirtualClusterID)
 
 // If the job has already reached a state where it has finished we can 
 // consider the delete operation completed.
@@ -0,0 +1,3 @@
+	if cached, ok := rm.readOneFromBatchCache(ctx, r); ok {
+		return cached, nil
+	}
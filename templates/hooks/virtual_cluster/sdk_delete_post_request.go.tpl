@@ -0,0 +1 @@
+	rm.invalidateBatchCache()
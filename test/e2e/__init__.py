@@ -15,8 +15,6 @@ import pytest
 from typing import Dict, Any
 from pathlib import Path
 
-from acktest.resources import load_resource_file
-
 SERVICE_NAME = "emrcontainers"
 CRD_GROUP = "emrcontainers.services.k8s.aws"
 CRD_VERSION = "v1alpha1"
@@ -30,4 +28,7 @@ def load_resource(resource_name: str, additional_replacements: Dict[str, Any] =
     """ Overrides the default `load_resource_file` to access the specific resources
     directory for the current service.
     """
+    # Imported on first use so that collecting the test modules does not pay
+    # for the acktest resource helpers (and the Kubernetes client they pull in).
+    from acktest.resources import load_resource_file
     return load_resource_file(resource_directory, resource_name, additional_replacements=additional_replacements)
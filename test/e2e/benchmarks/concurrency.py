@@ -0,0 +1,436 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Concurrency sweep benchmark for the reconcile settings.
+
+Runs the controller against the emr-containers stand-in, with realistic
+latencies and rate limits, once per combination of
+`reconcile.resourceMaxConcurrentSyncs` and `reconcile.resourceResyncPeriods`
+values for JobRun and VirtualCluster. Each run submits a batch of
+VirtualClusters and JobRuns, measures throughput and p99 time-to-sync, then
+measures the steady-state API call rate once everything has synced. The results
+are written as a Markdown table together with recommended Helm values.
+
+The steady-state window is stretched to cover the longest resync period being
+compared, so that every compared period resyncs at least once inside it. Keep
+the swept periods short (minutes, not the 10 hour chart default) for the
+sweep to finish in reasonable time.
+
+Requires a controller binary (see `e2e.common.controller`) and a Kubernetes API
+server with the CRDs installed. Run it from the `test` directory:
+
+    python -m e2e.benchmarks.concurrency --output sweep.json --table sweep.md
+
+JobRuns are requeued every 15 seconds after a successful sync regardless of
+the resync period, so the JobRun resync period mostly matters for JobRuns in a
+terminal state.
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import statistics
+import sys
+import time
+
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from e2e.common.controller import ControllerProcess
+from e2e.common.workload import (
+    JR_RESOURCE_PLURAL, VC_RESOURCE_PLURAL, WorkloadResult,
+    jobrun_manifests, virtualcluster_manifests,
+    create_resources, delete_resources, wait_for_deleted, wait_for_jobruns,
+)
+from e2e.standin.emrcontainers import EMRContainersStandIn, JobRunTimings
+from e2e.standin.faults import FAULT_PROFILES
+
+DEFAULT_JOBRUN_SYNCS = [1, 5, 10, 25, 50]
+DEFAULT_VIRTUALCLUSTER_SYNCS = [1, 5]
+DEFAULT_JOBRUN_RESYNC_SECONDS = [36000]
+DEFAULT_VIRTUALCLUSTER_RESYNC_SECONDS = [60, 300]
+
+# Resources submitted at each point of the sweep
+DEFAULT_JOBRUNS = 200
+DEFAULT_VIRTUALCLUSTERS = 20
+
+# Minimum time API calls are counted once every resource has synced; see
+# observe_seconds_for
+DEFAULT_OBSERVE_SECONDS = 60
+
+# Time added to the longest compared resync period, so that resyncs due at the
+# end of the period still land inside the steady-state window
+RESYNC_MARGIN_SECONDS = 30
+
+DEFAULT_FAULT_PROFILE = "realistic"
+
+# A setting is considered as fast as the best one when its throughput is within
+# this fraction of it
+THROUGHPUT_TOLERANCE = 0.9
+
+# Highest acceptable fraction of throttled calls during submission
+DEFAULT_MAX_THROTTLE_FRACTION = 0.05
+
+# Highest acceptable steady-state API call rate, in calls per second
+DEFAULT_MAX_STEADY_CALLS_PER_SECOND = 5.0
+
+# Maximum time to wait for a point's resources to sync
+SYNC_TIMEOUT_SECONDS = 1800
+
+# Maximum time to wait for a point's resources to be deleted
+DELETE_TIMEOUT_SECONDS = 600
+
+# Keep JobRuns RUNNING for the whole sweep so that they are all refreshed
+# during the observation window.
+SWEEP_TIMINGS = JobRunTimings(pending=2, submitted=2, running=24 * 3600)
+
+KINDS = ("JobRun", "VirtualCluster")
+
+
+def kind_of_operation(operation: str) -> Optional[str]:
+    """Returns the kind whose reconciles make `operation`, e.g. JobRun for
+    DescribeJobRun and ListJobRuns.
+    """
+    for kind in KINDS:
+        if operation.endswith(kind) or operation.endswith(kind + "s"):
+            return kind
+    return None
+
+
+@dataclass(frozen=True)
+class SweepPoint:
+    jobrun_max_concurrent_syncs: int
+    virtualcluster_max_concurrent_syncs: int
+    jobrun_resync_seconds: int
+    virtualcluster_resync_seconds: int
+
+    def max_concurrent_syncs(self, kind: str) -> int:
+        return self.jobrun_max_concurrent_syncs if kind == "JobRun" else self.virtualcluster_max_concurrent_syncs
+
+    def resync_seconds(self, kind: str) -> int:
+        return self.jobrun_resync_seconds if kind == "JobRun" else self.virtualcluster_resync_seconds
+
+    @property
+    def label(self) -> str:
+        return (
+            f"jr{self.jobrun_max_concurrent_syncs}-vc{self.virtualcluster_max_concurrent_syncs}"
+            f"-jrr{self.jobrun_resync_seconds}-vcr{self.virtualcluster_resync_seconds}"
+        )
+
+
+@dataclass
+class KindResult:
+    count: int
+    synced: int
+    throughput: float
+    time_to_sync_p99_seconds: Optional[float]
+    # Steady-state rate of the calls made for this kind
+    steady_calls_per_second: float = 0.0
+
+    @classmethod
+    def from_workload(cls, result: WorkloadResult, steady_calls_per_second: float = 0.0) -> "KindResult":
+        return cls(
+            result.count, result.synced, result.throughput, result.time_to_sync_percentile(99),
+            round(steady_calls_per_second, 3),
+        )
+
+
+@dataclass
+class SweepResult:
+    point: SweepPoint
+    kinds: Dict[str, KindResult]
+    submit_seconds: float
+    submit_calls_per_second: float
+    throttle_fraction: float
+    steady_calls_per_second: float
+    calls: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def all_synced(self) -> bool:
+        return all(result.synced == result.count for result in self.kinds.values())
+
+
+@dataclass
+class KindRecommendation:
+    kind: str
+    max_concurrent_syncs: int
+    resync_seconds: int
+    reason: str
+
+
+def sweep_points(
+    jobrun_syncs: List[int] = DEFAULT_JOBRUN_SYNCS,
+    virtualcluster_syncs: List[int] = DEFAULT_VIRTUALCLUSTER_SYNCS,
+    jobrun_resync_seconds: List[int] = DEFAULT_JOBRUN_RESYNC_SECONDS,
+    virtualcluster_resync_seconds: List[int] = DEFAULT_VIRTUALCLUSTER_RESYNC_SECONDS,
+) -> List[SweepPoint]:
+    """Returns every combination of the given values.
+    """
+    return [
+        SweepPoint(*values) for values in itertools.product(
+            jobrun_syncs, virtualcluster_syncs, jobrun_resync_seconds, virtualcluster_resync_seconds,
+        )
+    ]
+
+
+def observe_seconds_for(points: List[SweepPoint], minimum: float = DEFAULT_OBSERVE_SECONDS) -> float:
+    """Returns how long to observe the steady state of every point so that the
+    window covers the longest resync period compared by the sweep. A kind whose
+    resync period takes a single value is not compared and does not stretch the
+    window.
+    """
+    longest = 0
+    for kind in KINDS:
+        periods = {point.resync_seconds(kind) for point in points}
+        if len(periods) > 1:
+            longest = max(longest, max(periods))
+    if not longest:
+        return minimum
+    return max(minimum, longest + RESYNC_MARGIN_SECONDS)
+
+
+def run_point(
+    standin: EMRContainersStandIn,
+    point: SweepPoint,
+    jobruns: int = DEFAULT_JOBRUNS,
+    virtualclusters: int = DEFAULT_VIRTUALCLUSTERS,
+    observe_seconds: float = DEFAULT_OBSERVE_SECONDS,
+) -> SweepResult:
+    """Runs one point of the sweep against a fresh controller process.
+    """
+    workload_id = f"sweep-{point.label}"[:63]
+    vc_id = standin.seed_virtual_cluster(workload_id)
+    controller = ControllerProcess(
+        endpoint_url=standin.endpoint_url,
+        region=standin.region,
+        max_concurrent_syncs={kind: point.max_concurrent_syncs(kind) for kind in KINDS},
+        resync_seconds={kind: point.resync_seconds(kind) for kind in KINDS},
+        name=f"sweep-{point.label}",
+    )
+    with controller:
+        try:
+            standin.reset_counters()
+            started = time.monotonic()
+            created_vcs = create_resources(VC_RESOURCE_PLURAL, virtualcluster_manifests(workload_id, virtualclusters))
+            created_jrs = create_resources(JR_RESOURCE_PLURAL, jobrun_manifests(workload_id, vc_id, jobruns))
+            vc_result = wait_for_jobruns(
+                workload_id, created_vcs, SYNC_TIMEOUT_SECONDS, started=started, plural=VC_RESOURCE_PLURAL,
+            )
+            jr_result = wait_for_jobruns(workload_id, created_jrs, SYNC_TIMEOUT_SECONDS, started=started)
+            submit_seconds = time.monotonic() - started
+            submit_counters = standin.counters()
+
+            standin.reset_counters()
+            time.sleep(observe_seconds)
+            steady_counters = standin.counters()
+        finally:
+            # The controller must still run to remove the finalizers, or the
+            # next point's controller spends its calls on this point's CRs.
+            delete_resources(JR_RESOURCE_PLURAL, workload_id)
+            delete_resources(VC_RESOURCE_PLURAL, workload_id)
+            wait_for_deleted(JR_RESOURCE_PLURAL, workload_id, timeout=DELETE_TIMEOUT_SECONDS)
+            wait_for_deleted(VC_RESOURCE_PLURAL, workload_id, timeout=DELETE_TIMEOUT_SECONDS)
+
+    steady_by_kind = {kind: 0 for kind in KINDS}
+    for operation, count in steady_counters["calls"].items():
+        kind = kind_of_operation(operation)
+        if kind is not None:
+            steady_by_kind[kind] += count
+
+    return SweepResult(
+        point=point,
+        kinds={
+            "JobRun": KindResult.from_workload(jr_result, steady_by_kind["JobRun"] / observe_seconds),
+            "VirtualCluster": KindResult.from_workload(vc_result, steady_by_kind["VirtualCluster"] / observe_seconds),
+        },
+        submit_seconds=round(submit_seconds, 3),
+        submit_calls_per_second=round(submit_counters["total_calls"] / max(submit_seconds, 1e-9), 3),
+        throttle_fraction=round(submit_counters["total_faulted"] / max(1, submit_counters["total_calls"]), 4),
+        steady_calls_per_second=round(steady_counters["total_calls"] / observe_seconds, 3),
+        calls=submit_counters["calls"],
+    )
+
+
+def _median_by(results: List[SweepResult], key, value) -> Dict[int, float]:
+    grouped: Dict[int, List[float]] = {}
+    for result in results:
+        measured = value(result)
+        if measured is not None:
+            grouped.setdefault(key(result), []).append(measured)
+    return {k: statistics.median(v) for k, v in grouped.items()}
+
+
+def recommend(
+    results: List[SweepResult],
+    max_throttle_fraction: float = DEFAULT_MAX_THROTTLE_FRACTION,
+    max_steady_calls_per_second: float = DEFAULT_MAX_STEADY_CALLS_PER_SECOND,
+) -> List[KindRecommendation]:
+    """Picks, for each kind, the lowest concurrency that reaches
+    `THROUGHPUT_TOLERANCE` of the best throughput without exceeding
+    `max_throttle_fraction`, and the shortest resync period whose steady-state
+    call rate for that kind stays within `max_steady_calls_per_second`. Values are compared
+    using the median over the other axes of the sweep. The steady-state rates
+    are only comparable if they were observed over a window covering every
+    compared resync period, as `run_sweep` does.
+    """
+    results = [result for result in results if result.all_synced]
+    recommendations = []
+    for kind in KINDS:
+        syncs = lambda result: result.point.max_concurrent_syncs(kind)
+        resync = lambda result: result.point.resync_seconds(kind)
+        throughput = _median_by(results, syncs, lambda result: result.kinds[kind].throughput)
+        throttling = _median_by(results, syncs, lambda result: result.throttle_fraction)
+        steady = _median_by(results, resync, lambda result: result.kinds[kind].steady_calls_per_second)
+        if not throughput or not steady:
+            continue
+
+        best = max(throughput.values())
+        acceptable = [
+            value for value in sorted(throughput)
+            if throughput[value] >= THROUGHPUT_TOLERANCE * best and throttling[value] <= max_throttle_fraction
+        ]
+        if acceptable:
+            chosen_syncs = acceptable[0]
+            reason = (
+                f"{throughput[chosen_syncs]:.2f}/s, within {THROUGHPUT_TOLERANCE:.0%} of the best "
+                f"({best:.2f}/s) at {throttling[chosen_syncs]:.1%} throttled calls"
+            )
+        else:
+            chosen_syncs = min(throttling, key=lambda value: (throttling[value], -throughput[value]))
+            reason = (
+                f"no value stayed under {max_throttle_fraction:.0%} throttled calls; "
+                f"least throttled is {throttling[chosen_syncs]:.1%} at {throughput[chosen_syncs]:.2f}/s"
+            )
+
+        within_budget = [value for value in sorted(steady) if steady[value] <= max_steady_calls_per_second]
+        chosen_resync = within_budget[0] if within_budget else max(steady)
+        reason += f"; {steady[chosen_resync]:.2f} steady-state calls/s at a {chosen_resync}s resync"
+        recommendations.append(KindRecommendation(kind, chosen_syncs, chosen_resync, reason))
+    return recommendations
+
+
+def render_table(results: List[SweepResult], recommendations: List[KindRecommendation]) -> str:
+    """Renders the results and recommendations as Markdown.
+    """
+    lines = [
+        "| JobRun syncs | VC syncs | JobRun resync (s) | VC resync (s) "
+        "| JobRun/s | JobRun p99 (s) | VC/s | VC p99 (s) "
+        "| submit calls/s | throttled | steady calls/s | all synced |",
+        "|---:|---:|---:|---:|---:|---:|---:|---:|---:|---:|---:|:---:|",
+    ]
+
+    def fmt(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value:.2f}"
+
+    for result in results:
+        point, jr, vc = result.point, result.kinds["JobRun"], result.kinds["VirtualCluster"]
+        lines.append(
+            f"| {point.jobrun_max_concurrent_syncs} | {point.virtualcluster_max_concurrent_syncs} "
+            f"| {point.jobrun_resync_seconds} | {point.virtualcluster_resync_seconds} "
+            f"| {fmt(jr.throughput)} | {fmt(jr.time_to_sync_p99_seconds)} "
+            f"| {fmt(vc.throughput)} | {fmt(vc.time_to_sync_p99_seconds)} "
+            f"| {fmt(result.submit_calls_per_second)} | {result.throttle_fraction:.1%} "
+            f"| {fmt(result.steady_calls_per_second)} | {'yes' if result.all_synced else 'no'} |"
+        )
+
+    lines += ["", "## Recommendation", ""]
+    if not recommendations:
+        lines.append("No point of the sweep synced every resource; no recommendation.")
+        return "\n".join(lines) + "\n"
+    for recommendation in recommendations:
+        lines.append(
+            f"- **{recommendation.kind}**: {recommendation.max_concurrent_syncs} concurrent syncs, "
+            f"{recommendation.resync_seconds}s resync ({recommendation.reason})"
+        )
+    lines += ["", "```yaml", "reconcile:", "  resourceMaxConcurrentSyncs:"]
+    lines += [f"    {r.kind}: {r.max_concurrent_syncs}" for r in recommendations]
+    lines += ["  resourceResyncPeriods:"]
+    lines += [f"    {r.kind}: {r.resync_seconds}" for r in recommendations]
+    lines += ["```"]
+    return "\n".join(lines) + "\n"
+
+
+def run_sweep(
+    points: List[SweepPoint],
+    jobruns: int = DEFAULT_JOBRUNS,
+    virtualclusters: int = DEFAULT_VIRTUALCLUSTERS,
+    observe_seconds: float = DEFAULT_OBSERVE_SECONDS,
+    fault_profile: str = DEFAULT_FAULT_PROFILE,
+) -> List[SweepResult]:
+    """Runs every point of the sweep against a single stand-in. The
+    steady-state window is `observe_seconds`, stretched by `observe_seconds_for`
+    when the sweep compares longer resync periods.
+    """
+    observe_seconds = observe_seconds_for(points, observe_seconds)
+    logging.info("observing the steady state of each point for %ss", observe_seconds)
+    results = []
+    with EMRContainersStandIn(timings=SWEEP_TIMINGS) as standin:
+        standin.faults.configure_from_dict(FAULT_PROFILES[fault_profile])
+        for point in points:
+            logging.info("sweep point %s", point.label)
+            result = run_point(standin, point, jobruns, virtualclusters, observe_seconds)
+            logging.info(
+                "%s: %.2f JobRuns/s, p99 %s s, %.2f steady calls/s",
+                point.label, result.kinds["JobRun"].throughput,
+                result.kinds["JobRun"].time_to_sync_p99_seconds, result.steady_calls_per_second,
+            )
+            results.append(result)
+    return results
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.getLogger().setLevel(logging.INFO)
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobrun-syncs", type=_int_list, default=DEFAULT_JOBRUN_SYNCS)
+    parser.add_argument("--virtualcluster-syncs", type=_int_list, default=DEFAULT_VIRTUALCLUSTER_SYNCS)
+    parser.add_argument("--jobrun-resync-seconds", type=_int_list, default=DEFAULT_JOBRUN_RESYNC_SECONDS)
+    parser.add_argument("--virtualcluster-resync-seconds", type=_int_list, default=DEFAULT_VIRTUALCLUSTER_RESYNC_SECONDS)
+    parser.add_argument("--jobruns", type=int, default=DEFAULT_JOBRUNS)
+    parser.add_argument("--virtualclusters", type=int, default=DEFAULT_VIRTUALCLUSTERS)
+    parser.add_argument("--observe-seconds", type=float, default=DEFAULT_OBSERVE_SECONDS,
+        help="minimum steady-state window; stretched to cover the longest compared resync period")
+    parser.add_argument("--fault-profile", choices=sorted(FAULT_PROFILES), default=DEFAULT_FAULT_PROFILE)
+    parser.add_argument("--max-throttle-fraction", type=float, default=DEFAULT_MAX_THROTTLE_FRACTION)
+    parser.add_argument("--max-steady-calls-per-second", type=float, default=DEFAULT_MAX_STEADY_CALLS_PER_SECOND)
+    parser.add_argument("--output", type=Path, help="write the results as JSON to this file")
+    parser.add_argument("--table", type=Path, help="write the Markdown table to this file")
+    args = parser.parse_args(argv)
+
+    points = sweep_points(
+        args.jobrun_syncs, args.virtualcluster_syncs,
+        args.jobrun_resync_seconds, args.virtualcluster_resync_seconds,
+    )
+    results = run_sweep(points, args.jobruns, args.virtualclusters, args.observe_seconds, args.fault_profile)
+    recommendations = recommend(results, args.max_throttle_fraction, args.max_steady_calls_per_second)
+
+    table = render_table(results, recommendations)
+    print(table)
+    if args.table:
+        args.table.write_text(table)
+    if args.output:
+        args.output.write_text(json.dumps({
+            "results": [asdict(result) for result in results],
+            "recommendations": [asdict(recommendation) for recommendation in recommendations],
+        }, indent=2))
+    return 0 if recommendations else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,334 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Throughput scaling benchmark for sharded controller deployments.
+
+Spreads a batch of JobRuns across several namespaces and runs it against K
+controller shards, for each K in the sweep. Each shard is a separate controller
+process configured the way the `sharding` section of the Helm chart deploys it
+(see `e2e.common.sharding`), all pointing at the same emr-containers stand-in
+and the API server of the current kubeconfig. For each K the benchmark
+measures the aggregate throughput and p99 time-to-sync, and for each shard the
+JobRuns it synced and its emr-containers API call rate. Shards are told apart
+in the stand-in by giving each one its own access key ID.
+
+Requires a controller binary (see `e2e.common.controller`) and a Kubernetes API
+server with the CRDs installed. Run it from the `test` directory:
+
+    python -m e2e.benchmarks.sharding --output sharding.json --table sharding.md
+
+All shards share the stand-in's rate limits, so with the "realistic" fault
+profile throughput stops growing once StartJobRun is throttled.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from e2e.common.controller import ControllerProcess
+from e2e.common.sharding import (
+    MODES, NAMESPACE_MODE, DEFAULT_BUCKETS,
+    label_bucket, shard_name, shard_namespaces, shard_buckets, shard_selector,
+)
+from e2e.common.workload import (
+    JR_RESOURCE_PLURAL,
+    jobrun_manifests, create_resources, delete_resources, ensure_namespaces, wait_for_deleted, wait_for_jobruns,
+)
+from e2e.standin.emrcontainers import EMRContainersStandIn, JobRunTimings
+from e2e.standin.faults import FAULT_PROFILES
+
+DEFAULT_SHARDS = list(range(1, 9))
+
+# JobRuns submitted for each shard count, spread evenly over the namespaces
+DEFAULT_JOBRUNS = 400
+
+# Enough namespaces to split evenly between 1, 2, 3, 4, 6 and 8 shards
+DEFAULT_NAMESPACES = 24
+NAMESPACE_PREFIX = "emr-shard-bench"
+
+# reconcile.resourceMaxConcurrentSyncs.JobRun of every shard
+DEFAULT_JOBRUN_SYNCS = 1
+
+DEFAULT_FAULT_PROFILE = "realistic"
+
+# Maximum time to wait for a shard count's JobRuns to sync
+SYNC_TIMEOUT_SECONDS = 1800
+
+# Maximum time to wait for a shard count's JobRuns to be deleted
+DELETE_TIMEOUT_SECONDS = 600
+
+# Keep JobRuns RUNNING for the whole run, so that refreshes of earlier JobRuns
+# compete with the submission of later ones the same way for every K.
+SHARDING_TIMINGS = JobRunTimings(pending=2, submitted=2, running=24 * 3600)
+
+
+@dataclass
+class ShardResult:
+    shard: int
+    jobruns: int
+    synced: int
+    calls: int
+    calls_per_second: float
+    # Namespaces (namespace mode) or label buckets (label mode) of the shard
+    watches: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ShardingResult:
+    shards: int
+    mode: str
+    count: int
+    synced: int
+    elapsed_seconds: float
+    throughput: float
+    time_to_sync_p99_seconds: Optional[float]
+    calls_per_second: float
+    throttle_fraction: float
+    per_shard: List[ShardResult] = field(default_factory=list)
+
+    @property
+    def all_synced(self) -> bool:
+        return self.synced == self.count
+
+
+def namespace_names(count: int = DEFAULT_NAMESPACES, prefix: str = NAMESPACE_PREFIX) -> List[str]:
+    return [f"{prefix}-{i:02d}" for i in range(count)]
+
+
+def shard_controllers(
+    standin: EMRContainersStandIn,
+    shards: int,
+    mode: str,
+    namespaces: List[str],
+    buckets: int = DEFAULT_BUCKETS,
+    jobrun_syncs: int = DEFAULT_JOBRUN_SYNCS,
+) -> List[ControllerProcess]:
+    """Returns one controller process per shard, configured with the watch
+    namespaces or selectors the Helm chart gives that shard.
+    """
+    controllers = []
+    for shard in range(shards):
+        if mode == NAMESPACE_MODE:
+            watch_namespace, watch_selectors = ",".join(shard_namespaces(namespaces, shards, shard)), ""
+        else:
+            watch_namespace, watch_selectors = "", shard_selector(shards, shard, buckets)
+        controllers.append(ControllerProcess(
+            endpoint_url=standin.endpoint_url,
+            region=standin.region,
+            watch_namespace=watch_namespace,
+            watch_selectors=watch_selectors,
+            max_concurrent_syncs={"JobRun": jobrun_syncs},
+            extra_args=["--shard-name", shard_name(shard)],
+            extra_env={"AWS_ACCESS_KEY_ID": shard_name(shard)},
+            name=f"sharding-{shards}-{shard_name(shard)}",
+        ))
+    return controllers
+
+
+def run_point(
+    standin: EMRContainersStandIn,
+    shards: int,
+    mode: str = NAMESPACE_MODE,
+    jobruns: int = DEFAULT_JOBRUNS,
+    namespaces: Optional[List[str]] = None,
+    buckets: int = DEFAULT_BUCKETS,
+    jobrun_syncs: int = DEFAULT_JOBRUN_SYNCS,
+) -> ShardingResult:
+    """Runs the batch against `shards` fresh controller processes.
+    """
+    namespaces = namespaces or namespace_names()
+    workload_id = f"sharding-{mode}-{shards}"
+    vc_id = standin.seed_virtual_cluster(workload_id)
+
+    # The shard that owns each JobRun, by name
+    owner: Dict[str, int] = {}
+
+    def assign(i: int, manifest: Dict):
+        manifest["metadata"]["namespace"] = namespaces[i % len(namespaces)]
+        if mode == NAMESPACE_MODE:
+            # Namespaces are dealt out round-robin, see shard_namespaces
+            owner[manifest["metadata"]["name"]] = (i % len(namespaces)) % shards
+        else:
+            owner[manifest["metadata"]["name"]] = label_bucket(manifest, buckets) % shards
+
+    manifests = jobrun_manifests(workload_id, vc_id, jobruns, mutate=assign)
+    controllers = shard_controllers(standin, shards, mode, namespaces, buckets, jobrun_syncs)
+    try:
+        for controller in controllers:
+            controller.start(wait=False)
+        for controller in controllers:
+            controller.wait_ready()
+
+        standin.reset_counters()
+        started = time.monotonic()
+        created = create_resources(JR_RESOURCE_PLURAL, manifests)
+        result = wait_for_jobruns(workload_id, created, SYNC_TIMEOUT_SECONDS, namespace=None, started=started)
+        counters = standin.counters()
+    finally:
+        # Delete while the shards run, so that they remove the finalizers and
+        # the next point's shards do not spend calls on this batch.
+        try:
+            delete_resources(JR_RESOURCE_PLURAL, workload_id, namespaces)
+            wait_for_deleted(JR_RESOURCE_PLURAL, workload_id, namespaces, DELETE_TIMEOUT_SECONDS)
+        finally:
+            for controller in controllers:
+                controller.stop()
+
+    elapsed = max(result.elapsed_seconds, 1e-9)
+    per_shard = []
+    for shard in range(shards):
+        calls = counters["calls_by_caller"].get(shard_name(shard), 0)
+        if mode == NAMESPACE_MODE:
+            watches = shard_namespaces(namespaces, shards, shard)
+        else:
+            watches = [str(bucket) for bucket in shard_buckets(shards, shard, buckets)]
+        per_shard.append(ShardResult(
+            shard=shard,
+            jobruns=sum(1 for s in owner.values() if s == shard),
+            synced=sum(1 for name in result.time_to_sync if owner[name] == shard),
+            calls=calls,
+            calls_per_second=round(calls / elapsed, 3),
+            watches=watches,
+        ))
+
+    return ShardingResult(
+        shards=shards,
+        mode=mode,
+        count=result.count,
+        synced=result.synced,
+        elapsed_seconds=round(result.elapsed_seconds, 3),
+        throughput=round(result.throughput, 3),
+        time_to_sync_p99_seconds=result.time_to_sync_percentile(99),
+        calls_per_second=round(counters["total_calls"] / elapsed, 3),
+        throttle_fraction=round(counters["total_faulted"] / max(1, counters["total_calls"]), 4),
+        per_shard=per_shard,
+    )
+
+
+def speedups(results: List[ShardingResult]) -> Dict[int, float]:
+    """Returns the throughput of each shard count relative to the smallest one
+    in the results.
+    """
+    if not results:
+        return {}
+    baseline = min(results, key=lambda result: result.shards)
+    if baseline.throughput <= 0:
+        return {}
+    return {result.shards: round(result.throughput / baseline.throughput, 3) for result in results}
+
+
+def render_table(results: List[ShardingResult]) -> str:
+    """Renders the aggregate and per-shard results as Markdown.
+    """
+    speedup = speedups(results)
+
+    def fmt(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value:.2f}"
+
+    lines = [
+        "| shards | JobRun/s | speedup | efficiency | p99 (s) | calls/s | throttled "
+        "| shard calls/s (min-max) | all synced |",
+        "|---:|---:|---:|---:|---:|---:|---:|---:|:---:|",
+    ]
+    for result in results:
+        rates = [shard.calls_per_second for shard in result.per_shard]
+        ratio = speedup.get(result.shards)
+        efficiency = ratio / result.shards if ratio is not None else None
+        lines.append(
+            f"| {result.shards} | {fmt(result.throughput)} | {fmt(ratio)} "
+            f"| {'-' if efficiency is None else f'{efficiency:.0%}'} "
+            f"| {fmt(result.time_to_sync_p99_seconds)} | {fmt(result.calls_per_second)} "
+            f"| {result.throttle_fraction:.1%} | {fmt(min(rates))}-{fmt(max(rates))} "
+            f"| {'yes' if result.all_synced else 'no'} |"
+        )
+
+    lines += ["", "## Per shard", "", "| shards | shard | JobRuns | synced | calls | calls/s |", "|---:|---:|---:|---:|---:|---:|"]
+    for result in results:
+        for shard in result.per_shard:
+            lines.append(
+                f"| {result.shards} | {shard.shard} | {shard.jobruns} | {shard.synced} "
+                f"| {shard.calls} | {fmt(shard.calls_per_second)} |"
+            )
+    return "\n".join(lines) + "\n"
+
+
+def run_sweep(
+    shard_counts: List[int] = DEFAULT_SHARDS,
+    mode: str = NAMESPACE_MODE,
+    jobruns: int = DEFAULT_JOBRUNS,
+    namespace_count: int = DEFAULT_NAMESPACES,
+    buckets: int = DEFAULT_BUCKETS,
+    jobrun_syncs: int = DEFAULT_JOBRUN_SYNCS,
+    fault_profile: str = DEFAULT_FAULT_PROFILE,
+) -> List[ShardingResult]:
+    """Runs the batch once per shard count against a single stand-in.
+    """
+    namespaces = namespace_names(namespace_count)
+    ensure_namespaces(namespaces)
+    results = []
+    with EMRContainersStandIn(timings=SHARDING_TIMINGS) as standin:
+        standin.faults.configure_from_dict(FAULT_PROFILES[fault_profile])
+        for shards in shard_counts:
+            logging.info("%d shards, %s mode", shards, mode)
+            result = run_point(standin, shards, mode, jobruns, namespaces, buckets, jobrun_syncs)
+            logging.info(
+                "%d shards: %.2f JobRuns/s, p99 %s s, %.2f calls/s",
+                shards, result.throughput, result.time_to_sync_p99_seconds, result.calls_per_second,
+            )
+            results.append(result)
+    return results
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.getLogger().setLevel(logging.INFO)
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shards", type=_int_list, default=DEFAULT_SHARDS)
+    parser.add_argument("--mode", choices=MODES, default=NAMESPACE_MODE)
+    parser.add_argument("--jobruns", type=int, default=DEFAULT_JOBRUNS)
+    parser.add_argument("--namespaces", type=int, default=DEFAULT_NAMESPACES)
+    parser.add_argument("--buckets", type=int, default=DEFAULT_BUCKETS)
+    parser.add_argument("--jobrun-syncs", type=int, default=DEFAULT_JOBRUN_SYNCS)
+    parser.add_argument("--fault-profile", choices=sorted(FAULT_PROFILES), default=DEFAULT_FAULT_PROFILE)
+    parser.add_argument("--output", type=Path, help="write the results as JSON to this file")
+    parser.add_argument("--table", type=Path, help="write the Markdown table to this file")
+    args = parser.parse_args(argv)
+
+    results = run_sweep(
+        args.shards, args.mode, args.jobruns, args.namespaces, args.buckets, args.jobrun_syncs, args.fault_profile,
+    )
+
+    table = render_table(results)
+    print(table)
+    if args.table:
+        args.table.write_text(table)
+    if args.output:
+        args.output.write_text(json.dumps({
+            "results": [asdict(result) for result in results],
+            "speedups": speedups(results),
+        }, indent=2))
+    return 0 if all(result.all_synced for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
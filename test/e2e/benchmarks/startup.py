@@ -0,0 +1,214 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Startup benchmark for the e2e test harness.
+
+Records the `python -X importtime` totals for the harness modules and the wall
+time of `pytest --collect-only`, and fails when either regresses past its
+threshold. Run it from the `test` directory:
+
+    python -m e2e.benchmarks.startup --output startup.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Directory that contains the `e2e` package. Subprocesses are run from here so
+# that `e2e` is importable exactly as it is under the test runner.
+TEST_ROOT = Path(__file__).parent.parent.parent
+
+# Modules whose import cost is measured. Collecting the test modules imports
+# all of them, so any heavy dependency added at module level shows up here.
+DEFAULT_MODULES = [
+    "e2e",
+    "e2e.bootstrap_resources",
+    "e2e.bootstrappable.emr_eks_cluster",
+    "e2e.tests.test_jobrun",
+    "e2e.tests.test_virtualcluster",
+]
+
+# Thresholds, in seconds. Both can be overridden with environment variables so
+# that slower CI hosts can loosen them without a code change.
+DEFAULT_MAX_IMPORT_SECONDS = float(os.environ.get("EMR_E2E_MAX_IMPORT_SECONDS", "2.0"))
+DEFAULT_MAX_COLLECT_SECONDS = float(os.environ.get("EMR_E2E_MAX_COLLECT_SECONDS", "6.0"))
+
+# Number of samples taken for each measurement. The median is reported.
+DEFAULT_REPEAT = 3
+
+# Number of slowest imports reported for each module.
+TOP_IMPORTS = 10
+
+
+@dataclass
+class ImportTimeResult:
+    module: str
+    # Sum of the `self` column, i.e. everything imported by the interpreter
+    # while importing `module`, including the interpreter's own startup modules
+    total_seconds: float
+    # The `cumulative` column for `module` itself
+    module_seconds: float
+    # The slowest imports, as (package, cumulative seconds)
+    slowest: List[Tuple[str, float]] = field(default_factory=list)
+
+
+@dataclass
+class StartupReport:
+    imports: List[ImportTimeResult]
+    collect_seconds: float
+    max_import_seconds: float
+    max_collect_seconds: float
+    failures: List[str] = field(default_factory=list)
+
+    @property
+    def passed(self) -> bool:
+        return not self.failures
+
+    def to_dict(self) -> Dict:
+        report = asdict(self)
+        report["passed"] = self.passed
+        return report
+
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[int, int]]:
+    """Parses the output of `python -X importtime` into a mapping of package
+    name to (self, cumulative) microseconds.
+    """
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0].strip())
+            cumulative_us = int(parts[1].strip())
+        except ValueError:
+            # Header line
+            continue
+        timings[parts[2].strip()] = (self_us, cumulative_us)
+    return timings
+
+
+def measure_import_time(module: str) -> ImportTimeResult:
+    """Imports `module` in a fresh interpreter with `-X importtime` and
+    summarises the timings.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=TEST_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    timings = parse_importtime(proc.stderr)
+    total_us = sum(self_us for self_us, _ in timings.values())
+    module_us = timings.get(module, (0, 0))[1]
+    slowest = sorted(
+        ((name, cumulative / 1e6) for name, (_, cumulative) in timings.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )[:TOP_IMPORTS]
+    return ImportTimeResult(module, total_us / 1e6, module_us / 1e6, slowest)
+
+
+def measure_collect_time(test_path: str = "e2e/tests") -> float:
+    """Returns the wall time, in seconds, of `pytest --collect-only` over
+    `test_path`.
+    """
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-m", "pytest", "--collect-only", "-q", "-p", "no:cacheprovider", test_path],
+        cwd=TEST_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"collecting {test_path} failed:\n{proc.stdout[-2000:]}")
+    return elapsed
+
+
+def _median_import_time(module: str, repeat: int) -> ImportTimeResult:
+    samples = [measure_import_time(module) for _ in range(repeat)]
+    samples.sort(key=lambda result: result.total_seconds)
+    return samples[len(samples) // 2]
+
+
+def run_benchmark(
+    modules: Optional[List[str]] = None,
+    max_import_seconds: float = DEFAULT_MAX_IMPORT_SECONDS,
+    max_collect_seconds: float = DEFAULT_MAX_COLLECT_SECONDS,
+    repeat: int = DEFAULT_REPEAT,
+) -> StartupReport:
+    """Measures import and collection time and compares them against the
+    thresholds.
+    """
+    imports = [_median_import_time(module, repeat) for module in (modules or DEFAULT_MODULES)]
+    collect_seconds = statistics.median(measure_collect_time() for _ in range(repeat))
+
+    report = StartupReport(imports, collect_seconds, max_import_seconds, max_collect_seconds)
+    for result in imports:
+        if result.total_seconds > max_import_seconds:
+            slowest = ", ".join(f"{name} ({seconds:.2f}s)" for name, seconds in result.slowest[:3])
+            report.failures.append(
+                f"importing {result.module} took {result.total_seconds:.2f}s "
+                f"(threshold {max_import_seconds:.2f}s); slowest: {slowest}"
+            )
+    if collect_seconds > max_collect_seconds:
+        report.failures.append(
+            f"pytest --collect-only took {collect_seconds:.2f}s "
+            f"(threshold {max_collect_seconds:.2f}s)"
+        )
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.getLogger().setLevel(logging.INFO)
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", action="append", dest="modules",
+        help="module to measure (repeatable, defaults to the harness modules)")
+    parser.add_argument("--max-import-seconds", type=float, default=DEFAULT_MAX_IMPORT_SECONDS)
+    parser.add_argument("--max-collect-seconds", type=float, default=DEFAULT_MAX_COLLECT_SECONDS)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--output", type=Path, help="write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.modules, args.max_import_seconds, args.max_collect_seconds, args.repeat)
+
+    for result in report.imports:
+        logging.info("import %s: total %.3fs, module %.3fs", result.module, result.total_seconds, result.module_seconds)
+    logging.info("collect: %.3fs", report.collect_seconds)
+    if args.output:
+        args.output.write_text(json.dumps(report.to_dict(), indent=2))
+
+    for failure in report.failures:
+        logging.error(failure)
+    return 0 if report.passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
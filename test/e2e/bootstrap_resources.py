@@ -16,19 +16,21 @@ for them.
 """
 
 from dataclasses import dataclass
+from typing import Union
 
 from acktest.bootstrapping.s3 import Bucket
 from acktest.bootstrapping import Resources
 from acktest.bootstrapping.iam import Role
 from e2e import bootstrap_directory
 from e2e.bootstrappable.emr_eks_cluster import EMREnabledEKSCluster
+from e2e.bootstrappable.local_cluster import LocalEMRCluster, StandInBucket, StandInRole
 
 @dataclass
 class BootstrapResources(Resources):
-    JobExecutionRole: Role
-    EMREKSS3BucketName: Bucket
-    HostCluster_VC: EMREnabledEKSCluster
-    HostCluster_JR: EMREnabledEKSCluster
+    JobExecutionRole: Union[Role, StandInRole]
+    EMREKSS3BucketName: Union[Bucket, StandInBucket]
+    HostCluster_VC: Union[EMREnabledEKSCluster, LocalEMRCluster]
+    HostCluster_JR: Union[EMREnabledEKSCluster, LocalEMRCluster]
 
 _bootstrap_resources = None
 
@@ -37,3 +39,9 @@ def get_bootstrap_resources(bootstrap_file_name: str = "bootstrap.pkl") -> Boots
     if _bootstrap_resources is None:
         _bootstrap_resources = BootstrapResources.deserialize(bootstrap_directory, bootstrap_file_name=bootstrap_file_name)
     return _bootstrap_resources
+
+def uses_local_cluster() -> bool:
+    """Whether the host clusters were bootstrapped locally, in which case the
+    tests run against the AWS API stand-ins.
+    """
+    return isinstance(get_bootstrap_resources().HostCluster_VC, LocalEMRCluster)
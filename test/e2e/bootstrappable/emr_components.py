@@ -0,0 +1,120 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Installs the Kubernetes-side components EMR on EKS needs into a host
+cluster: the EMR namespace, the `emr-containers` Role and RoleBinding, and the
+aws-auth mapping for the EMR service-linked role.
+
+Shared by the EKS-backed and the local host-cluster bootstrappables so both
+exercise the same code path.
+"""
+
+EMR_K8S_ROLE_NAME = "emr-containers"
+EMR_K8S_USER_NAME = "emr-containers"
+
+AWS_AUTH_NAMESPACE = "kube-system"
+AWS_AUTH_CONFIG_MAP_NAME = "aws-auth"
+
+
+def install_emr_components(api_client, emr_namespace: str, emr_role_arn: str):
+    """Creates the EMR namespace and RBAC, and maps `emr_role_arn` to the EMR
+    Kubernetes user in the aws-auth ConfigMap. Safe to call repeatedly.
+    """
+    import kubernetes
+    import yaml
+
+    core_v1 = kubernetes.client.CoreV1Api(api_client)
+
+    # Create the EMR namespace
+    namespaces = core_v1.list_namespace()
+    if not any(ns.metadata.name == emr_namespace for ns in namespaces.items):
+        emr_ns = kubernetes.client.V1Namespace(metadata=kubernetes.client.V1ObjectMeta(name=emr_namespace))
+        core_v1.create_namespace(emr_ns)
+
+    rbac_v1 = kubernetes.client.RbacAuthorizationV1Api(api_client)
+
+    # Create the EMR RBAC
+    roles = rbac_v1.list_namespaced_role(emr_namespace)
+    if not any(role.metadata.name == EMR_K8S_ROLE_NAME for role in roles.items):
+        rbac_v1.create_namespaced_role(emr_namespace, kubernetes.client.V1Role(
+            metadata=kubernetes.client.V1ObjectMeta(name=EMR_K8S_ROLE_NAME, namespace=emr_namespace),
+            rules=[
+                kubernetes.client.V1PolicyRule(
+                    api_groups=[""],
+                    resources=["namespaces"],
+                    verbs=["get"],
+                ),
+                kubernetes.client.V1PolicyRule(
+                    api_groups=[""],
+                    resources=["serviceaccounts", "services", "configmaps", "events", "pods", "pods/log"],
+                    verbs=["get", "list", "watch", "describe", "create", "edit", "delete", "deletecollection", "annotate", "patch", "label"],
+                ),
+                kubernetes.client.V1PolicyRule(
+                    api_groups=[""],
+                    resources=["secrets"],
+                    verbs=["create", "patch", "delete", "watch"],
+                ),
+                kubernetes.client.V1PolicyRule(
+                    api_groups=["apps"],
+                    resources=["statefulsets", "deployments"],
+                    verbs=["get", "list", "watch", "describe", "create", "edit", "delete", "annotate", "patch", "label"],
+                ),
+                kubernetes.client.V1PolicyRule(
+                    api_groups=["batch"],
+                    resources=["jobs"],
+                    verbs=["get", "list", "watch", "describe", "create", "edit", "delete", "annotate", "patch", "label"],
+                ),
+                kubernetes.client.V1PolicyRule(
+                    api_groups=["extensions"],
+                    resources=["ingresses"],
+                    verbs=["get", "list", "watch", "describe", "create", "edit", "delete", "annotate", "patch", "label"],
+                ),
+                kubernetes.client.V1PolicyRule(
+                    api_groups=["rbac.authorization.k8s.io"],
+                    resources=["roles", "rolebindings"],
+                    verbs=["get", "list", "watch", "describe", "create", "edit", "delete", "deletecollection", "annotate", "patch", "label"],
+                ),
+            ]
+        ))
+
+    # Create the role binding
+    bindings = rbac_v1.list_namespaced_role_binding(emr_namespace)
+    if not any(binding.metadata.name == EMR_K8S_ROLE_NAME for binding in bindings.items):
+        rbac_v1.create_namespaced_role_binding(emr_namespace, kubernetes.client.V1RoleBinding(
+            metadata=kubernetes.client.V1ObjectMeta(name=EMR_K8S_ROLE_NAME, namespace=emr_namespace),
+            subjects=[
+                kubernetes.client.V1Subject(
+                    api_group="rbac.authorization.k8s.io",
+                    kind="User",
+                    name=EMR_K8S_USER_NAME,
+                )
+            ],
+            role_ref=kubernetes.client.V1RoleRef(kind="Role", name=EMR_K8S_ROLE_NAME, api_group="rbac.authorization.k8s.io")
+        ))
+
+    # Patch the auth configmap
+    current_auth = core_v1.read_namespaced_config_map(AWS_AUTH_CONFIG_MAP_NAME, AWS_AUTH_NAMESPACE)
+    map_roles = (current_auth.data or {}).get("mapRoles", "")
+    map_roles = yaml.safe_load(map_roles) or []
+
+    if not any(role["username"] == EMR_K8S_USER_NAME for role in map_roles):
+        map_roles.append({
+            "rolearn": emr_role_arn,
+            "username": EMR_K8S_USER_NAME
+        })
+        auth_patch = [{
+            "op": "replace",
+            "path": "/data/mapRoles",
+            "value": yaml.dump(map_roles)
+        }]
+        core_v1.patch_namespaced_config_map(AWS_AUTH_CONFIG_MAP_NAME, AWS_AUTH_NAMESPACE, auth_patch)
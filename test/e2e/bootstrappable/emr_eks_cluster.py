@@ -11,27 +11,26 @@
 # express or implied. See the License for the specific language governing
 # permissions and limitations under the License.
 
+# The Kubernetes client, the AWS CLI token generator and botocore are
+# only needed while bootstrapping, so they are imported inside the methods that
+# use them. This keeps `pytest --collect-only` (which imports this module via
+# `e2e.bootstrap_resources`) from paying several seconds of import time.
+from __future__ import annotations
+
 import base64
-import boto3
-import kubernetes
 import tempfile
-import yaml
 
 from dataclasses import dataclass, field
-from typing import Union
-from botocore import session
-from awscli.customizations.eks.get_token import STSClientFactory, TokenGenerator
+from typing import TYPE_CHECKING, Union
 
-from acktest.aws.identity import get_account_id
 from acktest.bootstrapping import Bootstrappable
 from acktest.bootstrapping.iam import ServiceLinkedRole
 from acktest.bootstrapping.eks import Cluster as EKSCluster
+from e2e.bootstrappable.emr_components import install_emr_components
+from e2e.bootstrappable.oidc import get_oidc_provider_manager
 
-EMR_K8S_ROLE_NAME = "emr-containers"
-EMR_K8S_USER_NAME = "emr-containers"
-
-AWS_AUTH_NAMESPACE = "kube-system"
-AWS_AUTH_CONFIG_MAP_NAME = "aws-auth"
+if TYPE_CHECKING:
+    import kubernetes
 
 @dataclass
 class EMREnabledEKSCluster(Bootstrappable):
@@ -53,14 +52,17 @@ class EMREnabledEKSCluster(Bootstrappable):
 
     @property
     def eks_client(self):
+        import boto3
         return boto3.client("eks", region_name=self.region)
 
     @property
     def eks_resource(self):
+        import boto3
         return boto3.resource("eks", region_name=self.region)
 
     @property
     def iam_client(self):
+        import boto3
         return boto3.client("iam")
 
     def _write_cafile(self, data: str) -> tempfile.NamedTemporaryFile:
@@ -75,10 +77,15 @@ class EMREnabledEKSCluster(Bootstrappable):
         return cafile
 
     def _get_eks_token(self, cluster_name: str) -> str:
+        from botocore import session
+        from awscli.customizations.eks.get_token import STSClientFactory, TokenGenerator
+
         sts_client = STSClientFactory(session.get_session()).get_sts_client()
         return TokenGenerator(sts_client).get_token(cluster_name)
 
     def _k8s_api_client(self, endpoint: str, token: str, cafile: str) -> kubernetes.client.CoreV1Api:
+        import kubernetes
+
         kconfig = kubernetes.config.kube_config.Configuration(
             host=endpoint,
             api_key={'authorization': 'Bearer ' + token}
@@ -86,18 +93,11 @@ class EMREnabledEKSCluster(Bootstrappable):
         kconfig.ssl_ca_cert = cafile
         return kubernetes.client.ApiClient(configuration=kconfig)
 
-    # create OIDC provider arn
-    def _create_oidc(self,oidc_url):
-        oidcResponse = self.iam_client.create_open_id_connect_provider(Url=oidc_url,
-        ClientIDList=['sts.amazonaws.com',],
-        ThumbprintList=['9e99a48a9960b14926bb7f3b02e22da2b0ab7280',])
-
-        oidc_arn = oidcResponse['OpenIDConnectProviderArn']
-        return oidc_arn
-
     def bootstrap(self):
         """Creates an EKS cluster and installs the EMR components into it.
         """
+        from acktest.aws.identity import get_account_id
+
         super().bootstrap()
 
         cluster = self.eks_client.describe_cluster(name=self.cluster.name)
@@ -113,96 +113,20 @@ class EMREnabledEKSCluster(Bootstrappable):
             ca_file.name,
         )
 
-        core_v1 = kubernetes.client.CoreV1Api(api_client)
-
-        # Create OIDC provider ARN for Outputs
-        self.export_oidc_arn = self._create_oidc(oidc_url)
-
-        # Create the EMR namespace
-        namespaces = core_v1.list_namespace()
-        if not any(ns.metadata.name == self.emr_namespace for ns in namespaces.items):
-            emr_ns = kubernetes.client.V1Namespace(metadata=kubernetes.client.V1ObjectMeta(name=self.emr_namespace))
-            core_v1.create_namespace(emr_ns)
-
-        rbac_v1 = kubernetes.client.RbacAuthorizationV1Api(api_client)
-
-        # Create the EMR RBAC
-        roles = rbac_v1.list_namespaced_role(self.emr_namespace)
-        if not any(role.metadata.name == EMR_K8S_ROLE_NAME for role in roles.items):
-            rbac_v1.create_namespaced_role(self.emr_namespace, kubernetes.client.V1Role(
-                metadata=kubernetes.client.V1ObjectMeta(name=EMR_K8S_ROLE_NAME, namespace=self.emr_namespace),
-                rules=[
-                    kubernetes.client.V1PolicyRule(
-                        api_groups=[""],
-                        resources=["namespaces"],
-                        verbs=["get"],
-                    ),
-                    kubernetes.client.V1PolicyRule(
-                        api_groups=[""],
-                        resources=["serviceaccounts", "services", "configmaps", "events", "pods", "pods/log"],
-                        verbs=["get", "list", "watch", "describe", "create", "edit", "delete", "deletecollection", "annotate", "patch", "label"],
-                    ),
-                    kubernetes.client.V1PolicyRule(
-                        api_groups=[""],
-                        resources=["secrets"],
-                        verbs=["create", "patch", "delete", "watch"],
-                    ),
-                    kubernetes.client.V1PolicyRule(
-                        api_groups=["apps"],
-                        resources=["statefulsets", "deployments"],
-                        verbs=["get", "list", "watch", "describe", "create", "edit", "delete", "annotate", "patch", "label"],
-                    ),
-                    kubernetes.client.V1PolicyRule(
-                        api_groups=["batch"],
-                        resources=["jobs"],
-                        verbs=["get", "list", "watch", "describe", "create", "edit", "delete", "annotate", "patch", "label"],
-                    ),
-                    kubernetes.client.V1PolicyRule(
-                        api_groups=["extensions"],
-                        resources=["ingresses"],
-                        verbs=["get", "list", "watch", "describe", "create", "edit", "delete", "annotate", "patch", "label"],
-                    ),
-                    kubernetes.client.V1PolicyRule(
-                        api_groups=["rbac.authorization.k8s.io"],
-                        resources=["roles", "rolebindings"],
-                        verbs=["get", "list", "watch", "describe", "create", "edit", "delete", "deletecollection", "annotate", "patch", "label"],
-                    ),
-                ]
-            ))
-
-        # Create the role binding
-        bindings = rbac_v1.list_namespaced_role_binding(self.emr_namespace)
-        if not any(binding.metadata.name == EMR_K8S_ROLE_NAME for binding in bindings.items):
-            rbac_v1.create_namespaced_role_binding(self.emr_namespace, kubernetes.client.V1RoleBinding(
-                metadata=kubernetes.client.V1ObjectMeta(name=EMR_K8S_ROLE_NAME, namespace=self.emr_namespace),
-                subjects=[
-                    kubernetes.client.V1Subject(
-                        api_group="rbac.authorization.k8s.io",
-                        kind="User",
-                        name=EMR_K8S_USER_NAME,
-                    )
-                ],
-                role_ref=kubernetes.client.V1RoleRef(kind="Role", name=EMR_K8S_ROLE_NAME, api_group="rbac.authorization.k8s.io")
-            ))
-
-        # Patch the auth configmap
-        current_auth = core_v1.read_namespaced_config_map(AWS_AUTH_CONFIG_MAP_NAME, AWS_AUTH_NAMESPACE)
-        map_roles = current_auth.data["mapRoles"]
-        map_roles = yaml.safe_load(map_roles)
-
-        if not any(role["username"] == EMR_K8S_USER_NAME for role in map_roles):
-            map_roles.append({
-                "rolearn": f"arn:aws:iam::{get_account_id()}:role/{self.emr_slr.role_name}",
-                "username": EMR_K8S_USER_NAME
-            })
-            auth_patch = [{
-                "op": "replace",
-                "path": "/data/mapRoles",
-                "value": yaml.dump(map_roles)
-            }]
-            core_v1.patch_namespaced_config_map(AWS_AUTH_CONFIG_MAP_NAME, AWS_AUTH_NAMESPACE, auth_patch)
+        # Create (or reuse) the OIDC provider for Outputs
+        self.export_oidc_arn = get_oidc_provider_manager().acquire(oidc_url)
+
+        install_emr_components(
+            api_client,
+            self.emr_namespace,
+            f"arn:aws:iam::{get_account_id()}:role/{self.emr_slr.role_name}",
+        )
 
     def cleanup(self):
         """Deletes the EKS cluster and all associated resources.
         """
+        if self.export_oidc_arn is not None:
+            get_oidc_provider_manager().release(self.export_oidc_arn)
+            self.export_oidc_arn = None
+
         super().cleanup()
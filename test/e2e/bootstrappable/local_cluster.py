@@ -0,0 +1,291 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""A host cluster backed by a local kube-apiserver and etcd.
+
+`LocalEMRCluster` is a drop-in replacement for `EMREnabledEKSCluster` when the
+tests run against the emr-containers stand-in: it has the same outputs
+(`cluster.name`, `export_oidc_arn`, `emr_namespace`) and installs the same EMR
+namespace, RBAC and aws-auth mapping, but starts in seconds and needs no AWS
+account. The binaries are taken from an envtest assets directory, as installed
+by `setup-envtest use -p path`, given either explicitly or through the
+`KUBEBUILDER_ASSETS` environment variable.
+
+The API server and etcd run in their own sessions so that they outlive the
+bootstrap process; `cleanup` stops them and removes their data directory. The
+tests talk to the emr-containers and S3 stand-ins instead of AWS when the host
+clusters are local (see the `aws_endpoints` fixture).
+"""
+
+import logging
+import os
+import secrets
+import shutil
+import signal
+import ssl
+import subprocess
+import tempfile
+import time
+import urllib.request
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Union
+
+from acktest.bootstrapping import Bootstrappable
+from e2e.bootstrappable.emr_components import (
+    install_emr_components, AWS_AUTH_NAMESPACE, AWS_AUTH_CONFIG_MAP_NAME,
+)
+from e2e.common.controller import free_port
+from e2e.standin.emrcontainers import DEFAULT_ACCOUNT_ID
+
+ASSETS_ENV = "KUBEBUILDER_ASSETS"
+
+# CRDs installed into the local API server, relative to the repository root
+CRD_DIRECTORIES = ["helm/crds"]
+REPOSITORY_ROOT = Path(__file__).parent.parent.parent.parent
+
+EMR_SLR_ROLE_NAME = "AWSServiceRoleForAmazonEMRContainers"
+
+# Time to wait for the API server to report ready
+READY_TIMEOUT_SECONDS = 60
+
+
+@dataclass
+class LocalCluster:
+    """Stands in for the acktest EKS `Cluster` subresource; only the name is
+    used by the tests.
+    """
+    name: str
+
+
+@dataclass
+class StandInRole(Bootstrappable):
+    """An IAM role placeholder for runs against the stand-in APIs, which accept
+    any well-formed ARN.
+    """
+    name: str
+    arn: Union[str, None] = field(default=None, init=False)
+
+    def __post_init__(self):
+        self.arn = f"arn:aws:iam::{DEFAULT_ACCOUNT_ID}:role/{self.name}"
+
+
+@dataclass
+class StandInBucket(Bootstrappable):
+    """An S3 bucket placeholder for runs against the stand-in APIs.
+    """
+    name: str
+
+
+@dataclass
+class LocalEMRCluster(Bootstrappable):
+    # Inputs
+    name_prefix: str
+    emr_namespace: str
+    assets_dir: Optional[str] = None
+
+    # Subresources
+    cluster: LocalCluster = field(init=False, default=None)
+
+    # Outputs
+    export_oidc_arn: Union[str, None] = field(default=None, init=False)
+    kubeconfig: Union[str, None] = field(default=None, init=False)
+    server_url: Union[str, None] = field(default=None, init=False)
+    data_dir: Union[str, None] = field(default=None, init=False)
+    pids: List[int] = field(default_factory=list, init=False)
+
+    def __post_init__(self):
+        self.cluster = LocalCluster(f"{self.name_prefix}-local-{secrets.token_hex(3)}")
+
+    @property
+    def issuer_url(self) -> str:
+        return f"https://oidc.local/id/{self.cluster.name}"
+
+    def _binary(self, name: str) -> str:
+        assets = self.assets_dir or os.environ.get(ASSETS_ENV)
+        if not assets:
+            raise RuntimeError(f"set {ASSETS_ENV} to a directory containing etcd and kube-apiserver")
+        return str(Path(assets) / name)
+
+    def _spawn(self, name: str, args: List[str]) -> int:
+        log = open(Path(self.data_dir) / f"{name}.log", "wb")
+        proc = subprocess.Popen(args, stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+        log.close()
+        self.pids.append(proc.pid)
+        return proc.pid
+
+    def _write_keys(self) -> str:
+        """Generates the service account signing key pair.
+        """
+        key = Path(self.data_dir) / "sa.key"
+        pub = Path(self.data_dir) / "sa.pub"
+        subprocess.run(["openssl", "genrsa", "-out", str(key), "2048"], check=True, capture_output=True)
+        subprocess.run(["openssl", "rsa", "-in", str(key), "-pubout", "-out", str(pub)], check=True, capture_output=True)
+        return str(key)
+
+    def _start_etcd(self) -> str:
+        client_url = f"http://127.0.0.1:{free_port()}"
+        self._spawn("etcd", [
+            self._binary("etcd"),
+            "--data-dir", str(Path(self.data_dir) / "etcd"),
+            "--listen-client-urls", client_url,
+            "--advertise-client-urls", client_url,
+            "--listen-peer-urls", f"http://127.0.0.1:{free_port()}",
+            "--unsafe-no-fsync",
+        ])
+        return client_url
+
+    def _start_apiserver(self, etcd_url: str, token: str) -> str:
+        port = free_port()
+        key = self._write_keys()
+        tokens = Path(self.data_dir) / "tokens.csv"
+        tokens.write_text(f'{token},admin,admin,"system:masters"\n')
+        self._spawn("kube-apiserver", [
+            self._binary("kube-apiserver"),
+            "--etcd-servers", etcd_url,
+            "--bind-address", "127.0.0.1",
+            "--secure-port", str(port),
+            "--cert-dir", str(Path(self.data_dir) / "certs"),
+            "--token-auth-file", str(tokens),
+            "--authorization-mode", "RBAC",
+            "--service-cluster-ip-range", "10.0.0.0/24",
+            "--service-account-issuer", self.issuer_url,
+            "--service-account-key-file", key,
+            "--service-account-signing-key-file", key,
+            "--allow-privileged=true",
+            "--disable-admission-plugins", "ServiceAccount",
+        ])
+        return f"https://127.0.0.1:{port}"
+
+    def _wait_ready(self, token: str):
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        request = urllib.request.Request(f"{self.server_url}/readyz", headers={"Authorization": f"Bearer {token}"})
+        deadline = time.monotonic() + READY_TIMEOUT_SECONDS
+        while time.monotonic() < deadline:
+            try:
+                with urllib.request.urlopen(request, timeout=2, context=context) as resp:
+                    if resp.status == 200:
+                        return
+            except OSError:
+                pass
+            time.sleep(0.5)
+        raise TimeoutError(f"local API server not ready after {READY_TIMEOUT_SECONDS}s; logs in {self.data_dir}")
+
+    def _write_kubeconfig(self, token: str) -> str:
+        import yaml
+
+        path = Path(self.data_dir) / "kubeconfig"
+        path.write_text(yaml.safe_dump({
+            "apiVersion": "v1",
+            "kind": "Config",
+            "clusters": [{"name": self.cluster.name, "cluster": {
+                "server": self.server_url, "insecure-skip-tls-verify": True,
+            }}],
+            "users": [{"name": "admin", "user": {"token": token}}],
+            "contexts": [{"name": self.cluster.name, "context": {"cluster": self.cluster.name, "user": "admin"}}],
+            "current-context": self.cluster.name,
+        }))
+        return str(path)
+
+    def _install_crds(self, api_client):
+        import kubernetes
+        import yaml
+
+        extensions = kubernetes.client.ApiextensionsV1Api(api_client)
+        for directory in CRD_DIRECTORIES:
+            for path in sorted((REPOSITORY_ROOT / directory).glob("*.yaml")):
+                crd = yaml.safe_load(path.read_text())
+                try:
+                    extensions.create_custom_resource_definition(crd)
+                except kubernetes.client.exceptions.ApiException as ex:
+                    if ex.status != 409:
+                        raise
+
+    def _create_aws_auth(self, api_client):
+        """EKS creates the aws-auth ConfigMap for every cluster; a bare API
+        server does not.
+        """
+        import kubernetes
+
+        core_v1 = kubernetes.client.CoreV1Api(api_client)
+        try:
+            core_v1.create_namespaced_config_map(AWS_AUTH_NAMESPACE, kubernetes.client.V1ConfigMap(
+                metadata=kubernetes.client.V1ObjectMeta(name=AWS_AUTH_CONFIG_MAP_NAME, namespace=AWS_AUTH_NAMESPACE),
+                data={"mapRoles": "[]\n"},
+            ))
+        except kubernetes.client.exceptions.ApiException as ex:
+            if ex.status != 409:
+                raise
+
+    def bootstrap(self):
+        """Starts etcd and kube-apiserver, installs the CRDs and the EMR
+        components.
+
+        One instance may back several host cluster outputs; it is only
+        bootstrapped once. If any step fails, the processes started so far
+        are stopped again.
+        """
+        import kubernetes
+
+        if self.server_url:
+            return
+
+        super().bootstrap()
+
+        self.data_dir = tempfile.mkdtemp(prefix=f"{self.cluster.name}-")
+        token = secrets.token_hex(16)
+        started = time.monotonic()
+        try:
+            etcd_url = self._start_etcd()
+            self.server_url = self._start_apiserver(etcd_url, token)
+            self._wait_ready(token)
+            self.kubeconfig = self._write_kubeconfig(token)
+
+            api_client = kubernetes.config.new_client_from_config(config_file=self.kubeconfig)
+            self._install_crds(api_client)
+            self._create_aws_auth(api_client)
+            install_emr_components(
+                api_client,
+                self.emr_namespace,
+                f"arn:aws:iam::{DEFAULT_ACCOUNT_ID}:role/{EMR_SLR_ROLE_NAME}",
+            )
+        except Exception:
+            self.cleanup()
+            raise
+
+        issuer = self.issuer_url[len("https://"):]
+        self.export_oidc_arn = f"arn:aws:iam::{DEFAULT_ACCOUNT_ID}:oidc-provider/{issuer}"
+        logging.info("Local cluster %s ready at %s in %.1fs (KUBECONFIG=%s)",
+            self.cluster.name, self.server_url, time.monotonic() - started, self.kubeconfig)
+
+    def cleanup(self):
+        """Stops the API server and etcd and removes their data.
+        """
+        for pid in reversed(self.pids):
+            try:
+                os.killpg(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        self.pids = []
+        self.server_url = None
+        self.kubeconfig = None
+        if self.data_dir:
+            # Give the processes a moment to release their files
+            time.sleep(1)
+            shutil.rmtree(self.data_dir, ignore_errors=True)
+            self.data_dir = None
+
+        super().cleanup()
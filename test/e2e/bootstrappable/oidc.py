@@ -0,0 +1,251 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Idempotent management of IAM OpenID Connect providers for the EKS host
+clusters.
+
+IAM allows a single OIDC provider per issuer URL, so creating one blindly on
+every bootstrap either fails with EntityAlreadyExists or, when the URL differs
+only cosmetically, leaves duplicates behind. `OIDCProviderManager` instead:
+
+  - lists the account's providers once per process and indexes them by issuer
+    URL,
+  - reuses an existing provider; on providers it created it also adds missing
+    client IDs and replaces stale thumbprints in place, while providers it did
+    not create are used as they are,
+  - derives thumbprints from the TLS certificate chain served for the issuer,
+  - keeps a reference count in a tag on the providers it created, so that
+    several bootstrappables can share one provider and it is only deleted when
+    the last of them is cleaned up,
+  - never modifies or deletes a provider it did not create.
+
+The reference count is updated with a read-modify-write of the tag, serialised
+by a lock within the process. It is not safe for several processes to acquire
+and release the same provider concurrently: an update can be lost, leaving the
+provider behind or deleting it while another session still uses it.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import socket
+import ssl
+import subprocess
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+from typing import Dict, List, Optional
+
+DEFAULT_CLIENT_IDS = ["sts.amazonaws.com"]
+
+# Tags recording that a provider was created by the e2e bootstrap, and how many
+# bootstrappables currently use it.
+MANAGED_TAG_KEY = "services.k8s.aws/e2e-managed"
+REFERENCES_TAG_KEY = "services.k8s.aws/e2e-references"
+
+# Attempts, and seconds between them, to find a provider that IAM reported as
+# already existing but that is not listed yet
+LOOKUP_ATTEMPTS = 5
+LOOKUP_INTERVAL_SECONDS = 2
+
+_PEM_CERTIFICATE_RE = re.compile(r"-----BEGIN CERTIFICATE-----.+?-----END CERTIFICATE-----", re.DOTALL)
+
+
+def normalize_issuer_url(url: str) -> str:
+    """IAM stores provider URLs without the scheme or a trailing slash.
+    """
+    url = url.strip()
+    for scheme in ("https://", "http://"):
+        if url.startswith(scheme):
+            url = url[len(scheme):]
+    return url.rstrip("/")
+
+
+def _served_chain(host: str, port: int = 443) -> List[bytes]:
+    """Returns the DER certificates served by `host`, leaf first.
+    """
+    if hasattr(ssl.SSLSocket, "get_unverified_chain"):
+        context = ssl.create_default_context()
+        with socket.create_connection((host, port), timeout=10) as sock:
+            with context.wrap_socket(sock, server_hostname=host) as tls:
+                return list(tls.get_unverified_chain())
+    # Python < 3.13 does not expose the chain; ask openssl for it.
+    output = subprocess.run(
+        ["openssl", "s_client", "-servername", host, "-showcerts", "-connect", f"{host}:{port}"],
+        input=b"", capture_output=True, timeout=30, check=True,
+    ).stdout.decode()
+    return [ssl.PEM_cert_to_DER_cert(pem) for pem in _PEM_CERTIFICATE_RE.findall(output)]
+
+
+def issuer_thumbprints(issuer_url: str) -> List[str]:
+    """Returns the thumbprint IAM expects for `issuer_url`: the SHA-1
+    fingerprint of the last certificate in the chain served by the host of the
+    issuer's JWKS endpoint.
+    """
+    issuer = "https://" + normalize_issuer_url(issuer_url)
+    with urllib.request.urlopen(f"{issuer}/.well-known/openid-configuration", timeout=10) as resp:
+        jwks_uri = json.load(resp).get("jwks_uri") or issuer
+    url = urllib.parse.urlparse(jwks_uri)
+    chain = _served_chain(url.hostname, url.port or 443)
+    if not chain:
+        raise RuntimeError(f"no certificate served by {url.hostname}")
+    return [hashlib.sha1(chain[-1]).hexdigest()]
+
+
+class OIDCProviderManager:
+    """Creates, reuses and reference-counts OIDC providers.
+    """
+
+    def __init__(self, iam_client=None):
+        if iam_client is None:
+            import boto3
+            iam_client = boto3.client("iam")
+        self.iam_client = iam_client
+        self._lock = threading.Lock()
+        # Normalised issuer URL -> provider ARN, built on first use
+        self._index: Optional[Dict[str, str]] = None
+
+    def _build_index(self) -> Dict[str, str]:
+        index = {}
+        providers = self.iam_client.list_open_id_connect_providers()["OpenIDConnectProviderList"]
+        for provider in providers:
+            arn = provider["Arn"]
+            # The ARN ends with the provider URL, so no describe call is needed
+            # to index it.
+            index[normalize_issuer_url(arn.split(":oidc-provider/", 1)[1])] = arn
+        logging.info("Indexed %d OIDC providers", len(index))
+        return index
+
+    @property
+    def index(self) -> Dict[str, str]:
+        if self._index is None:
+            self._index = self._build_index()
+        return self._index
+
+    def find(self, issuer_url: str) -> Optional[str]:
+        """Returns the ARN of the provider for `issuer_url`, if one exists.
+        """
+        return self.index.get(normalize_issuer_url(issuer_url))
+
+    def _tags(self, arn: str) -> Dict[str, str]:
+        tags = self.iam_client.list_open_id_connect_provider_tags(OpenIDConnectProviderArn=arn)["Tags"]
+        return {tag["Key"]: tag["Value"] for tag in tags}
+
+    def _set_references(self, arn: str, references: int):
+        self.iam_client.tag_open_id_connect_provider(
+            OpenIDConnectProviderArn=arn,
+            Tags=[{"Key": REFERENCES_TAG_KEY, "Value": str(references)}],
+        )
+
+    def _lookup(self, key: str) -> str:
+        """Returns the ARN of the provider for the normalised issuer URL `key`,
+        listing the account's providers again until it shows up.
+        """
+        for attempt in range(LOOKUP_ATTEMPTS):
+            if attempt:
+                time.sleep(LOOKUP_INTERVAL_SECONDS)
+            self._index = self._build_index()
+            arn = self._index.get(key)
+            if arn is not None:
+                return arn
+        raise RuntimeError(f"OIDC provider for {key} already exists but is not listed")
+
+    def _reconcile(self, arn: str, client_ids: List[str], thumbprints: List[str]):
+        provider = self.iam_client.get_open_id_connect_provider(OpenIDConnectProviderArn=arn)
+        for client_id in client_ids:
+            if client_id not in provider.get("ClientIDList", []):
+                self.iam_client.add_client_id_to_open_id_connect_provider(
+                    OpenIDConnectProviderArn=arn, ClientID=client_id,
+                )
+        if sorted(provider.get("ThumbprintList", [])) != sorted(thumbprints):
+            self.iam_client.update_open_id_connect_provider_thumbprint(
+                OpenIDConnectProviderArn=arn, ThumbprintList=thumbprints,
+            )
+
+    def acquire(self, issuer_url: str, client_ids: List[str] = DEFAULT_CLIENT_IDS,
+            thumbprints: Optional[List[str]] = None) -> str:
+        """Returns the ARN of a provider for `issuer_url`, creating it if
+        needed, and takes a reference on it. Providers created by the manager
+        get the given client IDs and thumbprints, by default those of the
+        issuer's certificate chain.
+        """
+        with self._lock:
+            key = normalize_issuer_url(issuer_url)
+            arn = self.index.get(key)
+            if arn is None:
+                thumbprints = thumbprints or issuer_thumbprints(key)
+                try:
+                    arn = self.iam_client.create_open_id_connect_provider(
+                        Url=f"https://{key}",
+                        ClientIDList=client_ids,
+                        ThumbprintList=thumbprints,
+                        Tags=[
+                            {"Key": MANAGED_TAG_KEY, "Value": "true"},
+                            {"Key": REFERENCES_TAG_KEY, "Value": "1"},
+                        ],
+                    )["OpenIDConnectProviderArn"]
+                    self.index[key] = arn
+                    logging.info("Created OIDC provider %s", arn)
+                    return arn
+                except self.iam_client.exceptions.EntityAlreadyExistsException:
+                    # Created by someone else since the index was built
+                    arn = self._lookup(key)
+
+            tags = self._tags(arn)
+            if tags.get(MANAGED_TAG_KEY) != "true":
+                logging.info("Reusing OIDC provider %s, which is not managed by the e2e bootstrap", arn)
+                return arn
+            self._reconcile(arn, client_ids, thumbprints or issuer_thumbprints(key))
+            self._set_references(arn, int(tags.get(REFERENCES_TAG_KEY, "0")) + 1)
+            logging.info("Reusing OIDC provider %s", arn)
+            return arn
+
+    def release(self, arn: str) -> bool:
+        """Drops a reference on the provider and deletes it once no references
+        remain. Providers not created by this manager are left alone. Returns
+        True if the provider was deleted.
+        """
+        with self._lock:
+            try:
+                tags = self._tags(arn)
+            except self.iam_client.exceptions.NoSuchEntityException:
+                return False
+            if tags.get(MANAGED_TAG_KEY) != "true":
+                return False
+
+            references = max(0, int(tags.get(REFERENCES_TAG_KEY, "1")) - 1)
+            if references > 0:
+                self._set_references(arn, references)
+                return False
+
+            self.iam_client.delete_open_id_connect_provider(OpenIDConnectProviderArn=arn)
+            if self._index is not None:
+                self._index = {url: value for url, value in self._index.items() if value != arn}
+            logging.info("Deleted OIDC provider %s", arn)
+            return True
+
+
+_manager: Optional[OIDCProviderManager] = None
+
+
+def get_oidc_provider_manager() -> OIDCProviderManager:
+    """Returns the process-wide manager, so that the provider index is built
+    once per session.
+    """
+    global _manager
+    if _manager is None:
+        _manager = OIDCProviderManager()
+    return _manager
@@ -0,0 +1,314 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Asyncio variants of the e2e harness helpers.
+
+The sync helpers in acktest block on every call, so driving many custom
+resources at once needs one thread per resource. The helpers here run on a
+single event loop instead:
+
+  - `CustomResourceWatcher` keeps one watch per (namespace, plural) and lets
+    any number of coroutines wait for a resource to reach a condition, so
+    waiting on 1,000 CRs costs one watch connection rather than 1,000 polls.
+  - `create_custom_resource`, `delete_custom_resource` and friends mirror the
+    acktest functions of the same name and take the same
+    `CustomResourceReference` objects.
+  - `AsyncEMRContainersClient` makes signed emr-containers calls over aiohttp.
+  - `gather_bounded` fans coroutines out with a concurrency limit.
+
+The Kubernetes client is `kubernetes_asyncio`; it is imported on first use.
+"""
+
+import asyncio
+import json
+import logging
+import time
+
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Default time to wait for a resource to reach a condition
+DEFAULT_WAIT_SECONDS = 300
+
+# Server-side timeout of each watch request; the watcher re-establishes the
+# watch from the last resource version when it expires.
+WATCH_TIMEOUT_SECONDS = 300
+
+
+async def new_custom_objects_api():
+    """Returns a `kubernetes_asyncio` CustomObjectsApi configured from the
+    current kubeconfig.
+    """
+    from kubernetes_asyncio import client, config
+    await config.load_kube_config()
+    return client.CustomObjectsApi(client.ApiClient())
+
+
+async def gather_bounded(coros: Iterable[Awaitable[T]], limit: int, return_exceptions: bool = False) -> List[T]:
+    """Runs `coros` concurrently with at most `limit` in flight, returning
+    their results in order.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(coro: Awaitable[T]) -> T:
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(*(run(coro) for coro in coros), return_exceptions=return_exceptions)
+
+
+async def create_custom_resource(api, reference, spec: Dict[str, Any]) -> Dict[str, Any]:
+    return await api.create_namespaced_custom_object(
+        reference.group, reference.version, reference.namespace, reference.plural, spec,
+    )
+
+
+async def get_resource(api, reference) -> Optional[Dict[str, Any]]:
+    from kubernetes_asyncio.client.exceptions import ApiException
+    try:
+        return await api.get_namespaced_custom_object(
+            reference.group, reference.version, reference.namespace, reference.plural, reference.name,
+        )
+    except ApiException as ex:
+        if ex.status == 404:
+            return None
+        raise
+
+
+async def patch_custom_resource(api, reference, patch: Dict[str, Any]) -> Dict[str, Any]:
+    return await api.patch_namespaced_custom_object(
+        reference.group, reference.version, reference.namespace, reference.plural, reference.name, patch,
+    )
+
+
+async def delete_custom_resource(api, reference, watcher: Optional["CustomResourceWatcher"] = None,
+        timeout: float = DEFAULT_WAIT_SECONDS) -> bool:
+    """Deletes the resource and waits until it is gone. Returns False if it was
+    already gone.
+    """
+    from kubernetes_asyncio.client.exceptions import ApiException
+    try:
+        await api.delete_namespaced_custom_object(
+            reference.group, reference.version, reference.namespace, reference.plural, reference.name,
+        )
+    except ApiException as ex:
+        if ex.status == 404:
+            return False
+        raise
+
+    if watcher is not None:
+        await watcher.wait_for(reference.name, lambda obj: obj is None, timeout)
+        return True
+
+    deadline = time.monotonic() + timeout
+    while await get_resource(api, reference) is not None:
+        if time.monotonic() > deadline:
+            raise asyncio.TimeoutError(f"{reference.name} was not deleted after {timeout}s")
+        await asyncio.sleep(1)
+    return True
+
+
+def consumed_by_controller(obj: Optional[Dict[str, Any]]) -> bool:
+    """Same condition as acktest's `wait_resource_consumed_by_controller`: the
+    controller has written a status with conditions.
+    """
+    return obj is not None and "conditions" in obj.get("status", {})
+
+
+class CustomResourceWatcher:
+    """Maintains a cache of the custom resources of one plural in one namespace
+    from a single watch, and wakes up waiters when a resource changes.
+    """
+
+    def __init__(self, api, group: str, version: str, plural: str, namespace: str,
+            label_selector: Optional[str] = None):
+        self.api = api
+        self.group = group
+        self.version = version
+        self.plural = plural
+        self.namespace = namespace
+        self.label_selector = label_selector
+
+        self.objects: Dict[str, Dict[str, Any]] = {}
+        # Callbacks invoked with (event type, object) for every watch event
+        self.listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+        self._changed: Dict[str, asyncio.Event] = {}
+        self._resource_version: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> "CustomResourceWatcher":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def start(self):
+        await self._relist()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _selector_kwargs(self) -> Dict[str, Any]:
+        return {"label_selector": self.label_selector} if self.label_selector else {}
+
+    async def _relist(self):
+        result = await self.api.list_namespaced_custom_object(
+            self.group, self.version, self.namespace, self.plural, **self._selector_kwargs(),
+        )
+        present = {}
+        for obj in result["items"]:
+            present[obj["metadata"]["name"]] = obj
+        for name in set(self.objects) | set(present):
+            if self.objects.get(name) is not present.get(name):
+                self._notify(name)
+        self.objects = present
+        self._resource_version = result["metadata"]["resourceVersion"]
+
+    async def _run(self):
+        from kubernetes_asyncio import watch
+        from kubernetes_asyncio.client.exceptions import ApiException
+
+        while True:
+            try:
+                stream = watch.Watch().stream(
+                    self.api.list_namespaced_custom_object,
+                    self.group, self.version, self.namespace, self.plural,
+                    resource_version=self._resource_version,
+                    timeout_seconds=WATCH_TIMEOUT_SECONDS,
+                    **self._selector_kwargs(),
+                )
+                async with stream:
+                    async for event in stream:
+                        self._handle(event["type"], event["object"])
+            except ApiException as ex:
+                if ex.status != 410:
+                    raise
+                # The resource version is too old; start again from a list.
+                await self._relist()
+            except asyncio.CancelledError:
+                raise
+            except Exception as ex:
+                logging.warning("watch on %s/%s failed, relisting: %s", self.namespace, self.plural, ex)
+                await asyncio.sleep(1)
+                await self._relist()
+
+    def _handle(self, event_type: str, obj: Dict[str, Any]):
+        if event_type == "ERROR":
+            return
+        name = obj["metadata"]["name"]
+        self._resource_version = obj["metadata"].get("resourceVersion", self._resource_version)
+        if event_type == "DELETED":
+            self.objects.pop(name, None)
+        else:
+            self.objects[name] = obj
+        for listener in self.listeners:
+            listener(event_type, obj)
+        self._notify(name)
+
+    def _notify(self, name: str):
+        event = self._changed.pop(name, None)
+        if event is not None:
+            event.set()
+
+    async def wait_for(self, name: str, predicate: Callable[[Optional[Dict[str, Any]]], bool],
+            timeout: float = DEFAULT_WAIT_SECONDS) -> Optional[Dict[str, Any]]:
+        """Waits until `predicate` holds for the named resource (None when the
+        resource does not exist) and returns the resource.
+        """
+        async def wait():
+            while True:
+                obj = self.objects.get(name)
+                if predicate(obj):
+                    return obj
+                event = self._changed.setdefault(name, asyncio.Event())
+                await event.wait()
+
+        return await asyncio.wait_for(wait(), timeout)
+
+    async def wait_resource_consumed_by_controller(self, name: str,
+            timeout: float = DEFAULT_WAIT_SECONDS) -> Optional[Dict[str, Any]]:
+        return await self.wait_for(name, consumed_by_controller, timeout)
+
+
+class AsyncEMRContainersClient:
+    """A minimal async emr-containers client that signs requests with botocore
+    and sends them with aiohttp.
+
+    Only the read operations the tests need are implemented. Errors are raised
+    as `EMRContainersError` with the service error code.
+    """
+
+    def __init__(self, region: Optional[str] = None, endpoint_url: Optional[str] = None,
+            credentials=None, max_connections: int = 100):
+        from botocore.session import get_session
+
+        session = get_session()
+        self.region = region or session.get_config_variable("region") or "us-west-2"
+        self.endpoint_url = (endpoint_url or f"https://emr-containers.{self.region}.amazonaws.com").rstrip("/")
+        self._credentials = credentials or session.get_credentials()
+        self._max_connections = max_connections
+        self._session = None
+
+    async def __aenter__(self) -> "AsyncEMRContainersClient":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _http(self):
+        import aiohttp
+        if self._session is None:
+            self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self._max_connections))
+        return self._session
+
+    async def _call(self, method: str, path: str) -> Dict[str, Any]:
+        from botocore.auth import SigV4Auth
+        from botocore.awsrequest import AWSRequest
+
+        request = AWSRequest(method=method, url=self.endpoint_url + path)
+        SigV4Auth(self._credentials.get_frozen_credentials(), "emr-containers", self.region).add_auth(request)
+        async with self._http().request(method, request.url, headers=dict(request.headers)) as resp:
+            body = await resp.read()
+            payload = json.loads(body) if body else {}
+            if resp.status >= 300:
+                code = resp.headers.get("X-Amzn-ErrorType", "").split(":")[0] or str(resp.status)
+                raise EMRContainersError(code, payload.get("message", ""), resp.status)
+            return payload
+
+    async def describe_job_run(self, id: str, virtualClusterId: str) -> Dict[str, Any]:
+        return await self._call("GET", f"/virtualclusters/{virtualClusterId}/jobruns/{id}")
+
+    async def describe_virtual_cluster(self, id: str) -> Dict[str, Any]:
+        return await self._call("GET", f"/virtualclusters/{id}")
+
+
+class EMRContainersError(Exception):
+    def __init__(self, code: str, message: str, status: int):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+        self.message = message
+        self.status = status
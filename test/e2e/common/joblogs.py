@@ -0,0 +1,444 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Streams the logs of an EMR on EKS job run from its S3 monitoring location.
+
+A job run whose configuration overrides set
+`MonitoringConfiguration.S3MonitoringConfiguration.LogUri` has its container
+logs pushed to S3 under
+
+    <LogUri>/<virtual cluster ID>/jobs/<job run ID>/containers/<spark application ID>/<pod name>/stdout.gz
+                                                                                               /stderr.gz
+
+where the driver pod name ends in `-driver`. The log pusher re-uploads each
+object as the container writes to it, appending gzip members, so the bytes
+already uploaded never change. `JobLogReader` tails these objects with ranged
+GETs starting at the last byte it read, and decompresses what it fetches as a
+stream, so each poll costs one ListObjectsV2 call plus one GetObject per object
+that grew, and neither memory nor transfer grows with the size of the log.
+
+When a live object is rotated, the reader continues from the same offset in
+the rotated object that appeared next to it and restarts the live object from
+the beginning.
+
+`JobLogReader.follow` stops on the first line matching a completion marker, or
+once the job run reaches a terminal state and the logs stop growing. It is used
+by the JobRun e2e assertions and can be run as a CLI from the `test` directory:
+
+    python -m e2e.common.joblogs --log-uri s3://bucket/logs \\
+        --virtual-cluster-id <id> --job-run-id <id> --marker 'Pi is roughly'
+"""
+
+import argparse
+import json
+import logging
+import re
+import sys
+import time
+import zlib
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Pattern, Sequence, Tuple, Union
+
+TERMINAL_JOB_RUN_STATES = ("COMPLETED", "FAILED", "CANCELLED")
+
+DEFAULT_STREAMS = ("stdout", "stderr")
+
+# Matches the name of the driver pod directory
+DRIVER_POD = r".*-driver"
+
+DEFAULT_POLL_SECONDS = 5.0
+
+# How long the logs must stop growing, once the job run has reached a terminal
+# state, before following stops. The log pusher uploads on an interval, so the
+# last lines usually arrive a few polls after the state changes.
+DEFAULT_DRAIN_SECONDS = 60.0
+
+# Size of the chunks read from a GetObject response body
+CHUNK_SIZE = 64 * 1024
+
+# gzip header and trailer, as accepted by zlib
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+# <stream>.gz, <stream>.<rotation>.gz or <stream>, within the pod directory
+_LOG_OBJECT_RE = re.compile(r"^(?P<stream>[a-z]+)(?P<rotation>\.(?!gz$)[\w-]+)?(?P<gz>\.gz)?$")
+
+
+@dataclass(frozen=True)
+class LogLine:
+    # "stdout" or "stderr"
+    stream: str
+    # S3 key of the object the line was read from
+    key: str
+    text: str
+
+
+@dataclass
+class FollowResult:
+    # Why following stopped: "marker", "state" or "timeout"
+    reason: str
+    # The last job run state seen, if the state was followed
+    state: Optional[str] = None
+    # The line that matched the completion marker
+    marker_line: Optional[str] = None
+    lines: int = 0
+    # Compressed bytes fetched from S3
+    bytes_read: int = 0
+    # ListObjectsV2 and GetObject calls made
+    requests: int = 0
+
+    @property
+    def succeeded(self) -> bool:
+        """Whether the job run printed the completion marker or completed.
+        """
+        return self.reason == "marker" or self.state == "COMPLETED"
+
+
+def parse_s3_uri(uri: str) -> Tuple[str, str]:
+    """Returns the bucket and key prefix of an `s3://bucket/prefix` URI. The
+    prefix has no trailing slash.
+    """
+    if not uri.startswith("s3://"):
+        raise ValueError(f"not an S3 URI: {uri}")
+    bucket, _, prefix = uri[len("s3://"):].partition("/")
+    if not bucket:
+        raise ValueError(f"S3 URI has no bucket: {uri}")
+    return bucket, prefix.rstrip("/")
+
+
+def log_uri_from_configuration_overrides(overrides: Union[str, Dict[str, Any], None]) -> Optional[str]:
+    """Returns the S3 log URI of a JobRun's configuration overrides, given as the
+    JSON or YAML string of the CR spec or as the parsed document. Keys are
+    matched case-insensitively since the CR takes the API's camelCase names as
+    well as the PascalCase used in the EMR documentation.
+    """
+    if isinstance(overrides, str):
+        import yaml
+        overrides = yaml.safe_load(overrides)
+    uri = _get_ci(_get_ci(overrides, "monitoringConfiguration"), "s3MonitoringConfiguration")
+    uri = _get_ci(uri, "logUri")
+    return uri if isinstance(uri, str) else None
+
+
+def _get_ci(doc: Any, key: str) -> Any:
+    if not isinstance(doc, dict):
+        return None
+    for k, v in doc.items():
+        if isinstance(k, str) and k.lower() == key.lower():
+            return v
+    return None
+
+
+def job_state_getter(emrcontainers_client, virtual_cluster_id: str, job_run_id: str) -> Callable[[], str]:
+    """Returns a function that describes the job run and returns its state.
+    """
+    def state() -> str:
+        return emrcontainers_client.describe_job_run(
+            id=job_run_id, virtualClusterId=virtual_cluster_id,
+        )["jobRun"]["state"]
+    return state
+
+
+@dataclass
+class _ObjectCursor:
+    """How far an object has been read, and the decoder state at that point.
+    """
+    stream: str
+    gzipped: bool
+    # Compressed bytes consumed
+    offset: int = 0
+    # Decompressed bytes after the last newline
+    partial: bytes = b""
+    _decompressor: Any = field(default=None, repr=False)
+
+    def decode(self, chunk: bytes) -> List[str]:
+        """Feeds a chunk of the object and returns the complete lines it ends.
+        """
+        self.offset += len(chunk)
+        if self.gzipped:
+            chunk = self._decompress(chunk)
+        data = self.partial + chunk
+        *lines, self.partial = data.split(b"\n")
+        return [line.decode("utf-8", errors="replace") for line in lines]
+
+    def _decompress(self, chunk: bytes) -> bytes:
+        out = []
+        while chunk:
+            if self._decompressor is None:
+                self._decompressor = zlib.decompressobj(_GZIP_WBITS)
+            out.append(self._decompressor.decompress(chunk))
+            if not self._decompressor.eof:
+                break
+            # The object is a concatenation of gzip members; the next one
+            # starts in the unused data.
+            chunk = self._decompressor.unused_data
+            self._decompressor = None
+        return b"".join(out)
+
+    def flush(self) -> List[str]:
+        """Returns the last line of the object if it does not end in a newline.
+        """
+        line, self.partial = self.partial, b""
+        return [line.decode("utf-8", errors="replace")] if line else []
+
+
+class JobLogReader:
+    """Tails the container logs of one job run.
+
+        reader = JobLogReader(s3, log_uri, vc_id, job_run_id)
+        result = reader.follow(completion_marker="Pi is roughly", job_state=state, timeout=600)
+    """
+
+    def __init__(
+        self,
+        s3_client,
+        log_uri: str,
+        virtual_cluster_id: str,
+        job_run_id: str,
+        streams: Sequence[str] = DEFAULT_STREAMS,
+        pod: str = DRIVER_POD,
+        poll_seconds: float = DEFAULT_POLL_SECONDS,
+    ):
+        self.s3 = s3_client
+        self.bucket, base = parse_s3_uri(log_uri)
+        self.prefix = "/".join(p for p in (base, virtual_cluster_id, "jobs", job_run_id, "containers") if p) + "/"
+        self.streams = tuple(streams)
+        self.pod = re.compile(pod)
+        self.poll_seconds = poll_seconds
+        self.bytes_read = 0
+        self.requests = 0
+        self._cursors: Dict[str, _ObjectCursor] = {}
+
+    def _list(self) -> List[Dict[str, Any]]:
+        """Returns the log objects of the followed streams, oldest first.
+        """
+        objects = []
+        kwargs = {"Bucket": self.bucket, "Prefix": self.prefix}
+        while True:
+            self.requests += 1
+            page = self.s3.list_objects_v2(**kwargs)
+            for obj in page.get("Contents", []):
+                parts = obj["Key"][len(self.prefix):].split("/")
+                # <spark application ID>/<pod name>/<file>
+                if len(parts) != 3 or not self.pod.fullmatch(parts[1]):
+                    continue
+                match = _LOG_OBJECT_RE.match(parts[2])
+                if match and match.group("stream") in self.streams:
+                    obj["_stream"] = match.group("stream")
+                    obj["_gzipped"] = bool(match.group("gz"))
+                    obj["_rotated"] = bool(match.group("rotation"))
+                    objects.append(obj)
+            if not page.get("IsTruncated"):
+                break
+            kwargs["ContinuationToken"] = page["NextContinuationToken"]
+        # Rotated objects hold older lines than the live object of their stream
+        objects.sort(key=lambda o: (not o["_rotated"], o["LastModified"], o["Key"]))
+        return objects
+
+    def _handle_rotation(self, objects: List[Dict[str, Any]]):
+        """Moves the cursor of each live object that was rotated to the rotated
+        object it was renamed to, so that lines are neither lost nor repeated.
+        A live object counts as rotated when a rotated object of the same stream
+        and pod, at least as large as what was read, appears next to it.
+        """
+        new_rotated = [o for o in objects if o["_rotated"] and o["Key"] not in self._cursors]
+        for obj in objects:
+            cursor = self._cursors.get(obj["Key"])
+            if obj["_rotated"] or cursor is None or cursor.offset == 0:
+                continue
+            directory = obj["Key"].rsplit("/", 1)[0]
+            successor = next(
+                (o for o in new_rotated
+                 if o["_stream"] == cursor.stream and o["Key"].rsplit("/", 1)[0] == directory
+                 and o["Size"] >= cursor.offset),
+                None,
+            )
+            if successor is not None:
+                del self._cursors[obj["Key"]]
+                self._cursors[successor["Key"]] = cursor
+                new_rotated.remove(successor)
+            elif obj["Size"] < cursor.offset:
+                del self._cursors[obj["Key"]]
+                logging.warning("%s shrank below the %d bytes already read; reading it again", obj["Key"], cursor.offset)
+
+    def poll(self) -> List[LogLine]:
+        """Reads whatever was appended to the log objects since the last poll.
+        """
+        objects = self._list()
+        self._handle_rotation(objects)
+        lines = []
+        for obj in objects:
+            key = obj["Key"]
+            cursor = self._cursors.get(key)
+            if cursor is None:
+                cursor = self._cursors[key] = _ObjectCursor(obj["_stream"], obj["_gzipped"])
+            if obj["Size"] <= cursor.offset:
+                continue
+            lines.extend(LogLine(cursor.stream, key, text) for text in self._read(key, obj, cursor))
+        return lines
+
+    def _read(self, key: str, obj: Dict[str, Any], cursor: _ObjectCursor) -> List[str]:
+        self.requests += 1
+        try:
+            # If-Match makes sure the bytes are those of the listed object and
+            # not of one uploaded since.
+            resp = self.s3.get_object(
+                Bucket=self.bucket, Key=key, Range=f"bytes={cursor.offset}-", IfMatch=obj["ETag"],
+            )
+        except Exception as ex:
+            code = getattr(ex, "response", {}).get("Error", {}).get("Code")
+            if code in ("PreconditionFailed", "InvalidRange", "NoSuchKey", "412", "416", "404"):
+                logging.debug("%s changed while reading it (%s); retrying on the next poll", key, code)
+                return []
+            raise
+        lines = []
+        body = resp["Body"]
+        for chunk in body.iter_chunks(CHUNK_SIZE):
+            self.bytes_read += len(chunk)
+            lines.extend(cursor.decode(chunk))
+        return lines
+
+    def flush(self) -> List[LogLine]:
+        """Returns the unterminated last line of every object.
+        """
+        return [LogLine(c.stream, key, text) for key, c in self._cursors.items() for text in c.flush()]
+
+    def lines(
+        self,
+        completion_marker: Union[str, Pattern, None] = None,
+        job_state: Optional[Callable[[], str]] = None,
+        timeout: Optional[float] = None,
+        drain_seconds: float = DEFAULT_DRAIN_SECONDS,
+    ) -> Iterator[LogLine]:
+        """Yields log lines as they are uploaded until the completion marker is
+        seen, the job run has reached a terminal state and its logs have not
+        grown for `drain_seconds`, or `timeout` passes. The outcome is left in
+        `self.result`.
+        """
+        marker = re.compile(completion_marker) if isinstance(completion_marker, str) else completion_marker
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        self.result = result = FollowResult(reason="timeout")
+        terminal_since: Optional[float] = None
+        # When the logs last grew after the job run reached a terminal state
+        quiet_since: Optional[float] = None
+
+        def emit(batch: List[LogLine]) -> Iterator[LogLine]:
+            for line in batch:
+                result.lines += 1
+                yield line
+                if marker is not None and marker.search(line.text):
+                    result.reason = "marker"
+                    result.marker_line = line.text
+                    return
+
+        try:
+            while True:
+                if job_state is not None and terminal_since is None:
+                    result.state = job_state()
+                    if result.state in TERMINAL_JOB_RUN_STATES:
+                        terminal_since = quiet_since = time.monotonic()
+                batch = self.poll()
+                yield from emit(batch)
+                if result.reason == "marker":
+                    return
+                now = time.monotonic()
+                if terminal_since is not None and batch:
+                    quiet_since = now
+                if terminal_since is not None and now - quiet_since >= drain_seconds:
+                    yield from emit(self.flush())
+                    if result.reason != "marker":
+                        result.reason = "state"
+                    return
+                if deadline is not None and now >= deadline:
+                    yield from emit(self.flush())
+                    return
+                time.sleep(self.poll_seconds if deadline is None else max(0, min(self.poll_seconds, deadline - now)))
+        finally:
+            result.bytes_read = self.bytes_read
+            result.requests = self.requests
+
+    def follow(self, on_line: Optional[Callable[[LogLine], None]] = None, **kwargs) -> FollowResult:
+        """Consumes `lines`, passing each line to `on_line`, and returns the
+        outcome.
+        """
+        for line in self.lines(**kwargs):
+            if on_line is not None:
+                on_line(line)
+        return self.result
+
+
+def s3_client(endpoint_url: Optional[str] = None, region: Optional[str] = None):
+    """Returns a boto3 S3 client, using path-style addressing when an endpoint
+    (such as the S3 stand-in) is given.
+    """
+    import boto3
+    kwargs = {}
+    if endpoint_url:
+        from botocore.config import Config
+        kwargs["endpoint_url"] = endpoint_url
+        kwargs["config"] = Config(s3={"addressing_style": "path"})
+    return boto3.client("s3", region_name=region, **kwargs)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--log-uri", required=True, help="the S3MonitoringConfiguration LogUri of the job run")
+    parser.add_argument("--virtual-cluster-id", required=True)
+    parser.add_argument("--job-run-id", required=True)
+    parser.add_argument("--stream", action="append", choices=DEFAULT_STREAMS,
+                        help="stream to follow, may be repeated (default: stdout and stderr)")
+    parser.add_argument("--pod", default=DRIVER_POD, help="regular expression matching the pod directory name")
+    parser.add_argument("--marker", help="stop at the first line matching this regular expression")
+    parser.add_argument("--no-state", action="store_true", help="do not stop when the job run reaches a terminal state")
+    parser.add_argument("--timeout", type=float)
+    parser.add_argument("--poll-seconds", type=float, default=DEFAULT_POLL_SECONDS)
+    parser.add_argument("--drain-seconds", type=float, default=DEFAULT_DRAIN_SECONDS)
+    parser.add_argument("--region")
+    parser.add_argument("--s3-endpoint-url")
+    parser.add_argument("--emr-endpoint-url")
+    parser.add_argument("--json", action="store_true", help="print the outcome as JSON on stderr")
+    args = parser.parse_args(argv)
+
+    streams = args.stream or DEFAULT_STREAMS
+    reader = JobLogReader(
+        s3_client(args.s3_endpoint_url, args.region), args.log_uri,
+        args.virtual_cluster_id, args.job_run_id,
+        streams=streams, pod=args.pod, poll_seconds=args.poll_seconds,
+    )
+    job_state = None
+    if not args.no_state:
+        import boto3
+        emr = boto3.client("emr-containers", region_name=args.region, endpoint_url=args.emr_endpoint_url)
+        job_state = job_state_getter(emr, args.virtual_cluster_id, args.job_run_id)
+
+    def print_line(line: LogLine):
+        print(f"[{line.stream}] {line.text}" if len(streams) > 1 else line.text, flush=True)
+
+    try:
+        result = reader.follow(
+            on_line=print_line, completion_marker=args.marker, job_state=job_state,
+            timeout=args.timeout, drain_seconds=args.drain_seconds,
+        )
+    except KeyboardInterrupt:
+        return 130
+    if args.json:
+        print(json.dumps(result.__dict__), file=sys.stderr)
+    else:
+        print(f"stopped on {result.reason}, state {result.state}", file=sys.stderr)
+    if result.reason == "timeout":
+        return 2
+    return 0 if result.succeeded else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
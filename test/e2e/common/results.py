@@ -0,0 +1,386 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Keeps the measurements of e2e and load runs in SQLite and flags regressions.
+
+`MetricsPlugin` is registered by `test/e2e/conftest.py` when a store is given
+with `--metrics-db` (or `$EMR_METRICS_DB`). It records one run per pytest
+session, tagged with the controller version, the git SHA and an optional
+label, and stores for every passing test
+
+  - each numeric value the test passed to `record_property` (dicts are
+    flattened into `name.key`, so per-operation API call counts are kept),
+  - the duration of the test body as `duration_seconds`,
+  - the peak RSS of every controller process it stopped as
+    `<controller name>.peak_rss_bytes`,
+
+plus the peak RSS of the pytest process itself under the test `session`.
+
+`compare` checks the metrics of one run against the same metrics over a
+window of earlier runs with the same label. A metric regresses when it is
+worse than the baseline median by more than a relative threshold, a number of
+robust standard deviations (1.4826 times the median absolute deviation, or the
+standard deviation when that is 0), and a small absolute floor for durations
+and sizes. Throughput metrics and ratios (`jobrun_throughput`,
+`lifecycles_per_second`, `speedup`, `*_reduction` and the others listed in
+`HIGHER_IS_BETTER`) are better when higher; all others, including API call
+rates such as `calls_per_second`, are better when lower. Run it from the
+`test` directory:
+
+    python -m e2e.common.results compare --db metrics.sqlite --window 10
+
+It exits with 1 when any metric regressed.
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import re
+import resource
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+METRICS_DB_ENV = "EMR_METRICS_DB"
+METRICS_LABEL_ENV = "EMR_METRICS_LABEL"
+CONTROLLER_VERSION_ENV = "ACK_CONTROLLER_VERSION"
+
+# Test name used for metrics of the whole pytest session
+SESSION_TEST = "session"
+
+DEFAULT_WINDOW = 10
+DEFAULT_MIN_SAMPLES = 3
+DEFAULT_RELATIVE_THRESHOLD = 0.10
+DEFAULT_SIGMAS = 3.0
+
+# Metric names matching this are better when higher. They are listed by name,
+# after any "<prefix>." qualifier, because rates of API calls such as
+# `calls_per_second` are better when lower.
+HIGHER_IS_BETTER = re.compile(
+    r"(?:^|\.)(?:jobrun_throughput|throughput_per_second|jobruns_per_second|lifecycles_per_second"
+    r"|drain_per_second|speedup|\w*_reduction)$"
+)
+
+# Smallest change that counts as a regression, by metric name suffix, so that
+# jitter in short durations and small allocations is not flagged
+ABSOLUTE_FLOORS = (("_seconds", 1.0), ("_bytes", 16 * 1024 * 1024))
+
+_REPO_ROOT = Path(__file__).resolve().parents[3]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    controller_version TEXT,
+    git_sha TEXT,
+    label TEXT NOT NULL DEFAULT '',
+    host TEXT
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    test TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (run_id, test, name)
+);
+CREATE INDEX IF NOT EXISTS metrics_by_name ON metrics (test, name, run_id);
+"""
+
+
+def git_sha() -> Optional[str]:
+    """Returns the SHA of the checked out commit, preferring the CI variables.
+    """
+    for env in ("GIT_SHA", "GITHUB_SHA", "PULL_PULL_SHA", "PULL_BASE_SHA"):
+        if os.environ.get(env):
+            return os.environ[env]
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=_REPO_ROOT, capture_output=True, text=True, check=True, timeout=10,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def controller_version() -> Optional[str]:
+    """Returns `$ACK_CONTROLLER_VERSION`, or the appVersion of the Helm chart.
+    """
+    if os.environ.get(CONTROLLER_VERSION_ENV):
+        return os.environ[CONTROLLER_VERSION_ENV]
+    try:
+        for line in (_REPO_ROOT / "helm" / "Chart.yaml").read_text().splitlines():
+            if line.startswith("appVersion:"):
+                return line.split(":", 1)[1].strip().strip('"')
+    except OSError:
+        pass
+    return None
+
+
+def flatten_metrics(name: str, value: Any) -> Iterable[Tuple[str, float]]:
+    """Yields the numeric values of a recorded property, flattening dicts into
+    dotted names. Booleans, strings and None are skipped.
+    """
+    if isinstance(value, bool) or value is None:
+        return
+    if isinstance(value, (int, float)):
+        if math.isfinite(value):
+            yield name, float(value)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            yield from flatten_metrics(f"{name}.{key}", item)
+
+
+class MetricsStore:
+    """The runs and metrics tables of one SQLite file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(str(path))
+        self.db.executescript(_SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def start_run(self, label: str = "", version: Optional[str] = None, sha: Optional[str] = None,
+            started_at: Optional[float] = None) -> int:
+        with self.db:
+            cursor = self.db.execute(
+                "INSERT INTO runs (started_at, controller_version, git_sha, label, host) VALUES (?, ?, ?, ?, ?)",
+                (started_at or time.time(), version, sha, label, socket.gethostname()),
+            )
+        return cursor.lastrowid
+
+    def finish_run(self, run_id: int):
+        with self.db:
+            self.db.execute("UPDATE runs SET finished_at = ? WHERE id = ?", (time.time(), run_id))
+
+    def add(self, run_id: int, test: str, metrics: Iterable[Tuple[str, float]]):
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO metrics (run_id, test, name, value) VALUES (?, ?, ?, ?)",
+                [(run_id, test, name, value) for name, value in metrics],
+            )
+
+    def runs(self, label: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Returns the runs, oldest first.
+        """
+        query = "SELECT id, started_at, finished_at, controller_version, git_sha, label, host FROM runs"
+        params: Tuple = ()
+        if label is not None:
+            query += " WHERE label = ?"
+            params = (label,)
+        columns = ("id", "started_at", "finished_at", "controller_version", "git_sha", "label", "host")
+        return [dict(zip(columns, row)) for row in self.db.execute(query + " ORDER BY id", params)]
+
+    def metrics(self, run_ids: Sequence[int]) -> Dict[Tuple[str, str], Dict[int, float]]:
+        """Returns the metrics of the runs, keyed by (test, name) then run ID.
+        """
+        values: Dict[Tuple[str, str], Dict[int, float]] = {}
+        if not run_ids:
+            return values
+        placeholders = ",".join("?" * len(run_ids))
+        for run_id, test, name, value in self.db.execute(
+            f"SELECT run_id, test, name, value FROM metrics WHERE run_id IN ({placeholders})", tuple(run_ids),
+        ):
+            values.setdefault((test, name), {})[run_id] = value
+        return values
+
+
+@dataclass
+class Comparison:
+    test: str
+    name: str
+    value: float
+    baseline_median: float
+    # Robust standard deviation of the baseline
+    baseline_sigma: float
+    samples: int
+    # Relative change from the baseline median, positive when worse
+    change: float
+    regressed: bool
+    improved: bool
+
+
+def compare_metric(test: str, name: str, value: float, baseline: Sequence[float],
+        relative_threshold: float = DEFAULT_RELATIVE_THRESHOLD, sigmas: float = DEFAULT_SIGMAS) -> Comparison:
+    median = statistics.median(baseline)
+    mad = statistics.median(abs(v - median) for v in baseline)
+    sigma = 1.4826 * mad if mad else (statistics.stdev(baseline) if len(baseline) > 1 else 0.0)
+    worse = (median - value) if HIGHER_IS_BETTER.search(name) else (value - median)
+    floor = next((f for suffix, f in ABSOLUTE_FLOORS if name.endswith(suffix)), 0.0)
+    tolerance = max(relative_threshold * abs(median), sigmas * sigma, floor)
+    change = worse / abs(median) if median else (math.inf if worse > 0 else 0.0)
+    return Comparison(
+        test=test, name=name, value=value, baseline_median=median, baseline_sigma=round(sigma, 6),
+        samples=len(baseline), change=change,
+        regressed=worse > tolerance, improved=-worse > tolerance,
+    )
+
+
+def compare(store: MetricsStore, run_id: Optional[int] = None, window: int = DEFAULT_WINDOW,
+        min_samples: int = DEFAULT_MIN_SAMPLES, relative_threshold: float = DEFAULT_RELATIVE_THRESHOLD,
+        sigmas: float = DEFAULT_SIGMAS) -> Tuple[Dict[str, Any], List[Comparison]]:
+    """Compares a run (the latest by default) with the `window` runs with the
+    same label before it. Metrics with fewer than `min_samples` baseline values
+    are not compared. Returns the run and the comparisons.
+    """
+    runs = store.runs()
+    if not runs:
+        raise LookupError(f"{store.path} holds no runs")
+    current = runs[-1] if run_id is None else next((r for r in runs if r["id"] == run_id), None)
+    if current is None:
+        raise LookupError(f"{store.path} holds no run {run_id}")
+    baseline_ids = [r["id"] for r in runs if r["label"] == current["label"] and r["id"] < current["id"]][-window:]
+
+    values = store.metrics(baseline_ids + [current["id"]])
+    comparisons = []
+    for (test, name), by_run in sorted(values.items()):
+        if current["id"] not in by_run:
+            continue
+        baseline = [by_run[i] for i in baseline_ids if i in by_run]
+        if len(baseline) < min_samples:
+            continue
+        comparisons.append(compare_metric(test, name, by_run[current["id"]], baseline, relative_threshold, sigmas))
+    return current, comparisons
+
+
+def render_comparisons(run: Dict[str, Any], comparisons: List[Comparison], all_metrics: bool = False) -> str:
+    """Renders the regressions and improvements (or every comparison) as a
+    Markdown table.
+    """
+    shown = [c for c in comparisons if all_metrics or c.regressed or c.improved]
+    lines = [
+        f"Run {run['id']} ({run['label'] or 'no label'}, controller {run['controller_version']}, "
+        f"git {(run['git_sha'] or 'unknown')[:12]}): {len(comparisons)} metrics compared, "
+        f"{sum(c.regressed for c in comparisons)} regressed, {sum(c.improved for c in comparisons)} improved",
+    ]
+    if shown:
+        lines += ["", "| test | metric | value | baseline median | change | verdict |", "|---|---|---|---|---|---|"]
+        for c in shown:
+            verdict = "REGRESSED" if c.regressed else "improved" if c.improved else "ok"
+            lines.append(
+                f"| {c.test} | {c.name} | {c.value:.6g} | {c.baseline_median:.6g} | {c.change:+.1%} | {verdict} |"
+            )
+    return "\n".join(lines) + "\n"
+
+
+class MetricsPlugin:
+    """Pytest plugin storing the metrics of each session as one run.
+    """
+
+    def __init__(self, path, label: str = ""):
+        self.path = path
+        self.label = label
+        self.store: Optional[MetricsStore] = None
+        self.run_id: Optional[int] = None
+        self._current_test = SESSION_TEST
+        # Metrics collected outside the call phase, by test
+        self._pending: Dict[str, List[Tuple[str, float]]] = {}
+
+    @classmethod
+    def from_config(cls, config) -> Optional["MetricsPlugin"]:
+        path = config.getoption("--metrics-db") or os.environ.get(METRICS_DB_ENV)
+        if not path:
+            return None
+        label = config.getoption("--metrics-label") or os.environ.get(METRICS_LABEL_ENV, "")
+        return cls(path, label)
+
+    def _on_controller_stop(self, controller):
+        rss = controller.peak_rss_bytes()
+        if rss is not None:
+            self._pending.setdefault(self._current_test, []).append((f"{controller.name}.peak_rss_bytes", rss))
+
+    def pytest_sessionstart(self, session):
+        from e2e.common import controller
+        self.store = MetricsStore(self.path)
+        self.run_id = self.store.start_run(self.label, controller_version(), git_sha())
+        controller.STOP_HOOKS.append(self._on_controller_stop)
+
+    def pytest_runtest_setup(self, item):
+        self._current_test = item.nodeid
+
+    def pytest_runtest_logreport(self, report):
+        if report.when != "call" or not report.passed:
+            return
+        metrics = [("duration_seconds", report.duration)]
+        for name, value in report.user_properties:
+            metrics.extend(flatten_metrics(name, value))
+        self.store.add(self.run_id, report.nodeid, metrics)
+
+    def pytest_sessionfinish(self, session):
+        from e2e.common import controller
+        if self._on_controller_stop in controller.STOP_HOOKS:
+            controller.STOP_HOOKS.remove(self._on_controller_stop)
+        # ru_maxrss is in KiB on Linux
+        self._pending.setdefault(SESSION_TEST, []).append(
+            ("peak_rss_bytes", resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024),
+        )
+        for test, metrics in self._pending.items():
+            self.store.add(self.run_id, test, metrics)
+        self.store.finish_run(self.run_id)
+        self.store.close()
+        logging.info("metrics of this session stored as run %d in %s", self.run_id, self.path)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    runs = commands.add_parser("runs", help="list the stored runs")
+    runs.add_argument("--db", default=os.environ.get(METRICS_DB_ENV), required=METRICS_DB_ENV not in os.environ)
+    runs.add_argument("--label")
+    cmp = commands.add_parser("compare", help="compare a run with the runs before it")
+    cmp.add_argument("--db", default=os.environ.get(METRICS_DB_ENV), required=METRICS_DB_ENV not in os.environ)
+    cmp.add_argument("--run", type=int, help="run to check (default: the latest)")
+    cmp.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="number of earlier runs in the baseline")
+    cmp.add_argument("--min-samples", type=int, default=DEFAULT_MIN_SAMPLES)
+    cmp.add_argument("--relative-threshold", type=float, default=DEFAULT_RELATIVE_THRESHOLD)
+    cmp.add_argument("--sigmas", type=float, default=DEFAULT_SIGMAS)
+    cmp.add_argument("--all", action="store_true", help="show every compared metric")
+    cmp.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    store = MetricsStore(args.db)
+    try:
+        if args.command == "runs":
+            for run in store.runs(args.label):
+                print(json.dumps(run))
+            return 0
+        try:
+            run, comparisons = compare(
+                store, args.run, args.window, args.min_samples, args.relative_threshold, args.sigmas,
+            )
+        except LookupError as ex:
+            print(ex, file=sys.stderr)
+            return 2
+    finally:
+        store.close()
+
+    if args.json:
+        print(json.dumps({"run": run, "comparisons": [asdict(c) for c in comparisons]}, indent=2))
+    else:
+        print(render_comparisons(run, comparisons, args.all), end="")
+    return 1 if any(c.regressed for c in comparisons) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Splits resources between controller shards.
+
+A sharded deployment runs several independent controllers, each watching a
+slice of the resources through the existing `--watch-namespace` and
+`--watch-selectors` flags. The helpers here compute the same assignment as the
+`sharding` section of the Helm chart, so that the benchmarks start local
+controller processes configured the way the chart would deploy them.
+
+In "namespace" mode the watched namespaces are dealt out round-robin: shard `i`
+of `k` watches every namespace whose index in the list is `i` modulo `k`.
+
+In "label" mode every resource carries `SHARD_LABEL`, set by whoever creates it
+to a bucket number computed with `bucket_of`. Shard `i` of `k` watches the
+buckets that are `i` modulo `k`, so the same labels can be spread over any
+number of shards up to the number of buckets without relabelling.
+"""
+
+from typing import Dict, List
+
+NAMESPACE_MODE = "namespace"
+LABEL_MODE = "label"
+MODES = (NAMESPACE_MODE, LABEL_MODE)
+
+SHARD_LABEL = "emrcontainers.services.k8s.aws/shard"
+
+# Default number of label buckets; `sharding.buckets` in the Helm chart
+DEFAULT_BUCKETS = 16
+
+_FNV_OFFSET_BASIS = 0x811c9dc5
+_FNV_PRIME = 0x01000193
+
+
+def bucket_of(namespace: str, name: str, buckets: int = DEFAULT_BUCKETS) -> int:
+    """Returns the label bucket of the resource `name` in `namespace`.
+
+    The bucket is the 32-bit FNV-1a hash of "namespace/name" modulo `buckets`,
+    which is stable across processes and languages.
+    """
+    h = _FNV_OFFSET_BASIS
+    for byte in f"{namespace}/{name}".encode():
+        h = ((h ^ byte) * _FNV_PRIME) & 0xffffffff
+    return h % buckets
+
+
+def label_bucket(manifest: Dict, buckets: int = DEFAULT_BUCKETS, namespace: str = "default") -> int:
+    """Sets `SHARD_LABEL` on the manifest to its bucket and returns the bucket.
+    """
+    metadata = manifest["metadata"]
+    bucket = bucket_of(metadata.get("namespace", namespace), metadata["name"], buckets)
+    metadata.setdefault("labels", {})[SHARD_LABEL] = str(bucket)
+    return bucket
+
+
+def shard_name(shard: int) -> str:
+    """Returns the value of `--shard-name` for the shard, which also names its
+    leader election lease.
+    """
+    return f"shard-{shard}"
+
+
+def shard_namespaces(namespaces: List[str], shards: int, shard: int) -> List[str]:
+    """Returns the namespaces watched by `shard` in namespace mode.
+    """
+    if len(namespaces) < shards:
+        raise ValueError(f"{shards} shards need at least as many namespaces, got {len(namespaces)}")
+    return namespaces[shard::shards]
+
+
+def shard_buckets(shards: int, shard: int, buckets: int = DEFAULT_BUCKETS) -> List[int]:
+    """Returns the label buckets watched by `shard` in label mode.
+    """
+    if buckets < shards:
+        raise ValueError(f"{shards} shards need at least as many buckets, got {buckets}")
+    return list(range(shard, buckets, shards))
+
+
+def shard_selector(
+    shards: int,
+    shard: int,
+    buckets: int = DEFAULT_BUCKETS,
+    watch_selectors: str = "",
+) -> str:
+    """Returns the `--watch-selectors` value of `shard` in label mode, combined
+    with the selectors every shard watches.
+    """
+    selector = f"{SHARD_LABEL} in ({','.join(str(b) for b in shard_buckets(shards, shard, buckets))})"
+    return f"{watch_selectors},{selector}" if watch_selectors else selector
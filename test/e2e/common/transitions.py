@@ -0,0 +1,431 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Records JobRun state transitions from CR watch events and reports queueing
+and run time per virtual cluster.
+
+`TransitionRecorder.observe` takes the (event type, object) pairs of a JobRun
+watch, such as the listeners of `e2e.common.aio.CustomResourceWatcher`, and
+appends a row whenever a JobRun's `status.state` changes. The creation of each
+CR is recorded as a `CREATED` row at `metadata.creationTimestamp`. JobRuns that
+reference their virtual cluster through `virtualClusterRef` are reported under
+the referenced VirtualCluster CR's `status.id`, looked up through the
+recorder's `resolve_virtual_cluster`. Rows are held
+in three parallel `array.array` columns (run index, state code, epoch seconds),
+13 bytes per transition, with the run names and virtual cluster IDs interned
+in side tables. The same columns are written to disk as raw little-endian
+arrays after a small JSON header, so recording tens of thousands of runs stays
+cheap and loading is a handful of `frombytes` calls.
+
+Times are observation times: the controller refreshes `status.state` when it
+requeues a JobRun, so a transition is seen up to one requeue period after it
+happens in EMR on EKS. States already reached when recording starts, from the
+initial listing of `observe_all`, are recorded without a time: they changed
+while nothing was watching, so no duration starting or ending at one of them
+is reported.
+
+From the transitions, each run gets
+
+  - queue time: from the creation of the CR to the first RUNNING state, the
+    time a user waits before the job runs;
+  - EMR queue time: from the first PENDING or SUBMITTED state to RUNNING, the
+    part of the queue time spent in EMR on EKS;
+  - run time: from the first RUNNING state to the first terminal state.
+
+`report` aggregates them into percentiles per virtual cluster. The module also
+runs standalone from the `test` directory, against the JobRun CRs of the
+current kubeconfig's cluster:
+
+    python -m e2e.common.transitions record --output jobruns.jrt --namespace default
+    python -m e2e.common.transitions report jobruns.jrt
+"""
+
+import argparse
+import array
+import asyncio
+import json
+import logging
+import math
+import os
+import struct
+import sys
+import time
+
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from e2e.common.workload import percentile
+
+CREATED = "CREATED"
+TERMINAL_STATES = ("COMPLETED", "FAILED", "CANCELLED")
+
+# Known states get stable codes; unknown ones are appended to the state table
+STATES = (CREATED, "PENDING", "SUBMITTED", "RUNNING", "CANCEL_PENDING") + TERMINAL_STATES
+
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+_MAGIC = b"JRTR"
+_VERSION = 1
+# magic, version, header length
+_PREAMBLE = struct.Struct("<4sII")
+_LENGTH = struct.Struct("<Q")
+
+# Column name and array typecode, in file order
+_COLUMNS = (("run", "I"), ("state", "B"), ("time", "d"))
+
+
+@dataclass
+class RunTimes:
+    name: str
+    virtual_cluster: str
+    # The last state recorded
+    state: str
+    queue_seconds: Optional[float] = None
+    emr_queue_seconds: Optional[float] = None
+    run_seconds: Optional[float] = None
+
+
+@dataclass
+class VirtualClusterReport:
+    virtual_cluster: str
+    runs: int
+    # Number of runs by last recorded state
+    states: Dict[str, int] = field(default_factory=dict)
+    # Percentiles of each duration, keyed by metric then by "p50", "p90", ...
+    queue_seconds: Dict[str, Optional[float]] = field(default_factory=dict)
+    emr_queue_seconds: Dict[str, Optional[float]] = field(default_factory=dict)
+    run_seconds: Dict[str, Optional[float]] = field(default_factory=dict)
+
+
+class TransitionRecorder:
+    """An append-only, column-oriented log of JobRun state transitions.
+
+    `resolve_virtual_cluster`, when set, maps the namespace and name of a
+    VirtualCluster CR to its ID, or None while the CR has none.
+    """
+
+    def __init__(self, resolve_virtual_cluster: Optional[Callable[[str, str], Optional[str]]] = None):
+        self.resolve_virtual_cluster = resolve_virtual_cluster
+        self.runs = array.array("I")
+        self.states = array.array("B")
+        self.times = array.array("d")
+        self.state_names: List[str] = list(STATES)
+        self.virtual_clusters: List[str] = []
+        # (uid, namespace/name, virtual cluster index) of each run
+        self.run_keys: List[Tuple[str, str, int]] = []
+
+        self._state_index = {name: i for i, name in enumerate(self.state_names)}
+        self._vc_index: Dict[str, int] = {}
+        self._run_index: Dict[str, int] = {}
+        # Last recorded state code of each run, to drop repeated states
+        self._last_state: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def _intern_state(self, state: str) -> int:
+        code = self._state_index.get(state)
+        if code is None:
+            if len(self.state_names) > 255:
+                raise ValueError(f"too many distinct states to record {state}")
+            code = self._state_index[state] = len(self.state_names)
+            self.state_names.append(state)
+        return code
+
+    def _intern_virtual_cluster(self, virtual_cluster: str) -> int:
+        vc = self._vc_index.get(virtual_cluster)
+        if vc is None:
+            vc = self._vc_index[virtual_cluster] = len(self.virtual_clusters)
+            self.virtual_clusters.append(virtual_cluster)
+        return vc
+
+    def _intern_run(self, uid: str, name: str, virtual_cluster: str) -> Tuple[int, bool]:
+        index = self._run_index.get(uid)
+        if index is not None:
+            # A run first seen before its virtual cluster reference resolved
+            # moves to the virtual cluster once it does.
+            key = self.run_keys[index]
+            if virtual_cluster and not self.virtual_clusters[key[2]]:
+                self.run_keys[index] = (key[0], key[1], self._intern_virtual_cluster(virtual_cluster))
+            return index, False
+        vc = self._intern_virtual_cluster(virtual_cluster)
+        index = self._run_index[uid] = len(self.run_keys)
+        self.run_keys.append((uid, name, vc))
+        return index, True
+
+    def record(self, run: int, state: str, timestamp: float):
+        code = self._intern_state(state)
+        if self._last_state.get(run) == code:
+            return
+        self._last_state[run] = code
+        self.runs.append(run)
+        self.states.append(code)
+        self.times.append(timestamp)
+
+    def _virtual_cluster(self, obj: Dict[str, Any]) -> str:
+        """Returns the ID of the JobRun's virtual cluster, or "" while its
+        reference cannot be resolved.
+        """
+        spec = obj.get("spec", {})
+        if spec.get("virtualClusterID"):
+            return spec["virtualClusterID"]
+        ref = spec.get("virtualClusterRef", {}).get("from", {})
+        if not ref.get("name") or self.resolve_virtual_cluster is None:
+            return ""
+        namespace = ref.get("namespace") or obj.get("metadata", {}).get("namespace", "")
+        return self.resolve_virtual_cluster(namespace, ref["name"]) or ""
+
+    def observe(self, event_type: str, obj: Dict[str, Any], timestamp: Optional[float] = None):
+        """Records the state of a JobRun CR from a watch event. Events that do
+        not change the state are ignored, as are deletions. A NaN `timestamp`
+        records the state without a time.
+        """
+        if event_type not in ("ADDED", "MODIFIED"):
+            return
+        metadata = obj.get("metadata", {})
+        uid = metadata.get("uid") or f"{metadata.get('namespace')}/{metadata.get('name')}"
+        run, new = self._intern_run(uid, f"{metadata.get('namespace')}/{metadata.get('name')}", self._virtual_cluster(obj))
+        if new:
+            created = _parse_timestamp(metadata.get("creationTimestamp"))
+            if created is not None:
+                self.record(run, CREATED, created)
+        state = obj.get("status", {}).get("state")
+        if state:
+            self.record(run, state, timestamp if timestamp is not None else time.time())
+
+    def observe_all(self, objects: Iterable[Dict[str, Any]]):
+        """Records the JobRun CRs of an initial listing. Their states were
+        reached before the listing, at unknown times.
+        """
+        for obj in objects:
+            self.observe("ADDED", obj, timestamp=math.nan)
+
+    # Queries
+
+    def run_times(self) -> List[RunTimes]:
+        """Returns the durations of every recorded run, in a single pass over
+        the columns.
+        """
+        created = self._intern_state(CREATED)
+        queued = {self._intern_state("PENDING"), self._intern_state("SUBMITTED")}
+        running = self._intern_state("RUNNING")
+        terminal = {self._intern_state(s) for s in TERMINAL_STATES}
+
+        n = len(self.run_keys)
+        created_at: List[Optional[float]] = [None] * n
+        queued_at: List[Optional[float]] = [None] * n
+        running_at: List[Optional[float]] = [None] * n
+        finished_at: List[Optional[float]] = [None] * n
+        last: List[int] = [created] * n
+        for run, code, ts in zip(self.runs, self.states, self.times):
+            last[run] = code
+            if code == created:
+                created_at[run] = ts
+            elif code in queued:
+                if queued_at[run] is None:
+                    queued_at[run] = ts
+            elif code == running:
+                if running_at[run] is None:
+                    running_at[run] = ts
+            elif code in terminal and finished_at[run] is None:
+                finished_at[run] = ts
+
+        times = []
+        for run, (_, name, vc) in enumerate(self.run_keys):
+            times.append(RunTimes(
+                name=name,
+                virtual_cluster=self.virtual_clusters[vc],
+                state=self.state_names[last[run]],
+                queue_seconds=_elapsed(created_at[run], running_at[run]),
+                emr_queue_seconds=_elapsed(queued_at[run], running_at[run]),
+                run_seconds=_elapsed(running_at[run], finished_at[run]),
+            ))
+        return times
+
+    def report(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> List[VirtualClusterReport]:
+        """Returns percentiles of the queue, EMR queue and run times of the runs
+        of each virtual cluster, ordered by virtual cluster.
+        """
+        by_vc: Dict[str, List[RunTimes]] = {}
+        for times in self.run_times():
+            by_vc.setdefault(times.virtual_cluster, []).append(times)
+
+        reports = []
+        for vc in sorted(by_vc):
+            runs = by_vc[vc]
+            report = VirtualClusterReport(virtual_cluster=vc, runs=len(runs))
+            for times in runs:
+                report.states[times.state] = report.states.get(times.state, 0) + 1
+            for metric in ("queue_seconds", "emr_queue_seconds", "run_seconds"):
+                values = [getattr(t, metric) for t in runs if getattr(t, metric) is not None]
+                setattr(report, metric, {f"p{q:g}": _round(percentile(values, q)) for q in percentiles})
+            reports.append(report)
+        return reports
+
+    # Storage
+
+    def save(self, path: Path):
+        """Writes the recorder to `path`, replacing it atomically.
+        """
+        header = json.dumps({
+            "states": self.state_names,
+            "virtual_clusters": self.virtual_clusters,
+            "runs": self.run_keys,
+            "columns": _COLUMNS,
+            "rows": len(self),
+        }).encode()
+        tmp = Path(f"{path}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(_PREAMBLE.pack(_MAGIC, _VERSION, len(header)))
+            f.write(header)
+            for column in (self.runs, self.states, self.times):
+                if sys.byteorder == "big":
+                    column = array.array(column.typecode, column)
+                    column.byteswap()
+                data = column.tobytes()
+                f.write(_LENGTH.pack(len(data)))
+                f.write(data)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "TransitionRecorder":
+        recorder = cls()
+        with open(path, "rb") as f:
+            preamble = f.read(_PREAMBLE.size)
+            magic, version, header_length = _PREAMBLE.unpack(preamble) if len(preamble) == _PREAMBLE.size else (b"", 0, 0)
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f"{path} is not a version {_VERSION} JobRun transition file")
+            header = json.loads(f.read(header_length))
+            columns = []
+            for _, typecode in header["columns"]:
+                (length,) = _LENGTH.unpack(f.read(_LENGTH.size))
+                column = array.array(typecode)
+                column.frombytes(f.read(length))
+                if sys.byteorder == "big":
+                    column.byteswap()
+                columns.append(column)
+        recorder.runs, recorder.states, recorder.times = columns
+        recorder.state_names = header["states"]
+        recorder.virtual_clusters = header["virtual_clusters"]
+        recorder.run_keys = [tuple(key) for key in header["runs"]]
+        recorder._state_index = {name: i for i, name in enumerate(recorder.state_names)}
+        recorder._vc_index = {vc: i for i, vc in enumerate(recorder.virtual_clusters)}
+        recorder._run_index = {key[0]: i for i, key in enumerate(recorder.run_keys)}
+        recorder._last_state = {run: code for run, code in zip(recorder.runs, recorder.states)}
+        return recorder
+
+
+def render_report(reports: List[VirtualClusterReport]) -> str:
+    """Renders the reports as a Markdown table.
+    """
+    if not reports:
+        return "No JobRuns recorded.\n"
+    quantiles = list(reports[0].queue_seconds)
+    columns = ["virtual cluster", "runs", "states"]
+    for metric in ("queue", "EMR queue", "run"):
+        columns += [f"{metric} {q}" for q in quantiles]
+    lines = ["| " + " | ".join(columns) + " |", "|" + "---|" * len(columns)]
+    for r in reports:
+        states = ", ".join(f"{state} {count}" for state, count in sorted(r.states.items()))
+        cells = [r.virtual_cluster, str(r.runs), states]
+        for values in (r.queue_seconds, r.emr_queue_seconds, r.run_seconds):
+            cells += ["-" if values[q] is None else f"{values[q]:.1f}s" for q in quantiles]
+        lines.append("| " + " | ".join(cells) + " |")
+    return "\n".join(lines) + "\n"
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def _elapsed(start: Optional[float], end: Optional[float]) -> Optional[float]:
+    if start is None or end is None or math.isnan(start) or math.isnan(end):
+        return None
+    return max(0.0, end - start)
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 3)
+
+
+async def record_cluster(output: Path, namespace: str, label_selector: Optional[str],
+        duration: Optional[float], flush_seconds: float):
+    """Watches the JobRun CRs of the namespace and records their transitions to
+    `output`, continuing an existing file, until `duration` passes or the task
+    is cancelled.
+    """
+    from e2e import CRD_GROUP, CRD_VERSION
+    from e2e.common.aio import CustomResourceWatcher, new_custom_objects_api
+    from e2e.common.workload import JR_RESOURCE_PLURAL, VC_RESOURCE_PLURAL
+
+    recorder = TransitionRecorder.load(output) if output.exists() else TransitionRecorder()
+    api = await new_custom_objects_api()
+    # Virtual cluster references resolve against the VirtualCluster CRs of the
+    # same namespace.
+    vc_watcher = CustomResourceWatcher(api, CRD_GROUP, CRD_VERSION, VC_RESOURCE_PLURAL, namespace)
+    recorder.resolve_virtual_cluster = lambda ns, name: (
+        (vc_watcher.objects.get(name) or {}).get("status", {}).get("id") if ns == namespace else None
+    )
+    watcher = CustomResourceWatcher(api, CRD_GROUP, CRD_VERSION, JR_RESOURCE_PLURAL, namespace, label_selector)
+    watcher.listeners.append(recorder.observe)
+    deadline = time.monotonic() + duration if duration is not None else None
+    try:
+        async with vc_watcher, watcher:
+            recorder.observe_all(watcher.objects.values())
+            while deadline is None or time.monotonic() < deadline:
+                await asyncio.sleep(flush_seconds if deadline is None else min(flush_seconds, max(0, deadline - time.monotonic())))
+                recorder.save(output)
+                logging.info("%d transitions of %d JobRuns recorded", len(recorder), len(recorder.run_keys))
+    finally:
+        recorder.save(output)
+        await api.api_client.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.getLogger().setLevel(logging.INFO)
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="record the transitions of a cluster's JobRun CRs")
+    record.add_argument("--output", type=Path, required=True)
+    record.add_argument("--namespace", default="default")
+    record.add_argument("--label-selector")
+    record.add_argument("--duration", type=float, help="stop after this many seconds (default: until interrupted)")
+    record.add_argument("--flush-seconds", type=float, default=30)
+    report = commands.add_parser("report", help="print per virtual cluster percentiles of a recording")
+    report.add_argument("input", type=Path)
+    report.add_argument("--percentiles", type=lambda s: [float(q) for q in s.split(",")], default=DEFAULT_PERCENTILES)
+    report.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        try:
+            asyncio.run(record_cluster(args.output, args.namespace, args.label_selector, args.duration, args.flush_seconds))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    reports = TransitionRecorder.load(args.input).report(args.percentiles)
+    if args.json:
+        print(json.dumps([asdict(r) for r in reports], indent=2))
+    else:
+        print(render_report(reports), end="")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
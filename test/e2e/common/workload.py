@@ -0,0 +1,290 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Creates and tracks batches of JobRun CRs for the scenario and benchmark
+modules.
+
+A workload is a set of JobRuns that share the `WORKLOAD_LABEL` label, all
+pointing at a virtual cluster by ID (rather than through a VirtualCluster CR) so
+that they can be driven against the emr-containers stand-in. VirtualCluster
+workloads are labelled the same way.
+"""
+
+import copy
+import logging
+import math
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from e2e import CRD_GROUP, CRD_VERSION, load_resource
+
+JR_RESOURCE_PLURAL = "jobruns"
+JRS_RESOURCE_PLURAL = "jobrunsets"
+VC_RESOURCE_PLURAL = "virtualclusters"
+WORKLOAD_LABEL = "emrcontainers.services.k8s.aws/workload"
+
+# Any well-formed ARN is accepted by the stand-in
+STANDIN_EXECUTION_ROLE = "arn:aws:iam::111122223333:role/ack-emrcontainers-standin"
+STANDIN_RELEASE_LABEL = "emr-6.3.0-latest"
+STANDIN_EKS_CLUSTER = "standin-cluster"
+
+# Number of threads used to create CRs
+CREATE_WORKERS = 16
+
+# Time between two polls of the JobRun list
+POLL_SECONDS = 1
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Returns the `q`th percentile (0-100) of `values` using the nearest-rank
+    method, or None for an empty list.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    # q * n / 100 rather than q / 100 * n, which is 7.000000000000001 for p7 of 100
+    return ordered[max(0, math.ceil(q * len(ordered) / 100) - 1)]
+
+
+def custom_objects_api():
+    import kubernetes
+    from acktest import k8s
+    return kubernetes.client.CustomObjectsApi(k8s._get_k8s_api_client())
+
+
+def ensure_namespaces(namespaces: List[str]):
+    """Creates the namespaces that do not exist yet.
+    """
+    import kubernetes
+    from acktest import k8s
+    api = kubernetes.client.CoreV1Api(k8s._get_k8s_api_client())
+    for namespace in namespaces:
+        try:
+            api.create_namespace({"metadata": {"name": namespace}})
+        except kubernetes.client.exceptions.ApiException as ex:
+            if ex.status != 409:
+                raise
+
+
+def jobrun_manifests(
+    workload_id: str,
+    virtual_cluster_id: str,
+    count: int,
+    name_prefix: Optional[str] = None,
+    mutate: Optional[Callable[[int, Dict], None]] = None,
+) -> List[Dict]:
+    """Returns `count` JobRun manifests for the workload. `mutate`, if given, is
+    called with the index and manifest of each JobRun before it is returned.
+    """
+    template = load_resource("job_run_standin", additional_replacements={
+        "JOBRUN_NAME": "placeholder",
+        "WORKLOAD_ID": workload_id,
+        "VIRTUALCLUSTER_ID": virtual_cluster_id,
+        "JOB_EXECUTION_ROLE": STANDIN_EXECUTION_ROLE,
+        "EMR_RELEASE_LABEL": STANDIN_RELEASE_LABEL,
+    })
+    prefix = name_prefix or workload_id
+    manifests = []
+    for i in range(count):
+        manifest = copy.deepcopy(template)
+        name = f"{prefix}-{i:05d}"
+        manifest["metadata"]["name"] = name
+        manifest["spec"]["name"] = name
+        if mutate is not None:
+            mutate(i, manifest)
+        manifests.append(manifest)
+    return manifests
+
+
+def jobrunset_manifest(
+    workload_id: str,
+    virtual_cluster_id: str,
+    count: int,
+    name: Optional[str] = None,
+) -> Dict:
+    """Returns a JobRunSet manifest for the workload with a range of `count`
+    members. Each member passes its range value as its only entry point
+    argument.
+    """
+    name = name or workload_id
+    manifest = load_resource("job_run_set_standin", additional_replacements={
+        "JOBRUNSET_NAME": name,
+        "WORKLOAD_ID": workload_id,
+        "VIRTUALCLUSTER_ID": virtual_cluster_id,
+        "JOB_EXECUTION_ROLE": STANDIN_EXECUTION_ROLE,
+        "EMR_RELEASE_LABEL": STANDIN_RELEASE_LABEL,
+        "LAST_MEMBER": str(count - 1),
+    })
+    manifest["spec"]["template"]["jobDriver"]["sparkSubmitJobDriver"]["entryPointArguments"] = ["$(value)"]
+    return manifest
+
+
+def virtualcluster_manifests(
+    workload_id: str,
+    count: int,
+    name_prefix: Optional[str] = None,
+    eks_cluster: str = STANDIN_EKS_CLUSTER,
+) -> List[Dict]:
+    """Returns `count` VirtualCluster manifests for the workload.
+    """
+    template = load_resource("virtual_cluster_standin", additional_replacements={
+        "VIRTUALCLUSTER_NAME": "placeholder",
+        "WORKLOAD_ID": workload_id,
+        "EKS_CLUSTER_NAME": eks_cluster,
+    })
+    prefix = name_prefix or workload_id
+    manifests = []
+    for i in range(count):
+        manifest = copy.deepcopy(template)
+        name = f"{prefix}-{i:05d}"
+        manifest["metadata"]["name"] = name
+        manifest["spec"]["name"] = name
+        manifests.append(manifest)
+    return manifests
+
+
+def create_resources(
+    plural: str,
+    manifests: List[Dict],
+    namespace: str = "default",
+    workers: int = CREATE_WORKERS,
+) -> Dict[str, float]:
+    """Creates the CRs and returns the creation time of each, keyed by name.
+    """
+    api = custom_objects_api()
+    created = {}
+
+    def create(manifest: Dict):
+        ns = manifest["metadata"].get("namespace", namespace)
+        api.create_namespaced_custom_object(CRD_GROUP, CRD_VERSION, ns, plural, manifest)
+        created[manifest["metadata"]["name"]] = time.monotonic()
+
+    with ThreadPoolExecutor(workers) as pool:
+        list(pool.map(create, manifests))
+    return created
+
+
+def list_resources(plural: str, workload_id: str, namespace: Optional[str] = "default") -> List[Dict]:
+    api = custom_objects_api()
+    selector = f"{WORKLOAD_LABEL}={workload_id}"
+    if namespace is None:
+        result = api.list_cluster_custom_object(CRD_GROUP, CRD_VERSION, plural, label_selector=selector)
+    else:
+        result = api.list_namespaced_custom_object(CRD_GROUP, CRD_VERSION, namespace, plural, label_selector=selector)
+    return result["items"]
+
+
+def delete_resources(plural: str, workload_id: str, namespaces: List[str] = ["default"]):
+    api = custom_objects_api()
+    for namespace in namespaces:
+        try:
+            api.delete_collection_namespaced_custom_object(
+                CRD_GROUP, CRD_VERSION, namespace, plural,
+                label_selector=f"{WORKLOAD_LABEL}={workload_id}",
+            )
+        except Exception as ex:
+            logging.warning("could not delete %s of workload %s in %s: %s", plural, workload_id, namespace, ex)
+
+
+def wait_for_deleted(plural: str, workload_id: str, namespaces: List[str] = ["default"], timeout: float = 300):
+    """Polls until the workload's CRs of `plural` are gone from `namespaces`,
+    that is until the controller has removed their finalizers. Raises
+    TimeoutError if some are left after `timeout`.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        left = sum(len(list_resources(plural, workload_id, namespace)) for namespace in namespaces)
+        if not left:
+            return
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"{left} {plural} of workload {workload_id} still present after {timeout}s")
+        time.sleep(POLL_SECONDS)
+
+
+def create_jobruns(manifests: List[Dict], namespace: str = "default", workers: int = CREATE_WORKERS) -> Dict[str, float]:
+    """Creates the JobRun CRs and returns the creation time of each, keyed by
+    name.
+    """
+    return create_resources(JR_RESOURCE_PLURAL, manifests, namespace, workers)
+
+
+def list_jobruns(workload_id: str, namespace: Optional[str] = "default") -> List[Dict]:
+    return list_resources(JR_RESOURCE_PLURAL, workload_id, namespace)
+
+
+def delete_jobruns(workload_id: str, namespaces: List[str] = ["default"]):
+    delete_resources(JR_RESOURCE_PLURAL, workload_id, namespaces)
+
+
+def is_synced(cr: Dict) -> bool:
+    """A JobRun (or VirtualCluster) is synced once the controller has created
+    it and written its ID back.
+    """
+    return bool(cr.get("status", {}).get("id"))
+
+
+@dataclass
+class WorkloadResult:
+    count: int
+    synced: int
+    elapsed_seconds: float
+    # Seconds from CR creation until the controller first wrote status.id, by
+    # JobRun name
+    time_to_sync: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def throughput(self) -> float:
+        """JobRuns synced per second.
+        """
+        return self.synced / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    def time_to_sync_percentile(self, q: float) -> Optional[float]:
+        return percentile(list(self.time_to_sync.values()), q)
+
+
+def wait_for_jobruns(
+    workload_id: str,
+    created: Dict[str, float],
+    timeout: float,
+    namespace: Optional[str] = "default",
+    predicate: Callable[[Dict], bool] = is_synced,
+    started: Optional[float] = None,
+    plural: str = JR_RESOURCE_PLURAL,
+) -> WorkloadResult:
+    """Polls the workload's JobRuns (or the CRs of `plural`) until every CR in
+    `created` satisfies `predicate` or `timeout` passes, recording when each one
+    first did.
+    """
+    started = started if started is not None else min(created.values(), default=time.monotonic())
+    deadline = time.monotonic() + timeout
+    seen: Dict[str, float] = {}
+    while time.monotonic() < deadline:
+        now = time.monotonic()
+        for cr in list_resources(plural, workload_id, namespace):
+            name = cr["metadata"]["name"]
+            if name in created and name not in seen and predicate(cr):
+                seen[name] = now
+        if len(seen) == len(created):
+            break
+        time.sleep(POLL_SECONDS)
+
+    finished = max(seen.values(), default=time.monotonic())
+    return WorkloadResult(
+        count=len(created),
+        synced=len(seen),
+        elapsed_seconds=finished - started,
+        time_to_sync={name: seen[name] - created[name] for name in seen},
+    )
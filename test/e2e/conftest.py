@@ -11,15 +11,17 @@
 # express or implied. See the License for the specific language governing
 # permissions and limitations under the License.
 
+import logging
 import os
-import boto3
+import re
 import pytest
-
-from acktest import k8s
+import pytest_asyncio
 
 
 def pytest_addoption(parser):
     parser.addoption("--runslow", action="store_true", default=False, help="run slow tests")
+    parser.addoption("--metrics-db", help="SQLite file to store the metrics of this run in (default: $EMR_METRICS_DB)")
+    parser.addoption("--metrics-label", help="label of this run in the metrics store, such as the workload or CI job")
 
 
 def pytest_configure(config):
@@ -33,6 +35,11 @@ def pytest_configure(config):
         "markers", "slow: mark test as slow to run"
     )
 
+    from e2e.common.results import MetricsPlugin
+    metrics = MetricsPlugin.from_config(config)
+    if metrics is not None:
+        config.pluginmanager.register(metrics, "emr-metrics")
+
 def pytest_collection_modifyitems(config, items):
     if config.getoption("--runslow"):
         return
@@ -44,8 +51,73 @@ def pytest_collection_modifyitems(config, items):
 # Provide a k8s client to interact with the integration test cluster
 @pytest.fixture(scope='class')
 def k8s_client():
+    from acktest import k8s
     return k8s._get_k8s_api_client()
 
+# The endpoint URL of each AWS API the tests call, by boto3 service name. Empty
+# when the tests run against AWS. When the host clusters were bootstrapped with
+# --local-cluster, this starts the emr-containers stand-in and a controller
+# process (from $ACK_CONTROLLER_BINARY) against the local API server, and points
+# the Kubernetes client at that API server.
+@pytest.fixture(scope='session')
+def aws_endpoints():
+    from e2e.bootstrap_resources import get_bootstrap_resources, uses_local_cluster
+    if not uses_local_cluster():
+        yield {}
+        return
+
+    from e2e.common.controller import ControllerProcess, controller_binary
+    from e2e.standin.emrcontainers import EMRContainersStandIn
+    if controller_binary() is None:
+        pytest.skip("local host clusters need a controller process; set ACK_CONTROLLER_BINARY")
+
+    kubeconfig = get_bootstrap_resources().HostCluster_VC.kubeconfig
+    saved_env = dict(os.environ)
+    os.environ["KUBECONFIG"] = kubeconfig
+    # The stand-ins do not check signatures, but boto3 refuses to send
+    # unsigned requests.
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "standin")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "standin")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-2")
+    try:
+        with EMRContainersStandIn() as emr, \
+                ControllerProcess(endpoint_url=emr.endpoint_url, kubeconfig=kubeconfig):
+            yield {"emr-containers": emr.endpoint_url}
+    finally:
+        os.environ.clear()
+        os.environ.update(saved_env)
+
 @pytest.fixture(scope='module')
-def emrcontainers_client():
-    return boto3.client('emr-containers')
+def emrcontainers_client(aws_endpoints):
+    import boto3
+    return boto3.client('emr-containers', endpoint_url=aws_endpoints.get('emr-containers'))
+
+# Records the JobRun state transitions a test feeds it from watch events. The
+# report is logged at teardown, and the recording is kept in
+# $EMR_TRANSITIONS_DIR when that is set.
+@pytest.fixture
+def jobrun_transitions(request):
+    from e2e.common.transitions import TransitionRecorder, render_report
+    recorder = TransitionRecorder()
+    yield recorder
+    if not len(recorder):
+        return
+    logging.info("JobRun transitions of %s:\n%s", request.node.name, render_report(recorder.report()))
+    directory = os.environ.get("EMR_TRANSITIONS_DIR")
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        recorder.save(os.path.join(directory, re.sub(r"[^\w.-]", "_", request.node.name) + ".jrt"))
+
+# A local S3 API holding job logs, for the log reader tests.
+@pytest.fixture(scope='module')
+def s3_standin():
+    from e2e.standin.s3 import S3StandIn
+    with S3StandIn() as standin:
+        yield standin
+
+@pytest_asyncio.fixture
+async def async_k8s_api():
+    from e2e.common.aio import new_custom_objects_api
+    api = await new_custom_objects_api()
+    yield api
+    await api.api_client.close()
@@ -14,8 +14,6 @@
 EMRcontainers-specific test variables.
 """
 
-from e2e.bootstrap_resources import get_bootstrap_resources
-
 
 REPLACEMENT_VALUES = {
 }
@@ -12,9 +12,11 @@
 # permissions and limitations under the License.
 """Bootstraps the resources required to run the EMRcontainers integration tests.
 """
+import argparse
 import boto3
 import logging
 import json
+import os
 import time
 
 from acktest.bootstrapping import Resources, BootstrapFailureException
@@ -23,6 +25,7 @@ from acktest.bootstrapping.s3 import Bucket
 from e2e import bootstrap_directory
 from e2e.bootstrap_resources import BootstrapResources
 from e2e.bootstrappable.emr_eks_cluster import EMREnabledEKSCluster
+from e2e.bootstrappable.local_cluster import LocalEMRCluster, StandInBucket, StandInRole
 
 # Time to wait after modifying the CR for the status to change
 MODIFY_WAIT_AFTER_SECONDS = 10
@@ -30,9 +33,35 @@ MODIFY_WAIT_AFTER_SECONDS = 10
 # Time to wait after the zone has changed status, for the CR to update
 CHECK_STATUS_WAIT_SECONDS = 10
 
-def service_bootstrap() -> Resources:
+# Set to "true" to bootstrap local host clusters instead of EKS clusters. The
+# --local-cluster flag does the same.
+LOCAL_CLUSTER_ENV = "EMR_E2E_LOCAL_CLUSTER"
+
+def local_service_bootstrap() -> Resources:
+    """Bootstraps host clusters backed by a local API server, for runs against
+    the emr-containers stand-in. Needs no AWS account.
+    """
+    # Both host cluster outputs share one API server and etcd pair
+    host_cluster = LocalEMRCluster("ack-emr-eks", "emr-ns")
+    resources = BootstrapResources(
+        JobExecutionRole=StandInRole("ack-emrcontainers-job-execution-role"),
+        EMREKSS3BucketName=StandInBucket("ack-emr-eks-logs"),
+        HostCluster_VC=host_cluster,
+        HostCluster_JR=host_cluster
+    )
+
+    try:
+        resources.bootstrap()
+    except BootstrapFailureException as ex:
+        exit(254)
+    return resources
+
+def service_bootstrap(local_cluster: bool = False) -> Resources:
     logging.getLogger().setLevel(logging.INFO)
 
+    if local_cluster:
+        return local_service_bootstrap()
+
     job_execution_policy = json.dumps({
         "Version": "2012-10-17",
         "Statement": [
@@ -76,6 +105,12 @@ def service_bootstrap() -> Resources:
     return resources
 
 if __name__ == "__main__":
-    config = service_bootstrap()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--local-cluster", action="store_true",
+        default=os.environ.get(LOCAL_CLUSTER_ENV, "").lower() == "true",
+        help="use local API server host clusters instead of EKS")
+    args = parser.parse_args()
+
+    config = service_bootstrap(local_cluster=args.local_cluster)
     # Write config to current directory by default
     config.serialize(bootstrap_directory)
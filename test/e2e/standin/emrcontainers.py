@@ -0,0 +1,577 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""An in-process stand-in for the EMR on EKS (emr-containers) API.
+
+The stand-in speaks the restJson1 protocol used by the AWS SDKs, so both the
+controller (through `--aws-endpoint-url`) and boto3 (through `endpoint_url`)
+can be pointed at it. It also answers STS GetCallerIdentity, which the
+controller calls at startup to discover its account ID.
+
+JobRuns move through PENDING, SUBMITTED and RUNNING to COMPLETED based on the
+time elapsed since they were started (see `JobRunTimings`), so no background
+thread is needed regardless of how many runs exist. Every request is counted
+per operation, and a `FaultInjector` can be attached to add latency, throttling
+and 5xx errors.
+"""
+
+import json
+import logging
+import re
+import secrets
+import threading
+import time
+
+from collections import Counter
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+from e2e.standin.faults import Fault, FaultInjector
+
+DEFAULT_REGION = "us-west-2"
+DEFAULT_ACCOUNT_ID = "111122223333"
+
+# Page size used by the List operations when the caller does not set one
+DEFAULT_PAGE_SIZE = 50
+
+TERMINAL_JOB_RUN_STATES = {"COMPLETED", "FAILED", "CANCELLED"}
+
+# The access key ID in the Credential of a SigV4 Authorization header
+_CREDENTIAL_RE = re.compile(r"Credential=([^/,\s]+)/")
+
+
+@dataclass
+class JobRunTimings:
+    """How long, in seconds, a JobRun spends in each non-terminal state.
+    """
+    pending: float = 1.0
+    submitted: float = 1.0
+    running: float = 5.0
+    cancel_pending: float = 1.0
+
+
+@dataclass
+class _VirtualCluster:
+    id: str
+    name: str
+    arn: str
+    container_provider: Dict[str, Any]
+    created_at: float
+    tags: Dict[str, str] = field(default_factory=dict)
+    state: str = "RUNNING"
+
+    def to_api(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "arn": self.arn,
+            "state": self.state,
+            "containerProvider": self.container_provider,
+            "createdAt": self.created_at,
+            "tags": self.tags,
+        }
+
+
+@dataclass
+class _JobRun:
+    id: str
+    name: str
+    arn: str
+    virtual_cluster_id: str
+    execution_role_arn: str
+    release_label: str
+    job_driver: Dict[str, Any]
+    configuration_overrides: Optional[Dict[str, Any]]
+    created_at: float
+    started: float
+    tags: Dict[str, str] = field(default_factory=dict)
+    cancelled: Optional[float] = None
+
+    def state(self, timings: JobRunTimings, now: float) -> str:
+        if self.cancelled is not None:
+            if now - self.cancelled < timings.cancel_pending:
+                return "CANCEL_PENDING"
+            return "CANCELLED"
+        elapsed = now - self.started
+        for state, duration in (
+            ("PENDING", timings.pending),
+            ("SUBMITTED", timings.submitted),
+            ("RUNNING", timings.running),
+        ):
+            if elapsed < duration:
+                return state
+            elapsed -= duration
+        return "COMPLETED"
+
+    def to_api(self, timings: JobRunTimings, now: float) -> Dict[str, Any]:
+        state = self.state(timings, now)
+        job_run = {
+            "id": self.id,
+            "name": self.name,
+            "arn": self.arn,
+            "virtualClusterId": self.virtual_cluster_id,
+            "executionRoleArn": self.execution_role_arn,
+            "releaseLabel": self.release_label,
+            "jobDriver": self.job_driver,
+            "state": state,
+            "createdAt": self.created_at,
+            "createdBy": f"arn:aws:iam::{DEFAULT_ACCOUNT_ID}:role/standin",
+            "tags": self.tags,
+        }
+        if self.configuration_overrides is not None:
+            job_run["configurationOverrides"] = self.configuration_overrides
+        if state in TERMINAL_JOB_RUN_STATES:
+            if self.cancelled is not None:
+                finished = self.cancelled + timings.cancel_pending
+            else:
+                finished = self.started + timings.pending + timings.submitted + timings.running
+            job_run["finishedAt"] = self.created_at + (finished - self.started)
+            job_run["stateDetails"] = "JobRun stand-in " + state.lower()
+        return job_run
+
+
+class APIError(Exception):
+    def __init__(self, status: int, code: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+
+def _validation_error(message: str) -> APIError:
+    return APIError(400, "ValidationException", message)
+
+
+def _not_found(message: str) -> APIError:
+    return APIError(400, "ResourceNotFoundException", message)
+
+
+def _new_id() -> str:
+    return secrets.token_hex(12)
+
+
+class EMRContainersStandIn:
+    """Serves the emr-containers API from memory on a local port.
+
+    Use it as a context manager, or call `start` and `stop`:
+
+        with EMRContainersStandIn() as standin:
+            client = boto3.client("emr-containers", endpoint_url=standin.endpoint_url)
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        region: str = DEFAULT_REGION,
+        account_id: str = DEFAULT_ACCOUNT_ID,
+        timings: Optional[JobRunTimings] = None,
+        faults: Optional[FaultInjector] = None,
+    ):
+        self.region = region
+        self.account_id = account_id
+        self.timings = timings or JobRunTimings()
+        self.faults = faults or FaultInjector()
+
+        self._lock = threading.Lock()
+        self._virtual_clusters: Dict[str, _VirtualCluster] = {}
+        self._job_runs: Dict[str, Dict[str, _JobRun]] = {}
+        self._client_tokens: Dict[Tuple[str, str], str] = {}
+        self.calls: Counter = Counter()
+        self.faulted: Counter = Counter()
+        # Every StartJobRun request that reached the API, by JobRun name. Used
+        # to spot duplicate submissions.
+        self.start_job_run_names: Counter = Counter()
+        # The time.monotonic() of every StartJobRun request that reached the
+        # API, in arrival order
+        self.start_job_run_times: List[float] = []
+        # Calls by the access key ID of their signature, so that processes
+        # given different credentials can be told apart
+        self.calls_by_caller: Counter = Counter()
+
+        self._route_table = self._routes()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def endpoint_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "EMRContainersStandIn":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="emrcontainers-standin", daemon=True)
+        self._thread.start()
+        logging.info("emr-containers stand-in listening on %s", self.endpoint_url)
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "EMRContainersStandIn":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset_counters(self):
+        with self._lock:
+            self.calls = Counter()
+            self.faulted = Counter()
+            self.start_job_run_names = Counter()
+            self.start_job_run_times = []
+            self.calls_by_caller = Counter()
+        self.faults.reset_counters()
+
+    def counters(self) -> Dict[str, Any]:
+        """Returns a snapshot of the per-operation call counters.
+        """
+        with self._lock:
+            return {
+                "calls": dict(self.calls),
+                "faulted": dict(self.faulted),
+                "total_calls": sum(self.calls.values()),
+                "total_faulted": sum(self.faulted.values()),
+                "calls_by_caller": dict(self.calls_by_caller),
+            }
+
+    def seed_virtual_cluster(self, name: str, eks_cluster: str = "standin-cluster", namespace: str = "emr-ns") -> str:
+        """Creates a virtual cluster without going through the API (and so
+        without touching the counters or the fault injector) and returns its ID.
+        """
+        return self.create_virtual_cluster({}, {}, {
+            "name": name,
+            "containerProvider": {"id": eks_cluster, "type": "EKS", "info": {"eksInfo": {"namespace": namespace}}},
+        })["id"]
+
+    def job_run_count(self) -> int:
+        with self._lock:
+            return sum(len(runs) for runs in self._job_runs.values())
+
+    def job_run_names(self) -> Counter:
+        """Returns the number of job runs that exist under each name, across
+        virtual clusters.
+        """
+        with self._lock:
+            return Counter(run.name for runs in self._job_runs.values() for run in runs.values())
+
+    # Operations. Each takes the path parameters, query string and JSON body and
+    # returns the JSON response.
+
+    def create_virtual_cluster(self, params, query, body) -> Dict[str, Any]:
+        name = body.get("name")
+        if not name or not body.get("containerProvider"):
+            raise _validation_error("name and containerProvider are required")
+        with self._lock:
+            token = body.get("clientToken")
+            if token and ("vc", token) in self._client_tokens:
+                vc = self._virtual_clusters[self._client_tokens[("vc", token)]]
+                return {"id": vc.id, "name": vc.name, "arn": vc.arn}
+            vc_id = _new_id()
+            vc = _VirtualCluster(
+                id=vc_id,
+                name=name,
+                arn=f"arn:aws:emr-containers:{self.region}:{self.account_id}:/virtualclusters/{vc_id}",
+                container_provider=body["containerProvider"],
+                created_at=time.time(),
+                tags=body.get("tags") or {},
+            )
+            self._virtual_clusters[vc_id] = vc
+            self._job_runs[vc_id] = {}
+            if token:
+                self._client_tokens[("vc", token)] = vc_id
+        return {"id": vc.id, "name": vc.name, "arn": vc.arn}
+
+    def _get_virtual_cluster(self, vc_id: str) -> _VirtualCluster:
+        vc = self._virtual_clusters.get(vc_id)
+        if vc is None:
+            raise _not_found(f"Virtual cluster {vc_id} doesn't exist.")
+        return vc
+
+    def describe_virtual_cluster(self, params, query, body) -> Dict[str, Any]:
+        with self._lock:
+            return {"virtualCluster": self._get_virtual_cluster(params["virtualClusterId"]).to_api()}
+
+    def delete_virtual_cluster(self, params, query, body) -> Dict[str, Any]:
+        with self._lock:
+            vc = self._get_virtual_cluster(params["virtualClusterId"])
+            vc.state = "TERMINATED"
+        return {"id": vc.id}
+
+    def list_virtual_clusters(self, params, query, body) -> Dict[str, Any]:
+        states = set(query.get("states", []))
+        created_after = _query_float(query, "createdAfter")
+        created_before = _query_float(query, "createdBefore")
+        with self._lock:
+            items = [
+                vc.to_api() for vc in self._virtual_clusters.values()
+                if (not states or vc.state in states)
+                and (created_after is None or vc.created_at >= created_after)
+                and (created_before is None or vc.created_at <= created_before)
+            ]
+        page, next_token = _paginate(items, query)
+        response = {"virtualClusters": page}
+        if next_token:
+            response["nextToken"] = next_token
+        return response
+
+    def start_job_run(self, params, query, body) -> Dict[str, Any]:
+        vc_id = params["virtualClusterId"]
+        for required in ("executionRoleArn", "releaseLabel"):
+            if not body.get(required):
+                raise _validation_error(f"{required} is required")
+        now = time.monotonic()
+        with self._lock:
+            vc = self._get_virtual_cluster(vc_id)
+            if vc.state != "RUNNING":
+                raise _validation_error(f"Virtual cluster {vc_id} is not in RUNNING state.")
+            name = body.get("name") or ""
+            self.start_job_run_names[name] += 1
+            self.start_job_run_times.append(now)
+            token = body.get("clientToken")
+            if token and ("jr", token) in self._client_tokens:
+                run = self._job_runs[vc_id][self._client_tokens[("jr", token)]]
+                return {"id": run.id, "name": run.name, "arn": run.arn, "virtualClusterId": vc_id}
+            run_id = _new_id()
+            run = _JobRun(
+                id=run_id,
+                name=name,
+                arn=f"{vc.arn}/jobruns/{run_id}",
+                virtual_cluster_id=vc_id,
+                execution_role_arn=body["executionRoleArn"],
+                release_label=body["releaseLabel"],
+                job_driver=body.get("jobDriver") or {},
+                configuration_overrides=body.get("configurationOverrides"),
+                created_at=time.time(),
+                started=now,
+                tags=body.get("tags") or {},
+            )
+            self._job_runs[vc_id][run_id] = run
+            if token:
+                self._client_tokens[("jr", token)] = run_id
+        return {"id": run.id, "name": run.name, "arn": run.arn, "virtualClusterId": vc_id}
+
+    def _get_job_run(self, vc_id: str, run_id: str) -> _JobRun:
+        self._get_virtual_cluster(vc_id)
+        run = self._job_runs[vc_id].get(run_id)
+        if run is None:
+            raise _not_found(f"Job run {run_id} doesn't exist.")
+        return run
+
+    def describe_job_run(self, params, query, body) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            run = self._get_job_run(params["virtualClusterId"], params["jobRunId"])
+            return {"jobRun": run.to_api(self.timings, now)}
+
+    def cancel_job_run(self, params, query, body) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            run = self._get_job_run(params["virtualClusterId"], params["jobRunId"])
+            state = run.state(self.timings, now)
+            if state in TERMINAL_JOB_RUN_STATES or state == "CANCEL_PENDING":
+                raise _validation_error(f"Job run {run.id} is not in a cancellable state")
+            run.cancelled = now
+        return {"id": run.id, "virtualClusterId": run.virtual_cluster_id}
+
+    def list_job_runs(self, params, query, body) -> Dict[str, Any]:
+        vc_id = params["virtualClusterId"]
+        states = set(query.get("states", []))
+        name = (query.get("name") or [None])[0]
+        created_after = _query_float(query, "createdAfter")
+        created_before = _query_float(query, "createdBefore")
+        now = time.monotonic()
+        with self._lock:
+            self._get_virtual_cluster(vc_id)
+            items = []
+            for run in self._job_runs[vc_id].values():
+                if name is not None and run.name != name:
+                    continue
+                if created_after is not None and run.created_at < created_after:
+                    continue
+                if created_before is not None and run.created_at > created_before:
+                    continue
+                job_run = run.to_api(self.timings, now)
+                if states and job_run["state"] not in states:
+                    continue
+                items.append(job_run)
+        # Newest first, as the service does
+        items.sort(key=lambda item: item["createdAt"], reverse=True)
+        page, next_token = _paginate(items, query)
+        response = {"jobRuns": page}
+        if next_token:
+            response["nextToken"] = next_token
+        return response
+
+    def _find_tagged(self, arn: str):
+        for vc in self._virtual_clusters.values():
+            if vc.arn == arn:
+                return vc
+        match = re.match(r".*/virtualclusters/([0-9a-z]+)/jobruns/([0-9a-z]+)$", arn)
+        if match and match.group(1) in self._job_runs:
+            run = self._job_runs[match.group(1)].get(match.group(2))
+            if run is not None:
+                return run
+        raise _not_found(f"Resource {arn} doesn't exist.")
+
+    def tag_resource(self, params, query, body) -> Dict[str, Any]:
+        with self._lock:
+            self._find_tagged(params["resourceArn"]).tags.update(body.get("tags") or {})
+        return {}
+
+    def untag_resource(self, params, query, body) -> Dict[str, Any]:
+        with self._lock:
+            tagged = self._find_tagged(params["resourceArn"])
+            for key in query.get("tagKeys", []):
+                tagged.tags.pop(key, None)
+        return {}
+
+    def list_tags_for_resource(self, params, query, body) -> Dict[str, Any]:
+        with self._lock:
+            return {"tags": dict(self._find_tagged(params["resourceArn"]).tags)}
+
+    def _routes(self) -> List[Tuple[str, "re.Pattern", str, Callable]]:
+        vc = r"(?P<virtualClusterId>[^/]+)"
+        jr = r"(?P<jobRunId>[^/]+)"
+        return [
+            ("POST", re.compile(r"^/virtualclusters$"), "CreateVirtualCluster", self.create_virtual_cluster),
+            ("GET", re.compile(r"^/virtualclusters$"), "ListVirtualClusters", self.list_virtual_clusters),
+            ("GET", re.compile(rf"^/virtualclusters/{vc}$"), "DescribeVirtualCluster", self.describe_virtual_cluster),
+            ("DELETE", re.compile(rf"^/virtualclusters/{vc}$"), "DeleteVirtualCluster", self.delete_virtual_cluster),
+            ("POST", re.compile(rf"^/virtualclusters/{vc}/jobruns$"), "StartJobRun", self.start_job_run),
+            ("GET", re.compile(rf"^/virtualclusters/{vc}/jobruns$"), "ListJobRuns", self.list_job_runs),
+            ("GET", re.compile(rf"^/virtualclusters/{vc}/jobruns/{jr}$"), "DescribeJobRun", self.describe_job_run),
+            ("DELETE", re.compile(rf"^/virtualclusters/{vc}/jobruns/{jr}$"), "CancelJobRun", self.cancel_job_run),
+            ("POST", re.compile(r"^/tags/(?P<resourceArn>.+)$"), "TagResource", self.tag_resource),
+            ("DELETE", re.compile(r"^/tags/(?P<resourceArn>.+)$"), "UntagResource", self.untag_resource),
+            ("GET", re.compile(r"^/tags/(?P<resourceArn>.+)$"), "ListTagsForResource", self.list_tags_for_resource),
+        ]
+
+    def _dispatch(
+        self, method: str, raw_path: str, body: bytes, caller: str = "",
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        url = urlparse(raw_path)
+        path = url.path
+        query = parse_qs(url.query)
+
+        # STS uses the query protocol and is posted to the root path.
+        if method == "POST" and path == "/":
+            form = parse_qs(body.decode())
+            if form.get("Action") == ["GetCallerIdentity"]:
+                return self._serve_get_caller_identity()
+
+        for route_method, pattern, operation, handler in self._route_table:
+            if route_method != method:
+                continue
+            match = pattern.match(path)
+            if match is None:
+                continue
+            params = {key: unquote(value) for key, value in match.groupdict().items()}
+            with self._lock:
+                self.calls[operation] += 1
+                self.calls_by_caller[caller] += 1
+            fault = self.faults.before_request(operation)
+            if fault is not None:
+                with self._lock:
+                    self.faulted[operation] += 1
+                return _error_response(fault.status, fault.code, fault.message)
+            try:
+                payload = json.loads(body) if body else {}
+                return 200, {"Content-Type": "application/json"}, json.dumps(handler(params, query, payload)).encode()
+            except APIError as ex:
+                return _error_response(ex.status, ex.code, ex.message)
+            except json.JSONDecodeError as ex:
+                return _error_response(400, "ValidationException", str(ex))
+        return _error_response(404, "UnknownOperationException", f"No route for {method} {path}")
+
+    def _serve_get_caller_identity(self) -> Tuple[int, Dict[str, str], bytes]:
+        with self._lock:
+            self.calls["GetCallerIdentity"] += 1
+        body = (
+            '<GetCallerIdentityResponse xmlns="https://sts.amazonaws.com/doc/2011-06-15/">'
+            "<GetCallerIdentityResult>"
+            f"<Arn>arn:aws:iam::{self.account_id}:user/standin</Arn>"
+            "<UserId>STANDIN</UserId>"
+            f"<Account>{self.account_id}</Account>"
+            "</GetCallerIdentityResult>"
+            "<ResponseMetadata><RequestId>standin</RequestId></ResponseMetadata>"
+            "</GetCallerIdentityResponse>"
+        )
+        return 200, {"Content-Type": "text/xml"}, body.encode()
+
+    def _handler_class(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _serve(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                caller = _access_key_id(self.headers.get("Authorization", ""))
+                status, headers, payload = standin._dispatch(self.command, self.path, body, caller)
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.send_header("x-amzn-RequestId", _new_id())
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_DELETE = do_PUT = _serve
+
+            def log_message(self, format, *args):
+                logging.debug("emr-containers stand-in: " + format, *args)
+
+        return Handler
+
+
+def _access_key_id(authorization: str) -> str:
+    """Returns the access key ID of a SigV4 Authorization header, or an empty
+    string for unsigned requests.
+    """
+    match = _CREDENTIAL_RE.search(authorization)
+    return match.group(1) if match else ""
+
+
+def _error_response(status: int, code: str, message: str) -> Tuple[int, Dict[str, str], bytes]:
+    headers = {"Content-Type": "application/json", "X-Amzn-ErrorType": code}
+    return status, headers, json.dumps({"message": message}).encode()
+
+
+def _query_float(query: Dict[str, List[str]], key: str) -> Optional[float]:
+    """Parses a timestamp query parameter. The SDKs send ISO 8601 timestamps in
+    query strings; epoch seconds are accepted too.
+    """
+    values = query.get(key)
+    if not values:
+        return None
+    value = values[0]
+    try:
+        return float(value)
+    except ValueError:
+        from datetime import datetime
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def _paginate(items: List[Any], query: Dict[str, List[str]]) -> Tuple[List[Any], Optional[str]]:
+    start = int((query.get("nextToken") or ["0"])[0])
+    size = int((query.get("maxResults") or [str(DEFAULT_PAGE_SIZE)])[0])
+    page = items[start:start + size]
+    next_token = str(start + size) if start + size < len(items) else None
+    return page, next_token
@@ -0,0 +1,264 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Fault injection for the local AWS API stand-ins.
+
+A `FaultInjector` holds one `OperationFaults` per API operation (plus a default
+for every other operation) and is consulted by the stand-in before each request
+is served. It can add latency drawn from a distribution, answer with a
+ThrottlingException at a fixed rate, answer with 5xx errors in periodic bursts,
+and enforce a token-bucket rate limit that answers with a ThrottlingException
+once the bucket is empty.
+"""
+
+import math
+import random
+import threading
+import time
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+THROTTLING_EXCEPTION = "ThrottlingException"
+INTERNAL_SERVER_EXCEPTION = "InternalServerException"
+SERVICE_UNAVAILABLE_EXCEPTION = "ServiceUnavailableException"
+
+
+@dataclass
+class Fault:
+    """An error response the stand-in should send instead of serving the
+    request.
+    """
+    status: int
+    code: str
+    message: str
+
+
+@dataclass
+class LatencyDistribution:
+    """Added latency, in seconds.
+
+    `kind` is one of:
+      - fixed: always `value`
+      - uniform: between `low` and `high`
+      - exponential: mean `value`
+      - lognormal: median `value` with shape `sigma`
+    Samples are capped at `max_seconds`.
+    """
+    kind: str = "fixed"
+    value: float = 0.0
+    low: float = 0.0
+    high: float = 0.0
+    sigma: float = 0.5
+    max_seconds: float = 30.0
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            seconds = self.value
+        elif self.kind == "uniform":
+            seconds = rng.uniform(self.low, self.high)
+        elif self.kind == "exponential":
+            seconds = rng.expovariate(1.0 / self.value) if self.value > 0 else 0.0
+        elif self.kind == "lognormal":
+            seconds = rng.lognormvariate(math.log(self.value), self.sigma) if self.value > 0 else 0.0
+        else:
+            raise ValueError(f"unknown latency distribution '{self.kind}'")
+        return max(0.0, min(seconds, self.max_seconds))
+
+
+@dataclass
+class ServerErrorBurst:
+    """Answers every request with a 5xx error for `duration_seconds` out of
+    every `every_seconds`. The errors cover the last `duration_seconds` of each
+    period, so that a fresh profile does not fail the first request.
+    """
+    every_seconds: float
+    duration_seconds: float
+    status: int = 503
+    code: str = SERVICE_UNAVAILABLE_EXCEPTION
+
+    def active(self, elapsed: float) -> bool:
+        return (elapsed % self.every_seconds) >= (self.every_seconds - self.duration_seconds)
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at `rate` tokens per second up to
+    `burst` tokens.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+@dataclass
+class OperationFaults:
+    """The faults injected into a single API operation.
+    """
+    # Fraction of requests answered with a ThrottlingException
+    throttle_rate: float = 0.0
+    # Fraction of requests answered with an InternalServerException
+    server_error_rate: float = 0.0
+    latency: Optional[LatencyDistribution] = None
+    burst: Optional[ServerErrorBurst] = None
+    # Requests per second (and burst size) before answering with a
+    # ThrottlingException
+    rate_limit: Optional[float] = None
+    rate_limit_burst: Optional[float] = None
+
+    _bucket: Optional[TokenBucket] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        if self.rate_limit is not None:
+            self._bucket = TokenBucket(self.rate_limit, self.rate_limit_burst or self.rate_limit)
+
+    @classmethod
+    def from_dict(cls, config: Dict[str, Any]) -> "OperationFaults":
+        config = dict(config)
+        if config.get("latency") is not None:
+            config["latency"] = LatencyDistribution(**config["latency"])
+        if config.get("burst") is not None:
+            config["burst"] = ServerErrorBurst(**config["burst"])
+        return cls(**config)
+
+
+class FaultInjector:
+    """Decides, per request, which faults the stand-in should inject.
+
+    Profiles are keyed by operation name (e.g. `StartJobRun`); the `default`
+    profile applies to any operation that is not listed. Counters record how
+    many requests were faulted for each operation and why.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._operations: Dict[str, OperationFaults] = {}
+        self._default: Optional[OperationFaults] = None
+        self._started = time.monotonic()
+        self.injected: Counter = Counter()
+
+    def configure(self, operations: Dict[str, OperationFaults] = None, default: OperationFaults = None):
+        """Replaces the active fault profile. Burst periods restart from now.
+        """
+        with self._lock:
+            self._operations = dict(operations or {})
+            self._default = default
+            self._started = time.monotonic()
+
+    def configure_from_dict(self, config: Dict[str, Any]):
+        """Configures the injector from a mapping of operation name (or
+        `default`) to `OperationFaults` keyword arguments.
+        """
+        config = dict(config)
+        default = config.pop("default", None)
+        self.configure(
+            {op: OperationFaults.from_dict(faults) for op, faults in config.items()},
+            OperationFaults.from_dict(default) if default is not None else None,
+        )
+
+    def clear(self):
+        """Removes every fault. The counters are kept.
+        """
+        self.configure()
+
+    def reset_counters(self):
+        with self._lock:
+            self.injected = Counter()
+
+    def _faults_for(self, operation: str) -> Optional[OperationFaults]:
+        return self._operations.get(operation, self._default)
+
+    def before_request(self, operation: str) -> Optional[Fault]:
+        """Sleeps for any injected latency, then returns the fault to answer
+        `operation` with, if any.
+        """
+        with self._lock:
+            faults = self._faults_for(operation)
+            if faults is None:
+                return None
+            delay = faults.latency.sample(self._rng) if faults.latency else 0.0
+            roll = self._rng.random()
+            elapsed = time.monotonic() - self._started
+
+        if delay:
+            time.sleep(delay)
+
+        fault = None
+        if faults.burst is not None and faults.burst.active(elapsed):
+            fault = Fault(faults.burst.status, faults.burst.code, "Injected server error burst")
+        elif faults._bucket is not None and not faults._bucket.try_acquire():
+            fault = Fault(400, THROTTLING_EXCEPTION, "Rate exceeded")
+        elif roll < faults.throttle_rate:
+            fault = Fault(400, THROTTLING_EXCEPTION, "Rate exceeded")
+        elif roll < faults.throttle_rate + faults.server_error_rate:
+            fault = Fault(500, INTERNAL_SERVER_EXCEPTION, "Injected internal server error")
+
+        if fault is not None:
+            with self._lock:
+                self.injected[(operation, fault.code)] += 1
+        return fault
+
+
+# Named fault profiles used by the fault-injection scenarios. Each maps to the
+# argument of `FaultInjector.configure_from_dict`.
+FAULT_PROFILES: Dict[str, Dict[str, Any]] = {
+    "none": {},
+    "throttle-submit-20pct": {
+        "StartJobRun": {"throttle_rate": 0.2},
+    },
+    "throttle-all-50pct": {
+        "default": {"throttle_rate": 0.5},
+    },
+    "latency-lognormal": {
+        "default": {"latency": {"kind": "lognormal", "value": 0.2, "sigma": 0.8}},
+    },
+    "server-error-bursts": {
+        "default": {"burst": {"every_seconds": 20, "duration_seconds": 5}},
+    },
+    "rate-limited": {
+        "StartJobRun": {"rate_limit": 5, "rate_limit_burst": 10},
+        "DescribeJobRun": {"rate_limit": 20, "rate_limit_burst": 20},
+    },
+    # Latencies and per-operation rate limits in the range observed against
+    # the real service, for benchmarks rather than failure scenarios.
+    "realistic": {
+        "default": {"latency": {"kind": "lognormal", "value": 0.08, "sigma": 0.4}},
+        "StartJobRun": {
+            "latency": {"kind": "lognormal", "value": 0.35, "sigma": 0.5},
+            "rate_limit": 25, "rate_limit_burst": 50,
+        },
+        "DescribeJobRun": {
+            "latency": {"kind": "lognormal", "value": 0.06, "sigma": 0.4},
+            "rate_limit": 50, "rate_limit_burst": 100,
+        },
+        "CreateVirtualCluster": {
+            "latency": {"kind": "lognormal", "value": 0.8, "sigma": 0.5},
+            "rate_limit": 5, "rate_limit_burst": 10,
+        },
+    },
+}
@@ -0,0 +1,321 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""An in-process stand-in for the subset of the S3 API used to read job logs.
+
+It serves path-style requests for ListObjectsV2, GetObject (including `Range`
+and `If-Match` requests), HeadObject, PutObject and CreateBucket from memory,
+so boto3 can be pointed at it with
+
+    boto3.client("s3", endpoint_url=standin.endpoint_url,
+                 config=Config(s3={"addressing_style": "path"}))
+
+Objects can also be written directly with `put_object` and grown with
+`append_object`, which is how tests stand in for the log pusher of an EMR on
+EKS job: the pusher re-uploads a growing object whose existing bytes do not
+change. Requests and bytes served are counted per operation.
+"""
+
+import hashlib
+import logging
+import re
+import secrets
+import threading
+import time
+
+from collections import Counter
+from dataclasses import dataclass
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+from xml.sax.saxutils import escape
+
+# Page size used by ListObjectsV2 when the caller does not set one
+DEFAULT_MAX_KEYS = 1000
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+@dataclass
+class _Object:
+    data: bytes
+    last_modified: float
+
+    @property
+    def etag(self) -> str:
+        return '"' + hashlib.md5(self.data).hexdigest() + '"'
+
+
+class S3StandIn:
+    """Serves S3 objects from memory on a local port.
+
+    Use it as a context manager, or call `start` and `stop`.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Dict[str, _Object]] = {}
+        self.calls: Counter = Counter()
+        # Bytes returned by GetObject, summed over every request
+        self.bytes_served = 0
+
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def endpoint_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "S3StandIn":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="s3-standin", daemon=True)
+        self._thread.start()
+        logging.info("S3 stand-in listening on %s", self.endpoint_url)
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "S3StandIn":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset_counters(self):
+        with self._lock:
+            self.calls = Counter()
+            self.bytes_served = 0
+
+    def counters(self) -> Dict[str, Any]:
+        """Returns a snapshot of the per-operation call counters and the bytes
+        served.
+        """
+        with self._lock:
+            return {
+                "calls": dict(self.calls),
+                "total_calls": sum(self.calls.values()),
+                "bytes_served": self.bytes_served,
+            }
+
+    def create_bucket(self, bucket: str):
+        with self._lock:
+            self._buckets.setdefault(bucket, {})
+
+    def put_object(self, bucket: str, key: str, data: bytes):
+        """Writes an object without going through the API.
+        """
+        with self._lock:
+            self._buckets.setdefault(bucket, {})[key] = _Object(data, time.time())
+
+    def append_object(self, bucket: str, key: str, data: bytes):
+        """Replaces the object with its current content followed by `data`.
+        """
+        with self._lock:
+            objects = self._buckets.setdefault(bucket, {})
+            current = objects.get(key)
+            objects[key] = _Object((current.data if current else b"") + data, time.time())
+
+    def get_object_data(self, bucket: str, key: str) -> Optional[bytes]:
+        with self._lock:
+            obj = self._buckets.get(bucket, {}).get(key)
+            return obj.data if obj else None
+
+    # Operations. Each takes the bucket, key, query string, request headers and
+    # body, and returns the status, response headers and payload.
+
+    def _list_objects_v2(self, bucket, key, query, headers, body):
+        objects = self._get_bucket(bucket)
+        prefix = (query.get("prefix") or [""])[0]
+        max_keys = int((query.get("max-keys") or [str(DEFAULT_MAX_KEYS)])[0])
+        start_after = (query.get("continuation-token") or query.get("start-after") or [""])[0]
+        keys = sorted(k for k in objects if k.startswith(prefix) and k > start_after)
+        page = keys[:max_keys]
+        truncated = len(keys) > max_keys
+
+        contents = "".join(
+            "<Contents>"
+            f"<Key>{escape(k)}</Key>"
+            f"<LastModified>{_iso8601(objects[k].last_modified)}</LastModified>"
+            f"<ETag>{escape(objects[k].etag)}</ETag>"
+            f"<Size>{len(objects[k].data)}</Size>"
+            "<StorageClass>STANDARD</StorageClass>"
+            "</Contents>"
+            for k in page
+        )
+        next_token = f"<NextContinuationToken>{escape(page[-1])}</NextContinuationToken>" if truncated else ""
+        payload = (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+            f"<Name>{escape(bucket)}</Name><Prefix>{escape(prefix)}</Prefix>"
+            f"<KeyCount>{len(page)}</KeyCount><MaxKeys>{max_keys}</MaxKeys>"
+            f"<IsTruncated>{'true' if truncated else 'false'}</IsTruncated>"
+            f"{contents}{next_token}"
+            "</ListBucketResult>"
+        ).encode()
+        return 200, {"Content-Type": "application/xml"}, payload
+
+    def _get_object(self, bucket, key, query, headers, body):
+        obj = self._get_key(bucket, key)
+        if_match = headers.get("If-Match")
+        if if_match and if_match != obj.etag:
+            raise _S3Error(412, "PreconditionFailed", "At least one of the pre-conditions you specified did not hold")
+        data = obj.data
+        response_headers = _object_headers(obj)
+        status = 200
+        range_header = headers.get("Range")
+        if range_header:
+            first, last = _parse_range(range_header, len(data))
+            response_headers["Content-Range"] = f"bytes {first}-{last}/{len(data)}"
+            data = data[first:last + 1]
+            status = 206
+        self.bytes_served += len(data)
+        return status, response_headers, data
+
+    def _head_object(self, bucket, key, query, headers, body):
+        obj = self._get_key(bucket, key)
+        response_headers = _object_headers(obj)
+        response_headers["Content-Length"] = str(len(obj.data))
+        return 200, response_headers, b""
+
+    def _put_object(self, bucket, key, query, headers, body):
+        objects = self._get_bucket(bucket)
+        obj = _Object(body, time.time())
+        objects[key] = obj
+        return 200, {"ETag": obj.etag}, b""
+
+    def _create_bucket(self, bucket, key, query, headers, body):
+        self._buckets.setdefault(bucket, {})
+        return 200, {"Location": "/" + bucket}, b""
+
+    def _get_bucket(self, bucket: str) -> Dict[str, _Object]:
+        objects = self._buckets.get(bucket)
+        if objects is None:
+            raise _S3Error(404, "NoSuchBucket", "The specified bucket does not exist")
+        return objects
+
+    def _get_key(self, bucket: str, key: str) -> _Object:
+        obj = self._get_bucket(bucket).get(key)
+        if obj is None:
+            raise _S3Error(404, "NoSuchKey", "The specified key does not exist.")
+        return obj
+
+    def _operation(self, method: str, key: str, query: Dict[str, List[str]]) -> str:
+        if not key:
+            if method == "GET" and query.get("list-type") == ["2"]:
+                return "ListObjectsV2"
+            if method == "PUT":
+                return "CreateBucket"
+        else:
+            return {"GET": "GetObject", "HEAD": "HeadObject", "PUT": "PutObject"}.get(method, "")
+        return ""
+
+    def _dispatch(self, method: str, raw_path: str, headers, body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        url = urlparse(raw_path)
+        bucket, _, key = url.path.lstrip("/").partition("/")
+        key = unquote(key)
+        query = parse_qs(url.query, keep_blank_values=True)
+        operation = self._operation(method, key, query)
+        handler = {
+            "ListObjectsV2": self._list_objects_v2,
+            "GetObject": self._get_object,
+            "HeadObject": self._head_object,
+            "PutObject": self._put_object,
+            "CreateBucket": self._create_bucket,
+        }.get(operation)
+        if handler is None:
+            return _error_response(405, "MethodNotAllowed", f"{method} {url.path} is not supported by the stand-in")
+        with self._lock:
+            self.calls[operation] += 1
+            try:
+                return handler(unquote(bucket), key, query, headers, body)
+            except _S3Error as err:
+                return _error_response(err.status, err.code, err.message)
+
+    def _handler_class(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _serve(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                status, headers, payload = standin._dispatch(self.command, self.path, self.headers, body)
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                if self.command != "HEAD":
+                    self.send_header("Content-Length", str(len(payload)))
+                self.send_header("x-amz-request-id", secrets.token_hex(8))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(payload)
+
+            do_GET = do_PUT = do_HEAD = _serve
+
+            def log_message(self, format, *args):
+                logging.debug("S3 stand-in: " + format, *args)
+
+        return Handler
+
+
+class _S3Error(Exception):
+    def __init__(self, status: int, code: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+
+def _parse_range(header: str, size: int) -> Tuple[int, int]:
+    """Returns the first and last byte of a single-range `Range` header,
+    following RFC 9110 the way S3 does.
+    """
+    match = _RANGE_RE.match(header.strip())
+    if match is None or match.group(1) == match.group(2) == "":
+        raise _S3Error(416, "InvalidRange", "The requested range is not satisfiable")
+    first, last = match.groups()
+    if first == "":
+        # Suffix range: the last N bytes
+        return max(0, size - int(last)), size - 1
+    first = int(first)
+    if first >= size:
+        raise _S3Error(416, "InvalidRange", "The requested range is not satisfiable")
+    return first, min(int(last), size - 1) if last else size - 1
+
+
+def _object_headers(obj: _Object) -> Dict[str, str]:
+    return {
+        "Content-Type": "application/octet-stream",
+        "ETag": obj.etag,
+        "Last-Modified": formatdate(obj.last_modified, usegmt=True),
+        "Accept-Ranges": "bytes",
+    }
+
+
+def _iso8601(timestamp: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(timestamp))
+
+
+def _error_response(status: int, code: str, message: str) -> Tuple[int, Dict[str, str], bytes]:
+    payload = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f"<Error><Code>{code}</Code><Message>{escape(message)}</Message></Error>"
+    ).encode()
+    return status, {"Content-Type": "application/xml"}, payload
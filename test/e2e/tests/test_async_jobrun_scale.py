@@ -0,0 +1,138 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Drives many concurrent JobRun lifecycles from a single event loop.
+
+Each lifecycle creates a JobRun CR, waits for the controller to start it,
+checks it through the emr-containers API, waits for it to complete, deletes it
+and waits for the CR to go away. All waits share one watch, which also feeds
+the JobRun state transition recorder.
+
+Requires a controller binary (see `e2e.common.controller`) and a Kubernetes API
+server with the CRDs installed.
+"""
+
+import logging
+import os
+import time
+import pytest
+
+from e2e import service_marker, CRD_GROUP, CRD_VERSION
+from e2e.common.aio import (
+    AsyncEMRContainersClient, CustomResourceWatcher, create_custom_resource,
+    delete_custom_resource, gather_bounded,
+)
+from e2e.common.controller import ControllerProcess, controller_binary
+from e2e.common.lazy import lazy_import
+from e2e.common.workload import JR_RESOURCE_PLURAL, WORKLOAD_LABEL, jobrun_manifests, percentile, is_synced
+from e2e.standin.emrcontainers import EMRContainersStandIn
+
+k8s = lazy_import("acktest.k8s.resource")
+
+# Number of JobRun lifecycles driven concurrently
+JOBRUN_COUNT = int(os.environ.get("EMR_ASYNC_JOBRUNS", "1000"))
+
+# Maximum number of lifecycles in flight at once
+CONCURRENCY_LIMIT = int(os.environ.get("EMR_ASYNC_CONCURRENCY", "500"))
+
+# Maximum time to wait for each step of a lifecycle
+STEP_TIMEOUT_SECONDS = 900
+
+TERMINAL_STATES = {"COMPLETED", "FAILED", "CANCELLED"}
+
+
+@pytest.fixture(scope="module")
+def emr_standin():
+    with EMRContainersStandIn() as standin:
+        yield standin
+
+
+@pytest.fixture(scope="module")
+def async_controller(emr_standin):
+    if controller_binary() is None:
+        pytest.skip("controller binary not configured")
+    controller = ControllerProcess(
+        endpoint_url=emr_standin.endpoint_url,
+        max_concurrent_syncs={"JobRun": 50},
+        name="async-driver",
+    )
+    with controller:
+        yield controller
+
+
+@service_marker
+@pytest.mark.slow
+class Test_AsyncJobRunLifecycles:
+    @pytest.mark.asyncio
+    async def test_concurrent_jobrun_lifecycles(self, emr_standin, async_controller, async_k8s_api,
+            jobrun_transitions, record_property):
+        from botocore.credentials import Credentials
+
+        workload_id = "async-lifecycles"
+        vc_id = emr_standin.seed_virtual_cluster(workload_id)
+        manifests = jobrun_manifests(workload_id, vc_id, JOBRUN_COUNT)
+        durations = {}
+
+        emr = AsyncEMRContainersClient(
+            endpoint_url=emr_standin.endpoint_url,
+            credentials=Credentials("standin", "standin"),
+        )
+        watcher = CustomResourceWatcher(
+            async_k8s_api, CRD_GROUP, CRD_VERSION, JR_RESOURCE_PLURAL, "default",
+            label_selector=f"{WORKLOAD_LABEL}={workload_id}",
+        )
+        watcher.listeners.append(jobrun_transitions.observe)
+
+        async def lifecycle(manifest):
+            name = manifest["metadata"]["name"]
+            ref = k8s.CustomResourceReference(CRD_GROUP, CRD_VERSION, JR_RESOURCE_PLURAL, name, namespace="default")
+            start = time.monotonic()
+
+            await create_custom_resource(async_k8s_api, ref, manifest)
+            cr = await watcher.wait_for(name, lambda obj: obj is not None and is_synced(obj), STEP_TIMEOUT_SECONDS)
+            synced = time.monotonic()
+
+            aws_res = await emr.describe_job_run(id=cr["status"]["id"], virtualClusterId=vc_id)
+            assert aws_res["jobRun"]["name"] == name
+
+            await watcher.wait_for(
+                name,
+                lambda obj: obj is not None and obj.get("status", {}).get("state") in TERMINAL_STATES,
+                STEP_TIMEOUT_SECONDS,
+            )
+            await delete_custom_resource(async_k8s_api, ref, watcher, STEP_TIMEOUT_SECONDS)
+            durations[name] = (synced - start, time.monotonic() - start)
+
+        started = time.monotonic()
+        async with watcher, emr:
+            results = await gather_bounded(
+                (lifecycle(manifest) for manifest in manifests), CONCURRENCY_LIMIT, return_exceptions=True,
+            )
+        elapsed = time.monotonic() - started
+
+        failures = [result for result in results if isinstance(result, BaseException)]
+        for failure in failures[:5]:
+            logging.error("lifecycle failed: %r", failure)
+
+        record_property("jobruns", JOBRUN_COUNT)
+        record_property("elapsed_seconds", round(elapsed, 3))
+        record_property("lifecycles_per_second", round(len(durations) / elapsed, 3))
+        record_property("time_to_sync_p99_seconds", percentile([d[0] for d in durations.values()], 99))
+        record_property("lifecycle_p99_seconds", percentile([d[1] for d in durations.values()], 99))
+        record_property("standin_calls", emr_standin.counters()["calls"])
+        for report in jobrun_transitions.report():
+            record_property("queue_seconds", report.queue_seconds)
+            record_property("emr_queue_seconds", report.emr_queue_seconds)
+            record_property("run_seconds", report.run_seconds)
+
+        assert not failures, f"{len(failures)} of {JOBRUN_COUNT} lifecycles failed"
@@ -0,0 +1,118 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Scale test for batched JobRun status refresh.
+
+With `ACK_EMRCONTAINERS_BATCH_REFRESH_TTL_SECONDS` set, the controller reads
+JobRun state from one paged `ListJobRuns` listing per virtual cluster (and
+VirtualCluster state from one `ListVirtualClusters` listing) instead of a
+`DescribeJobRun` per JobRun per resync. This test runs the same steady-state
+workload against the emr-containers stand-in with and without batching, at
+several JobRun counts, and compares the number of read calls.
+
+Requires a controller binary (see `e2e.common.controller`) and a Kubernetes API
+server with the CRDs installed.
+"""
+
+import logging
+import os
+import time
+import pytest
+
+from e2e import service_marker
+from e2e.common.controller import ControllerProcess, controller_binary
+from e2e.common.workload import (
+    jobrun_manifests, create_jobruns, wait_for_jobruns, delete_jobruns,
+)
+from e2e.standin.emrcontainers import EMRContainersStandIn, JobRunTimings
+
+# JobRun counts to compare, comma separated
+JOBRUN_COUNTS = [int(n) for n in os.environ.get("EMR_BATCH_REFRESH_JOBRUNS", "100,1000,5000").split(",")]
+
+# TTL of the listing cache in batched mode
+BATCH_REFRESH_TTL_SECONDS = 10
+
+# How long read calls are counted once every JobRun has synced. JobRuns are
+# requeued every 15 seconds, so each one is read several times in the window.
+OBSERVATION_SECONDS = 60
+
+# Operations counted as status reads
+READ_OPERATIONS = ("DescribeJobRun", "ListJobRuns", "DescribeVirtualCluster", "ListVirtualClusters")
+
+
+@pytest.fixture(scope="module")
+def emr_standin():
+    # Keep every JobRun RUNNING for the whole test so it is refreshed on every
+    # resync.
+    with EMRContainersStandIn(timings=JobRunTimings(pending=1, submitted=1, running=24 * 3600)) as standin:
+        yield standin
+
+
+def run_steady_state(emr_standin: EMRContainersStandIn, count: int, batched: bool) -> dict:
+    mode = "batched" if batched else "describe"
+    workload_id = f"batch-refresh-{mode}-{count}"
+    vc_id = emr_standin.seed_virtual_cluster(workload_id)
+    extra_env = {}
+    if batched:
+        extra_env["ACK_EMRCONTAINERS_BATCH_REFRESH_TTL_SECONDS"] = str(BATCH_REFRESH_TTL_SECONDS)
+
+    controller = ControllerProcess(
+        endpoint_url=emr_standin.endpoint_url,
+        max_concurrent_syncs={"JobRun": 50},
+        extra_env=extra_env,
+        name=f"batch-refresh-{mode}",
+    )
+    with controller:
+        try:
+            started = time.monotonic()
+            created = create_jobruns(jobrun_manifests(workload_id, vc_id, count))
+            result = wait_for_jobruns(workload_id, created, max(600, count / 5), started=started)
+            assert result.synced == result.count, f"{result.count - result.synced} JobRuns did not sync"
+
+            emr_standin.reset_counters()
+            time.sleep(OBSERVATION_SECONDS)
+            counters = emr_standin.counters()
+        finally:
+            delete_jobruns(workload_id)
+
+    calls = counters["calls"]
+    reads = sum(calls.get(op, 0) for op in READ_OPERATIONS)
+    return {
+        "read_calls": reads,
+        "read_calls_per_second": round(reads / OBSERVATION_SECONDS, 2),
+        "read_calls_per_jobrun": round(reads / count, 3),
+        "total_calls": counters["total_calls"],
+        "calls": calls,
+    }
+
+
+@service_marker
+@pytest.mark.slow
+class Test_BatchedRefreshScale:
+    @pytest.mark.parametrize("count", JOBRUN_COUNTS)
+    def test_batched_refresh_reduces_read_calls(self, count, emr_standin, record_property):
+        if controller_binary() is None:
+            pytest.skip("controller binary not configured")
+
+        describe = run_steady_state(emr_standin, count, batched=False)
+        batched = run_steady_state(emr_standin, count, batched=True)
+
+        reduction = describe["read_calls"] / max(1, batched["read_calls"])
+        for mode, metrics in (("describe", describe), ("batched", batched)):
+            for key, value in metrics.items():
+                record_property(f"{count}.{mode}.{key}", value)
+        record_property(f"{count}.read_call_reduction", round(reduction, 1))
+        logging.info("%d JobRuns: describe=%s batched=%s reduction=%.1fx", count, describe, batched, reduction)
+
+        assert batched["calls"].get("ListJobRuns", 0) > 0, "batched mode never listed JobRuns"
+        assert batched["read_calls"] < describe["read_calls"]
@@ -0,0 +1,99 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Concurrency sweep over the per-resource reconcile settings.
+
+Runs a reduced `e2e.benchmarks.concurrency` sweep against the emr-containers
+stand-in and records the results and the recommended settings. The full sweep
+is meant to be run from the command line.
+
+Requires a controller binary (see `e2e.common.controller`) and a Kubernetes API
+server with the CRDs installed.
+"""
+
+import logging
+import os
+import pytest
+
+from e2e import service_marker
+from e2e.benchmarks.concurrency import (
+    sweep_points, run_sweep, recommend, render_table, observe_seconds_for,
+    SweepPoint, SweepResult, KindResult, RESYNC_MARGIN_SECONDS,
+)
+from e2e.common.controller import controller_binary
+
+# Values swept by the test, comma separated
+JOBRUN_SYNCS = [int(n) for n in os.environ.get("EMR_SWEEP_JOBRUN_SYNCS", "1,10").split(",")]
+VIRTUALCLUSTER_SYNCS = [int(n) for n in os.environ.get("EMR_SWEEP_VIRTUALCLUSTER_SYNCS", "1").split(",")]
+JOBRUNS = int(os.environ.get("EMR_SWEEP_JOBRUNS", "50"))
+VIRTUALCLUSTERS = int(os.environ.get("EMR_SWEEP_VIRTUALCLUSTERS", "5"))
+OBSERVE_SECONDS = 30
+
+
+def _result(jobrun_syncs: int, throughput: float, throttle_fraction: float) -> SweepResult:
+    return SweepResult(
+        point=SweepPoint(jobrun_syncs, 1, 36000, 36000),
+        kinds={
+            "JobRun": KindResult(10, 10, throughput, 1.0, 1.0),
+            "VirtualCluster": KindResult(2, 2, 1.0, 1.0, 0.1),
+        },
+        submit_seconds=10,
+        submit_calls_per_second=5,
+        throttle_fraction=throttle_fraction,
+        steady_calls_per_second=1.1,
+    )
+
+
+@service_marker
+class Test_ConcurrencySweep:
+    def test_recommend_prefers_lowest_sufficient_concurrency(self):
+        results = [
+            _result(1, 1.0, 0.0),
+            _result(10, 9.5, 0.01),
+            _result(25, 10.0, 0.02),
+            _result(50, 10.0, 0.30),
+        ]
+        recommendations = {r.kind: r for r in recommend(results)}
+
+        assert recommendations["JobRun"].max_concurrent_syncs == 10
+        assert recommendations["VirtualCluster"].max_concurrent_syncs == 1
+
+    def test_observe_window_covers_compared_resync_periods(self):
+        # A single resync period per kind is not compared
+        assert observe_seconds_for(sweep_points([1, 10], [1], [36000], [36000]), 30) == 30
+
+        points = sweep_points([1], [1], [36000], [60, 300])
+        assert observe_seconds_for(points, 30) == 300 + RESYNC_MARGIN_SECONDS
+        assert observe_seconds_for(points, 600) == 600
+
+    @pytest.mark.slow
+    def test_sweep(self, record_property):
+        if controller_binary() is None:
+            pytest.skip("controller binary not configured")
+
+        points = sweep_points(JOBRUN_SYNCS, VIRTUALCLUSTER_SYNCS, [36000], [36000])
+        results = run_sweep(points, JOBRUNS, VIRTUALCLUSTERS, OBSERVE_SECONDS)
+        recommendations = recommend(results)
+
+        for result in results:
+            record_property(f"{result.point.label}.jobrun_throughput", round(result.kinds["JobRun"].throughput, 3))
+            record_property(f"{result.point.label}.jobrun_p99_seconds", result.kinds["JobRun"].time_to_sync_p99_seconds)
+            record_property(f"{result.point.label}.submit_calls_per_second", result.submit_calls_per_second)
+            record_property(f"{result.point.label}.steady_calls_per_second", result.steady_calls_per_second)
+        for recommendation in recommendations:
+            record_property(f"recommended.{recommendation.kind}.max_concurrent_syncs", recommendation.max_concurrent_syncs)
+            record_property(f"recommended.{recommendation.kind}.resync_seconds", recommendation.resync_seconds)
+        logging.info("concurrency sweep:\n%s", render_table(results, recommendations))
+
+        assert all(result.all_synced for result in results)
+        assert {r.kind for r in recommendations} == {"JobRun", "VirtualCluster"}
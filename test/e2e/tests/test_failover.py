@@ -0,0 +1,238 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Leader failover scenario for multi-replica controller deployments.
+
+Runs several controller processes with leader election against the API server
+of the current kubeconfig (the local API server in stand-in runs) and the
+emr-containers stand-in. Once part of a batch of JobRuns has been submitted,
+the leader is killed with SIGKILL, so it does not release its lease, and the
+scenario measures:
+
+  - the time until a surviving replica reports leadership,
+  - the time until StartJobRun calls resume, from the first call after the
+    takeover, since calls the killed leader already had in flight can still
+    arrive after it was killed,
+  - the JobRuns not yet synced when the calls resume,
+  - the backlog drain rate after takeover,
+  - duplicate StartJobRun calls per CR, and the job runs created twice
+    because the old leader started them but never recorded their ID.
+
+The leader is identified from controller-runtime's
+`leader_election_master_status` metric. The measurements are recorded with
+`record_property`, so they land in the JUnit report and the metrics store.
+
+Requires a controller binary (see `e2e.common.controller`) and a Kubernetes API
+server with the CRDs installed.
+"""
+
+import logging
+import os
+import threading
+import time
+import pytest
+
+from typing import List, Optional, Tuple
+
+from e2e import service_marker
+from e2e.common.controller import ControllerProcess, controller_binary
+from e2e.common.workload import (
+    JR_RESOURCE_PLURAL, jobrun_manifests, create_jobruns, wait_for_jobruns, delete_jobruns, is_synced,
+    list_resources, wait_for_deleted,
+)
+from e2e.standin.emrcontainers import EMRContainersStandIn, JobRunTimings
+
+# Number of JobRuns in the batch
+JOBRUN_COUNT = int(os.environ.get("EMR_FAILOVER_JOBRUNS", "500"))
+
+# Replica counts to run the scenario with, comma separated
+REPLICAS = [int(n) for n in os.environ.get("EMR_FAILOVER_REPLICAS", "2,3").split(",")]
+
+# Fraction of the batch submitted to emr-containers when the leader is killed
+KILL_AT_FRACTION = 0.3
+
+# Maximum time to wait for a replica to become leader. A lease left over by an
+# earlier run has to expire first.
+LEADER_TIMEOUT_SECONDS = 120
+
+# Maximum time to wait for every JobRun to sync, counted from submission
+SYNC_TIMEOUT_SECONDS = 900
+
+# Maximum time to wait for the batch to be deleted
+DELETE_TIMEOUT_SECONDS = 300
+
+LEADER_METRIC = "leader_election_master_status"
+
+# Time between two leadership checks
+LEADER_POLL_SECONDS = 0.25
+
+
+@pytest.fixture(scope="module")
+def emr_standin():
+    # Keep JobRuns from finishing during the scenario, so that resyncs stay
+    # comparable across replicas.
+    with EMRContainersStandIn(timings=JobRunTimings(pending=1, submitted=1, running=3600)) as standin:
+        yield standin
+
+
+def is_leader(controller: ControllerProcess) -> bool:
+    if not controller.running:
+        return False
+    try:
+        return controller.metric_value(LEADER_METRIC) >= 1
+    except OSError:
+        return False
+
+
+def wait_for_leader(controllers: List[ControllerProcess], timeout: float) -> Tuple[ControllerProcess, float]:
+    """Returns the replica that holds the lease and when it was first seen
+    holding it.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        for controller in controllers:
+            if is_leader(controller):
+                return controller, time.monotonic()
+        time.sleep(LEADER_POLL_SECONDS)
+    raise TimeoutError(f"no leader among {[c.name for c in controllers]} after {timeout}s")
+
+
+def wait_for_starts(emr_standin: EMRContainersStandIn, count: int, timeout: float,
+        errors: List[BaseException]):
+    """Waits for `count` StartJobRun calls, raising the first error of the
+    thread creating the JobRuns if it fails meanwhile.
+    """
+    deadline = time.monotonic() + timeout
+    while len(emr_standin.start_job_run_times) < count:
+        if errors:
+            raise errors[0]
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"{len(emr_standin.start_job_run_times)} of {count} StartJobRun calls after {timeout}s")
+        time.sleep(0.05)
+
+
+def wait_for_start_after(emr_standin: EMRContainersStandIn, t: float, timeout: float) -> Optional[float]:
+    """Returns the time of the first StartJobRun call after `t`, or None if
+    there is none within `timeout`.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        resumed_at = first_after(emr_standin.start_job_run_times, t)
+        if resumed_at is not None:
+            return resumed_at
+        time.sleep(0.05)
+    return None
+
+
+def first_after(times: List[float], t: float) -> Optional[float]:
+    return next((x for x in list(times) if x > t), None)
+
+
+def run_failover(emr_standin: EMRContainersStandIn, replicas: int, count: int) -> dict:
+    workload_id = f"failover-{replicas}"
+    vc_id = emr_standin.seed_virtual_cluster(workload_id)
+    emr_standin.reset_counters()
+
+    controllers = [
+        ControllerProcess(
+            endpoint_url=emr_standin.endpoint_url,
+            leader_election=True,
+            max_concurrent_syncs={"JobRun": 10},
+            name=f"failover-{replicas}-{i}",
+        )
+        for i in range(replicas)
+    ]
+    created = {}
+    errors: List[BaseException] = []
+
+    def create():
+        try:
+            created.update(create_jobruns(jobrun_manifests(workload_id, vc_id, count)))
+        except BaseException as ex:
+            errors.append(ex)
+
+    try:
+        for controller in controllers:
+            controller.start()
+        leader, _ = wait_for_leader(controllers, LEADER_TIMEOUT_SECONDS)
+        logging.info("%s is the leader", leader.name)
+
+        started = time.monotonic()
+        creator = threading.Thread(target=create)
+        creator.start()
+
+        wait_for_starts(emr_standin, int(count * KILL_AT_FRACTION), SYNC_TIMEOUT_SECONDS, errors)
+        killed_at = time.monotonic()
+        leader.kill()
+        survivors = [c for c in controllers if c is not leader]
+        new_leader, elected_at = wait_for_leader(survivors, LEADER_TIMEOUT_SECONDS)
+        logging.info("%s took over after %.1fs", new_leader.name, elected_at - killed_at)
+
+        # Every CR not synced when the new leader starts calling, including
+        # those not created yet, is left for it to submit.
+        resumed_at = wait_for_start_after(emr_standin, elected_at, SYNC_TIMEOUT_SECONDS)
+        backlog_at_resume = None
+        if resumed_at is not None:
+            backlog_at_resume = count - sum(1 for cr in list_resources(JR_RESOURCE_PLURAL, workload_id) if is_synced(cr))
+
+        creator.join()
+        if errors:
+            raise errors[0]
+        result = wait_for_jobruns(workload_id, created, SYNC_TIMEOUT_SECONDS, started=started)
+    finally:
+        # Let the surviving replicas remove the finalizers, so that the next
+        # parametrization does not start with this batch still Terminating.
+        delete_jobruns(workload_id)
+        wait_for_deleted(JR_RESOURCE_PLURAL, workload_id, timeout=DELETE_TIMEOUT_SECONDS)
+        for controller in controllers:
+            controller.stop()
+
+    starts = list(emr_standin.start_job_run_times)
+    start_counts = emr_standin.start_job_run_names.copy()
+    job_runs = emr_standin.job_run_names()
+    after_resume = [t for t in starts if resumed_at is not None and t >= resumed_at]
+    drain_seconds = after_resume[-1] - resumed_at if len(after_resume) > 1 else 0.0
+
+    return {
+        "jobruns": result.count,
+        "synced": result.synced,
+        "submitted_before_kill": sum(1 for t in starts if t <= killed_at),
+        "takeover_seconds": round(elected_at - killed_at, 3),
+        "resume_seconds": round(resumed_at - killed_at, 3) if resumed_at is not None else None,
+        "backlog_at_resume": backlog_at_resume,
+        "drain_per_second": round(len(after_resume) / drain_seconds, 3) if drain_seconds else None,
+        "throughput_per_second": round(result.throughput, 3),
+        "time_to_sync_p99_seconds": result.time_to_sync_percentile(99),
+        "duplicate_start_job_run_calls": sum(n - 1 for n in start_counts.values() if n > 1),
+        "max_start_job_run_calls_per_jobrun": max(start_counts.values(), default=0),
+        "duplicate_job_runs": sum(n - 1 for n in job_runs.values() if n > 1),
+    }
+
+
+@service_marker
+@pytest.mark.slow
+class Test_Failover:
+    @pytest.mark.parametrize("replicas", REPLICAS)
+    def test_leader_failover_mid_batch(self, replicas, emr_standin, record_property):
+        if controller_binary() is None:
+            pytest.skip("controller binary not configured")
+        assert replicas >= 2, "failover needs at least two replicas"
+
+        metrics = run_failover(emr_standin, replicas, JOBRUN_COUNT)
+        for key, value in metrics.items():
+            record_property(f"{replicas}_replicas.{key}", value)
+        logging.info("failover with %d replicas: %s", replicas, metrics)
+
+        assert metrics["jobruns"] == JOBRUN_COUNT, f"only {metrics['jobruns']} of {JOBRUN_COUNT} JobRuns were created"
+        assert metrics["synced"] == metrics["jobruns"], f"{metrics['jobruns'] - metrics['synced']} JobRuns did not sync"
+        assert metrics["resume_seconds"] is not None, "StartJobRun calls never resumed after the leader was killed"
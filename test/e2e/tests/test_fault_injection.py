@@ -0,0 +1,113 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Fault-injection scenarios for JobRun submission.
+
+Each scenario runs the controller against the emr-containers stand-in with one
+of the `FAULT_PROFILES` active for a fixed window, submits a batch of JobRuns,
+and measures throughput, the time to recover once the faults are cleared, and
+the number of API calls made (including the ones wasted on injected faults).
+
+Requires a controller binary (see `e2e.common.controller`) and a Kubernetes API
+server with the CRDs installed.
+"""
+
+import logging
+import os
+import threading
+import time
+import pytest
+
+from e2e import service_marker
+from e2e.common.controller import ControllerProcess, controller_binary
+from e2e.common.workload import (
+    jobrun_manifests, create_jobruns, wait_for_jobruns, delete_jobruns,
+)
+from e2e.standin.emrcontainers import EMRContainersStandIn, JobRunTimings
+from e2e.standin.faults import FAULT_PROFILES
+
+# Number of JobRuns submitted in each scenario
+JOBRUN_COUNT = int(os.environ.get("EMR_FAULT_SCENARIO_JOBRUNS", "50"))
+
+# How long the fault profile stays active after submission starts
+FAULT_WINDOW_SECONDS = 60
+
+# Maximum time to wait for every JobRun to sync, counted from submission
+SYNC_TIMEOUT_SECONDS = 900
+
+
+@pytest.fixture(scope="module")
+def emr_standin():
+    with EMRContainersStandIn(timings=JobRunTimings(pending=2, submitted=2, running=10)) as standin:
+        yield standin
+
+
+@pytest.fixture(scope="module")
+def standin_controller(emr_standin):
+    if controller_binary() is None:
+        pytest.skip("controller binary not configured")
+    with ControllerProcess(endpoint_url=emr_standin.endpoint_url, name="fault-injection") as controller:
+        yield controller
+
+
+@service_marker
+@pytest.mark.slow
+class Test_FaultInjection:
+    @pytest.mark.parametrize("profile", sorted(FAULT_PROFILES))
+    def test_jobrun_submission_under_faults(self, profile, emr_standin, standin_controller, record_property):
+        workload_id = f"faults-{profile}"[:63]
+        vc_id = emr_standin.seed_virtual_cluster(workload_id)
+        emr_standin.reset_counters()
+
+        emr_standin.faults.configure_from_dict(FAULT_PROFILES[profile])
+        cleared = {}
+
+        def clear_faults():
+            emr_standin.faults.clear()
+            cleared["at"] = time.monotonic()
+
+        timer = threading.Timer(FAULT_WINDOW_SECONDS, clear_faults)
+        try:
+            started = time.monotonic()
+            timer.start()
+            created = create_jobruns(jobrun_manifests(workload_id, vc_id, JOBRUN_COUNT))
+            result = wait_for_jobruns(workload_id, created, SYNC_TIMEOUT_SECONDS, started=started)
+        finally:
+            timer.cancel()
+            emr_standin.faults.clear()
+            delete_jobruns(workload_id)
+
+        counters = emr_standin.counters()
+        last_synced = started + result.elapsed_seconds
+        # Zero when every JobRun synced while the faults were still active
+        recover_seconds = max(0.0, last_synced - cleared["at"]) if "at" in cleared else 0.0
+        duplicate_starts = sum(n - 1 for n in emr_standin.start_job_run_names.values() if n > 1)
+
+        metrics = {
+            "jobruns": result.count,
+            "synced": result.synced,
+            "throughput_per_second": round(result.throughput, 3),
+            "time_to_sync_p50_seconds": result.time_to_sync_percentile(50),
+            "time_to_sync_p99_seconds": result.time_to_sync_percentile(99),
+            "time_to_recover_seconds": round(recover_seconds, 3),
+            "total_calls": counters["total_calls"],
+            "wasted_calls": counters["total_faulted"],
+            "calls_per_jobrun": round(counters["total_calls"] / max(1, result.count), 2),
+            "duplicate_start_job_runs": duplicate_starts,
+        }
+        for key, value in metrics.items():
+            record_property(f"{profile}.{key}", value)
+        record_property(f"{profile}.calls", counters["calls"])
+        logging.info("fault profile %s: %s", profile, metrics)
+
+        assert result.synced == result.count, f"{result.count - result.synced} JobRuns did not sync under profile {profile}"
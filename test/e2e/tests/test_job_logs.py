@@ -0,0 +1,199 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Tests for the job run log reader against the S3 and emr-containers
+stand-ins.
+"""
+
+import gzip
+import threading
+import time
+import pytest
+
+from e2e import service_marker
+from e2e.common import joblogs
+from e2e.common.joblogs import JobLogReader
+from e2e.standin.emrcontainers import EMRContainersStandIn, JobRunTimings
+
+BUCKET = "emr-eks-logs"
+LOG_URI = f"s3://{BUCKET}/logs"
+
+
+@pytest.fixture(autouse=True)
+def standin_credentials(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "standin")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "standin")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-west-2")
+
+
+@pytest.fixture(scope="module")
+def emr_standin():
+    with EMRContainersStandIn(timings=JobRunTimings(pending=0.5, submitted=0.5, running=2)) as standin:
+        yield standin
+
+
+@pytest.fixture
+def s3(s3_standin):
+    s3_standin.create_bucket(BUCKET)
+    return joblogs.s3_client(s3_standin.endpoint_url)
+
+
+def driver_key(vc_id: str, job_run_id: str, name: str) -> str:
+    return f"logs/{vc_id}/jobs/{job_run_id}/containers/spark-{job_run_id}/spark-{job_run_id}-driver/{name}"
+
+
+def push(s3_standin, key: str, text: str):
+    """Uploads `text` the way the log pusher does, as one more gzip member."""
+    s3_standin.append_object(BUCKET, key, gzip.compress(text.encode()))
+
+
+def new_reader(s3, vc_id: str, job_run_id: str, **kwargs) -> JobLogReader:
+    return JobLogReader(s3, LOG_URI, vc_id, job_run_id, poll_seconds=0.1, **kwargs)
+
+
+@service_marker
+class Test_JobLogs:
+    def test_log_uri_from_configuration_overrides(self):
+        overrides = (
+            "ApplicationConfiguration: null\n"
+            "MonitoringConfiguration:\n"
+            "  PersistentAppUI: ENABLED\n"
+            "  S3MonitoringConfiguration:\n"
+            "    LogUri: s3://bucket/logs\n"
+        )
+        assert joblogs.log_uri_from_configuration_overrides(overrides) == "s3://bucket/logs"
+        assert joblogs.log_uri_from_configuration_overrides(
+            '{"monitoringConfiguration": {"s3MonitoringConfiguration": {"logUri": "s3://b/p"}}}'
+        ) == "s3://b/p"
+        assert joblogs.log_uri_from_configuration_overrides(None) is None
+        assert joblogs.parse_s3_uri("s3://bucket/logs/") == ("bucket", "logs")
+
+    def test_poll_reads_only_appended_bytes(self, s3, s3_standin):
+        key = driver_key("vc1", "jr1", "stdout.gz")
+        # Executor logs and other job runs are not followed
+        push(s3_standin, f"logs/vc1/jobs/jr1/containers/spark-jr1/spark-jr1-exec-1/stdout.gz", "executor\n")
+        push(s3_standin, driver_key("vc1", "jr2", "stdout.gz"), "other job\n")
+        push(s3_standin, key, "line 1\nline ")
+        push(s3_standin, driver_key("vc1", "jr1", "stderr.gz"), "warning\n")
+        reader = new_reader(s3, "vc1", "jr1")
+
+        assert [(l.stream, l.text) for l in reader.poll()] == [("stderr", "warning"), ("stdout", "line 1")]
+        push(s3_standin, key, "2\nline 3\n")
+        assert [l.text for l in reader.poll()] == ["line 2", "line 3"]
+
+        s3_standin.reset_counters()
+        assert reader.poll() == []
+        # Nothing grew, so nothing was fetched
+        assert s3_standin.counters()["calls"] == {"ListObjectsV2": 1}
+
+        push(s3_standin, key, "line 4\n")
+        reader.poll()
+        counters = s3_standin.counters()
+        # Only the new gzip member was transferred
+        assert counters["bytes_served"] == len(gzip.compress(b"line 4\n"))
+
+    def test_rotation_neither_loses_nor_repeats_lines(self, s3, s3_standin):
+        key = driver_key("vc1", "rotated", "stdout.gz")
+        push(s3_standin, key, "line 1\n")
+        reader = new_reader(s3, "vc1", "rotated")
+        assert [l.text for l in reader.poll()] == ["line 1"]
+
+        # The live object is renamed after one more upload and restarts empty
+        push(s3_standin, key, "line 2\n")
+        s3_standin.put_object(BUCKET, driver_key("vc1", "rotated", "stdout.1.gz"), s3_standin.get_object_data(BUCKET, key))
+        s3_standin.put_object(BUCKET, key, gzip.compress(b"line 3\n"))
+        assert [l.text for l in reader.poll()] == ["line 2", "line 3"]
+
+    def test_follow_stops_on_completion_marker(self, s3, s3_standin):
+        key = driver_key("vc1", "marker", "stdout.gz")
+
+        def run_job():
+            for i in range(5):
+                push(s3_standin, key, f"step {i}\n")
+                time.sleep(0.1)
+            push(s3_standin, key, "Pi is roughly 3.141\nshutting down\n")
+
+        writer = threading.Thread(target=run_job)
+        writer.start()
+        lines = []
+        result = new_reader(s3, "vc1", "marker").follow(
+            on_line=lambda line: lines.append(line.text), completion_marker=r"Pi is roughly", timeout=30,
+        )
+        writer.join()
+
+        assert result.reason == "marker"
+        assert result.succeeded
+        assert result.marker_line == "Pi is roughly 3.141"
+        assert lines == [f"step {i}" for i in range(5)] + ["Pi is roughly 3.141"]
+
+    def test_follow_stops_on_terminal_state(self, s3, s3_standin, emr_standin):
+        import boto3
+        emr = boto3.client("emr-containers", endpoint_url=emr_standin.endpoint_url)
+        vc_id = emr_standin.seed_virtual_cluster("job-logs")
+        job_run_id = emr.start_job_run(
+            name="job-logs", virtualClusterId=vc_id, clientToken="job-logs",
+            executionRoleArn="arn:aws:iam::111122223333:role/standin", releaseLabel="emr-6.3.0-latest",
+            jobDriver={"sparkSubmitJobDriver": {"entryPoint": "local:///pi.py"}},
+        )["id"]
+        key = driver_key(vc_id, job_run_id, "stdout.gz")
+        push(s3_standin, key, "starting\n")
+        push(s3_standin, driver_key(vc_id, job_run_id, "stderr.gz"), "no trailing newline")
+
+        result = new_reader(s3, vc_id, job_run_id).follow(
+            job_state=joblogs.job_state_getter(emr, vc_id, job_run_id), timeout=30, drain_seconds=1,
+        )
+
+        assert result.reason == "state"
+        assert result.state == "COMPLETED"
+        assert result.succeeded
+        assert result.lines == 2
+
+    def test_follow_drains_lines_uploaded_after_terminal_state(self, s3, s3_standin):
+        key = driver_key("vc1", "draining", "stdout.gz")
+        push(s3_standin, key, "starting\n")
+
+        def push_last_lines():
+            # The log pusher uploads the last lines a few polls after the job
+            # run has finished
+            time.sleep(0.5)
+            push(s3_standin, key, "Pi is roughly 3.141\n")
+
+        writer = threading.Thread(target=push_last_lines)
+        writer.start()
+        lines = []
+        result = new_reader(s3, "vc1", "draining").follow(
+            on_line=lambda line: lines.append(line.text),
+            job_state=lambda: "COMPLETED", timeout=30, drain_seconds=1,
+        )
+        writer.join()
+
+        assert result.reason == "state"
+        assert lines == ["starting", "Pi is roughly 3.141"]
+
+    def test_follow_times_out(self, s3, s3_standin):
+        push(s3_standin, driver_key("vc1", "stuck", "stdout.gz"), "waiting\n")
+        result = new_reader(s3, "vc1", "stuck").follow(completion_marker="done", timeout=0.5)
+        assert result.reason == "timeout"
+        assert not result.succeeded
+        assert result.lines == 1
+
+    def test_cli(self, s3_standin, capsys):
+        s3_standin.create_bucket(BUCKET)
+        push(s3_standin, driver_key("vc1", "cli", "stdout.gz"), "hello\nPi is roughly 3.14\n")
+        code = joblogs.main([
+            "--log-uri", LOG_URI, "--virtual-cluster-id", "vc1", "--job-run-id", "cli",
+            "--stream", "stdout", "--marker", "Pi is roughly", "--no-state",
+            "--s3-endpoint-url", s3_standin.endpoint_url, "--timeout", "10", "--poll-seconds", "0.1",
+        ])
+        assert code == 0
+        assert capsys.readouterr().out.splitlines() == ["hello", "Pi is roughly 3.14"]
@@ -14,19 +14,20 @@
 """Integration tests for the EMR on EKS VirtualCluster resource
 """
 
-import boto3
 import json
 import logging
 import time
 from typing import Dict
 import pytest
 
-from acktest.k8s import resource as k8s
-from acktest.resources import random_suffix_name
-from acktest.aws.identity import get_account_id
+from e2e.common.lazy import lazy_import
+from e2e.common import joblogs
 from e2e import service_marker, CRD_GROUP, CRD_VERSION, load_resource
 from e2e.replacement_values import REPLACEMENT_VALUES
-from e2e.bootstrap_resources import get_bootstrap_resources
+from e2e.bootstrap_resources import get_bootstrap_resources, uses_local_cluster
+
+boto3 = lazy_import("boto3")
+k8s = lazy_import("acktest.k8s.resource")
 
 VC_RESOURCE_PLURAL = "virtualclusters"
 JR_RESOURCE_PLURAL = "jobruns"
@@ -34,8 +35,11 @@ JR_RESOURCE_PLURAL = "jobruns"
 # Time to wait after modifying the CR for the status to change
 MODIFY_WAIT_AFTER_SECONDS = 10
 
-# Time to wait after the zone has changed status, for the CR to update
-CHECK_STATUS_WAIT_SECONDS = 180
+# Time to wait for the job run to finish, following its driver logs
+JOB_COMPLETION_TIMEOUT_SECONDS = 900
+
+# Printed by the pi.py example once the job has computed its result
+PI_COMPLETION_MARKER = r"Pi is roughly \d"
 
 # Maximum time to wait for EKS cluster to be active (5 minutes)
 MAX_EKS_WAIT_SECONDS = 300
@@ -86,13 +90,16 @@ def iam_client():
 
 
 @pytest.fixture
-def jobrun(eks_client):
+def jobrun(aws_endpoints, eks_client):
+    from acktest.resources import random_suffix_name
+
     virtual_cluster_name = random_suffix_name("emr-virtual-cluster", 32)
     job_run_name = random_suffix_name("emr-job-run", 32)
 
-    # Wait for EKS cluster to be active before proceeding
+    # Wait for EKS cluster to be active before proceeding. Local host clusters
+    # are ready as soon as they are bootstrapped.
     eks_cluster_name = get_bootstrap_resources().HostCluster_JR.cluster.name
-    if not wait_for_eks_cluster_active(eks_client, eks_cluster_name):
+    if not uses_local_cluster() and not wait_for_eks_cluster_active(eks_client, eks_cluster_name):
         pytest.fail(f"EKS cluster {eks_cluster_name} did not become active within {MAX_EKS_WAIT_SECONDS}seconds")
 
     replacements = REPLACEMENT_VALUES.copy()
@@ -171,9 +178,6 @@ def jobrun(eks_client):
 
     yield (vc_ref, vc_cr, jr_ref, jr_cr)
 
-    # Introducing sleep for emr job to finish
-    time.sleep(CHECK_STATUS_WAIT_SECONDS)
-
     # Try to delete, if doesn't already exist
     try:
         _, deleted = k8s.delete_custom_resource(jr_ref, 3, 10)
@@ -249,6 +253,7 @@ class Test_JobRun:
         oidc_provider = oidc_provider_arn.split('oidc-provider/')[1]
         emr_namespace = "emr-ns"
         base36_encoded_role_name = self.base36_encode(job_execution_role_name)
+        from acktest.aws.identity import get_account_id
         account_id = get_account_id()
         LOG = logging.getLogger(__name__)
         TRUST_POLICY_STATEMENT_ALREADY_EXISTS = "Trust policy statement already " \
@@ -301,11 +306,16 @@ class Test_JobRun:
             return TRUST_POLICY_STATEMENT_ALREADY_EXISTS % job_execution_role_name
 
     def test_create_delete_jobrun(self, jobrun, emrcontainers_client, iam_client):
-        oidc_provider_arn = get_bootstrap_resources().HostCluster_JR.export_oidc_arn
+        # The stand-in neither checks trust policies nor runs the job, so the
+        # IAM and driver log steps only apply against AWS.
+        local = uses_local_cluster()
 
-        # Update Job Execution Role
-        role_update = self.update_assume_role(oidc_provider_arn, iam_client)
-        assert role_update
+        if not local:
+            oidc_provider_arn = get_bootstrap_resources().HostCluster_JR.export_oidc_arn
+
+            # Update Job Execution Role
+            role_update = self.update_assume_role(oidc_provider_arn, iam_client)
+            assert role_update
 
         (vc_ref, vc_cr, jr_ref, jr_cr) = jobrun
         assert vc_cr, jr_cr
@@ -323,13 +333,22 @@ class Test_JobRun:
         except emrcontainers_client.exceptions.ResourceNotFoundException:
             pytest.fail(f"Could not find job run with ID in EMR on EKS")
 
-        # delete oidc provider
-        try:
-            aws_res = iam_client.delete_open_id_connect_provider(
-                OpenIDConnectProviderArn=oidc_provider_arn)
-            assert aws_res is not None
-        except iam_client.exceptions.InvalidInputException:
-            pytest.fail(f"Could not delete oidc identity provider")
+        if not local:
+            # Follow the driver logs until the job prints its result or finishes
+            log_uri = joblogs.log_uri_from_configuration_overrides(jr_cr["spec"]["configurationOverrides"])
+            assert log_uri, "JobRun does not send its logs to S3"
+            reader = joblogs.JobLogReader(boto3.client("s3"), log_uri, virtual_cluster_id, jobrun_id)
+            result = reader.follow(
+                on_line=lambda line: logging.debug("%s %s: %s", jobrun_id, line.stream, line.text),
+                completion_marker=PI_COMPLETION_MARKER,
+                job_state=joblogs.job_state_getter(emrcontainers_client, virtual_cluster_id, jobrun_id),
+                timeout=JOB_COMPLETION_TIMEOUT_SECONDS,
+            )
+            logging.info("followed logs of %s: %s", jobrun_id, result)
+            assert result.succeeded, f"job run {jobrun_id} did not complete: stopped on {result.reason} in state {result.state}"
+
+        # The OIDC provider is shared with the other tests and is deleted by
+        # the bootstrap cleanup once nothing references it.
 
         # check if JobRun is deleted
         try:
@@ -0,0 +1,130 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Compares fanning out job runs through one JobRunSet against creating one
+JobRun CR per job run.
+
+For each fan-out size the same number of job runs is started against the
+emr-containers stand-in, once as individual JobRuns and once as the members of
+a single JobRunSet, and the test records the number and serialized size of the
+objects stored in the API server, the controller CPU time spent reaching and
+holding steady state, and the StartJobRun calls made.
+
+Requires a controller binary (see `e2e.common.controller`) and a Kubernetes API
+server with the CRDs installed.
+"""
+
+import json
+import logging
+import os
+import time
+import pytest
+
+from e2e import service_marker
+from e2e.common.controller import ControllerProcess, controller_binary
+from e2e.common.workload import (
+    JR_RESOURCE_PLURAL, JRS_RESOURCE_PLURAL,
+    jobrun_manifests, jobrunset_manifest,
+    create_resources, list_resources, delete_resources, wait_for_jobruns,
+)
+from e2e.standin.emrcontainers import EMRContainersStandIn, JobRunTimings
+
+# Fan-out sizes to compare, comma separated
+FANOUT_SIZES = [int(n) for n in os.environ.get("EMR_JOBRUNSET_FANOUT", "100,1000").split(",")]
+
+# How long controller CPU time keeps being counted once every job run has
+# started, covering several resyncs
+OBSERVATION_SECONDS = 60
+
+CPU_METRIC = "process_cpu_seconds_total"
+
+
+@pytest.fixture(scope="module")
+def emr_standin():
+    with EMRContainersStandIn(timings=JobRunTimings(pending=1, submitted=1, running=24 * 3600)) as standin:
+        yield standin
+
+
+def all_members_started(cr: dict) -> bool:
+    ids = cr.get("status", {}).get("jobRunIDs") or []
+    last = cr["spec"]["range"]["to"]
+    return len(ids) == last + 1 and all(ids)
+
+
+def run_fanout(emr_standin: EMRContainersStandIn, count: int, as_set: bool) -> dict:
+    mode = "jobrunset" if as_set else "jobruns"
+    workload_id = f"fanout-{mode}-{count}"
+    vc_id = emr_standin.seed_virtual_cluster(workload_id)
+    plural = JRS_RESOURCE_PLURAL if as_set else JR_RESOURCE_PLURAL
+    if as_set:
+        manifests = [jobrunset_manifest(workload_id, vc_id, count)]
+        predicate = all_members_started
+    else:
+        manifests = jobrun_manifests(workload_id, vc_id, count)
+        predicate = None
+
+    emr_standin.reset_counters()
+    controller = ControllerProcess(
+        endpoint_url=emr_standin.endpoint_url,
+        max_concurrent_syncs={"JobRun": 50, "JobRunSet": 50},
+        name=f"fanout-{mode}",
+    )
+    with controller:
+        try:
+            cpu_before = controller.metric_value(CPU_METRIC)
+            started = time.monotonic()
+            created = create_resources(plural, manifests)
+            wait_kwargs = {"plural": plural, "started": started}
+            if predicate is not None:
+                wait_kwargs["predicate"] = predicate
+            result = wait_for_jobruns(workload_id, created, max(600, count / 5), **wait_kwargs)
+            assert result.synced == result.count, f"{result.count - result.synced} {plural} did not start"
+            cpu_to_sync = controller.metric_value(CPU_METRIC) - cpu_before
+
+            time.sleep(OBSERVATION_SECONDS)
+            cpu_total = controller.metric_value(CPU_METRIC) - cpu_before
+            objects = list_resources(plural, workload_id)
+            counters = emr_standin.counters()
+        finally:
+            delete_resources(plural, workload_id)
+
+    return {
+        "objects": len(objects),
+        "stored_bytes": sum(len(json.dumps(obj)) for obj in objects),
+        "seconds_to_start": round(result.elapsed_seconds, 2),
+        "cpu_seconds_to_start": round(cpu_to_sync, 3),
+        "cpu_seconds_total": round(cpu_total, 3),
+        "start_job_run_calls": counters["calls"].get("StartJobRun", 0),
+        "total_calls": counters["total_calls"],
+    }
+
+
+@service_marker
+@pytest.mark.slow
+class Test_JobRunSetFanout:
+    @pytest.mark.parametrize("count", FANOUT_SIZES)
+    def test_jobrunset_fanout(self, count, emr_standin, record_property):
+        if controller_binary() is None:
+            pytest.skip("controller binary not configured")
+
+        individual = run_fanout(emr_standin, count, as_set=False)
+        fanout = run_fanout(emr_standin, count, as_set=True)
+
+        for mode, metrics in (("jobruns", individual), ("jobrunset", fanout)):
+            for key, value in metrics.items():
+                record_property(f"{count}.{mode}.{key}", value)
+        logging.info("%d job runs: individual=%s set=%s", count, individual, fanout)
+
+        assert fanout["objects"] == 1
+        assert fanout["start_job_run_calls"] == count
+        assert fanout["stored_bytes"] < individual["stored_bytes"]
@@ -0,0 +1,130 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Tests for the OIDC provider manager, against an in-memory IAM.
+"""
+
+import pytest
+
+from e2e import service_marker
+from e2e.bootstrappable import oidc
+from e2e.bootstrappable.oidc import OIDCProviderManager, MANAGED_TAG_KEY, REFERENCES_TAG_KEY
+
+ISSUER = "https://oidc.eks.us-west-2.amazonaws.com/id/EXAMPLE"
+ARN = "arn:aws:iam::111122223333:oidc-provider/oidc.eks.us-west-2.amazonaws.com/id/EXAMPLE"
+
+
+class FakeIAM:
+    class exceptions:
+        class EntityAlreadyExistsException(Exception):
+            pass
+
+        class NoSuchEntityException(Exception):
+            pass
+
+    def __init__(self):
+        self.providers = {}
+        self.tags = {}
+        self.mutations = []
+        # Number of list calls that leave out providers, as an eventually
+        # consistent listing would
+        self.stale_lists = 0
+
+    def add_provider(self, arn, client_ids, thumbprints, tags=None):
+        self.providers[arn] = {"ClientIDList": list(client_ids), "ThumbprintList": list(thumbprints)}
+        self.tags[arn] = dict(tags or {})
+
+    def list_open_id_connect_providers(self):
+        if self.stale_lists:
+            self.stale_lists -= 1
+            return {"OpenIDConnectProviderList": []}
+        return {"OpenIDConnectProviderList": [{"Arn": arn} for arn in self.providers]}
+
+    def get_open_id_connect_provider(self, OpenIDConnectProviderArn):
+        return self.providers[OpenIDConnectProviderArn]
+
+    def list_open_id_connect_provider_tags(self, OpenIDConnectProviderArn):
+        if OpenIDConnectProviderArn not in self.tags:
+            raise self.exceptions.NoSuchEntityException()
+        return {"Tags": [{"Key": k, "Value": v} for k, v in self.tags[OpenIDConnectProviderArn].items()]}
+
+    def tag_open_id_connect_provider(self, OpenIDConnectProviderArn, Tags):
+        self.tags[OpenIDConnectProviderArn].update({tag["Key"]: tag["Value"] for tag in Tags})
+
+    def create_open_id_connect_provider(self, Url, ClientIDList, ThumbprintList, Tags):
+        arn = "arn:aws:iam::111122223333:oidc-provider/" + Url[len("https://"):]
+        if arn in self.providers:
+            raise self.exceptions.EntityAlreadyExistsException()
+        self.add_provider(arn, ClientIDList, ThumbprintList, {tag["Key"]: tag["Value"] for tag in Tags})
+        return {"OpenIDConnectProviderArn": arn}
+
+    def add_client_id_to_open_id_connect_provider(self, OpenIDConnectProviderArn, ClientID):
+        self.mutations.append(("add_client_id", OpenIDConnectProviderArn, ClientID))
+        self.providers[OpenIDConnectProviderArn]["ClientIDList"].append(ClientID)
+
+    def update_open_id_connect_provider_thumbprint(self, OpenIDConnectProviderArn, ThumbprintList):
+        self.mutations.append(("update_thumbprint", OpenIDConnectProviderArn, ThumbprintList))
+        self.providers[OpenIDConnectProviderArn]["ThumbprintList"] = list(ThumbprintList)
+
+    def delete_open_id_connect_provider(self, OpenIDConnectProviderArn):
+        self.mutations.append(("delete", OpenIDConnectProviderArn))
+        del self.providers[OpenIDConnectProviderArn]
+        del self.tags[OpenIDConnectProviderArn]
+
+
+@service_marker
+class Test_OIDCProviderManager:
+    def test_unmanaged_provider_is_used_as_is(self):
+        iam = FakeIAM()
+        iam.add_provider(ARN, ["other.example.com"], ["a" * 40])
+        manager = OIDCProviderManager(iam)
+
+        assert manager.acquire(ISSUER, thumbprints=["b" * 40]) == ARN
+        assert manager.release(ARN) is False
+        assert iam.mutations == []
+        assert iam.tags[ARN] == {}
+
+    def test_managed_provider_is_reconciled_and_counted(self):
+        iam = FakeIAM()
+        iam.add_provider(ARN, [], ["a" * 40], {MANAGED_TAG_KEY: "true", REFERENCES_TAG_KEY: "1"})
+        manager = OIDCProviderManager(iam)
+
+        assert manager.acquire(ISSUER, thumbprints=["b" * 40]) == ARN
+        assert iam.providers[ARN] == {"ClientIDList": ["sts.amazonaws.com"], "ThumbprintList": ["b" * 40]}
+        assert iam.tags[ARN][REFERENCES_TAG_KEY] == "2"
+
+        assert manager.release(ARN) is False
+        assert manager.release(ARN) is True
+        assert ARN not in iam.providers
+
+    def test_created_concurrently_is_looked_up(self, monkeypatch):
+        monkeypatch.setattr(oidc, "LOOKUP_INTERVAL_SECONDS", 0)
+        iam = FakeIAM()
+        manager = OIDCProviderManager(iam)
+        manager.index  # Built before another session creates the provider
+        iam.add_provider(ARN, ["sts.amazonaws.com"], ["a" * 40])
+        iam.stale_lists = 2
+
+        assert manager.acquire(ISSUER, thumbprints=["a" * 40]) == ARN
+        assert iam.mutations == []
+
+    def test_missing_provider_after_conflict_raises(self, monkeypatch):
+        monkeypatch.setattr(oidc, "LOOKUP_INTERVAL_SECONDS", 0)
+        iam = FakeIAM()
+        manager = OIDCProviderManager(iam)
+        manager.index
+        iam.add_provider(ARN, [], [])
+        iam.stale_lists = oidc.LOOKUP_ATTEMPTS
+
+        with pytest.raises(RuntimeError):
+            manager.acquire(ISSUER, thumbprints=["a" * 40])
@@ -0,0 +1,99 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Tests for the metrics store and regression gate.
+"""
+
+from e2e import service_marker
+from e2e.common import results
+from e2e.common.results import MetricsStore
+
+
+def store_runs(path, values_by_run, label="ci", name="calls.DescribeJobRun"):
+    store = MetricsStore(path)
+    for value in values_by_run:
+        run_id = store.start_run(label, "1.0.0", "abc")
+        store.add(run_id, "tests/test_x.py::test_x", [(name, value)])
+        store.finish_run(run_id)
+    return store
+
+
+@service_marker
+class Test_Results:
+    def test_flatten_metrics(self):
+        assert list(results.flatten_metrics("calls", {"Describe": 3, "List": {"page": 2}, "note": "x"})) == [
+            ("calls.Describe", 3.0), ("calls.List.page", 2.0),
+        ]
+        assert list(results.flatten_metrics("ok", True)) == []
+        assert list(results.flatten_metrics("p99", None)) == []
+
+    def test_stable_run_does_not_regress(self, tmp_path):
+        store = store_runs(tmp_path / "m.sqlite", [100, 104, 98, 101, 103])
+        run, comparisons = results.compare(store)
+        assert run["id"] == 5
+        assert [(c.regressed, c.improved, c.samples) for c in comparisons] == [(False, False, 4)]
+
+    def test_regression_and_improvement(self, tmp_path):
+        store = store_runs(tmp_path / "m.sqlite", [100, 104, 98, 101, 150])
+        (comparison,) = results.compare(store)[1]
+        assert comparison.regressed
+        assert comparison.baseline_median == 100.5
+
+        store = store_runs(tmp_path / "rate.sqlite", [50, 52, 49, 51, 30], name="jobruns_per_second")
+        (comparison,) = results.compare(store)[1]
+        assert comparison.regressed
+
+        store = store_runs(tmp_path / "better.sqlite", [50, 52, 49, 51, 80], name="jobruns_per_second")
+        (comparison,) = results.compare(store)[1]
+        assert comparison.improved and not comparison.regressed
+
+    def test_call_rates_are_better_when_lower(self, tmp_path):
+        for name in ("calls_per_second", "1x.steady_calls_per_second", "shards2.shard0.calls_per_second"):
+            store = store_runs(tmp_path / f"{name}.sqlite", [50, 52, 49, 51, 100], name=name)
+            (comparison,) = results.compare(store)[1]
+            assert comparison.regressed and not comparison.improved, name
+
+            store = store_runs(tmp_path / f"{name}.drop.sqlite", [50, 52, 49, 51, 20], name=name)
+            (comparison,) = results.compare(store)[1]
+            assert comparison.improved and not comparison.regressed, name
+
+        for name in ("shards2.jobrun_throughput", "lifecycles_per_second", "100.read_call_reduction", "speedup"):
+            assert results.HIGHER_IS_BETTER.search(name), name
+
+    def test_noisy_baseline_widens_the_threshold(self, tmp_path):
+        store = store_runs(tmp_path / "m.sqlite", [100, 140, 70, 120, 85, 130])
+        (comparison,) = results.compare(store)[1]
+        assert not comparison.regressed
+
+    def test_short_durations_are_not_flagged(self, tmp_path):
+        store = store_runs(tmp_path / "m.sqlite", [0.01, 0.011, 0.01, 0.05], name="duration_seconds")
+        (comparison,) = results.compare(store)[1]
+        assert not comparison.regressed
+
+    def test_baseline_window_and_label(self, tmp_path):
+        path = tmp_path / "m.sqlite"
+        store_runs(path, [500, 500, 500], label="other").close()
+        store = store_runs(path, [100, 100, 100, 100, 100, 100, 200, 200, 200, 200])
+        _, comparisons = results.compare(store, window=3)
+        assert comparisons[0].baseline_median == 200
+        assert not comparisons[0].regressed
+        assert results.compare(store, min_samples=20)[1] == []
+
+    def test_cli_exit_codes(self, tmp_path, capsys):
+        path = tmp_path / "m.sqlite"
+        store_runs(path, [100, 101, 99, 100]).close()
+        assert results.main(["compare", "--db", str(path)]) == 0
+        store_runs(path, [300]).close()
+        assert results.main(["compare", "--db", str(path)]) == 1
+        assert "REGRESSED" in capsys.readouterr().out
+        assert results.main(["compare", "--db", str(tmp_path / "empty.sqlite")]) == 2
@@ -0,0 +1,119 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Throughput scaling of sharded controller deployments.
+
+Runs a reduced `e2e.benchmarks.sharding` sweep, spreading JobRuns across
+namespaces and splitting them between K controller shards, and records the
+aggregate throughput, its speedup over a single shard, and each shard's
+emr-containers API call rate. The full sweep, from 1 to 8 shards, is meant to
+be run from the command line.
+
+Requires a controller binary (see `e2e.common.controller`) and a Kubernetes API
+server with the CRDs installed.
+"""
+
+import logging
+import os
+import urllib.request
+import pytest
+
+from e2e import service_marker
+from e2e.benchmarks.sharding import (
+    run_sweep, speedups, render_table, ShardingResult, ShardResult,
+)
+from e2e.common.controller import controller_binary
+from e2e.common.sharding import (
+    SHARD_LABEL, NAMESPACE_MODE, bucket_of, label_bucket, shard_namespaces, shard_buckets, shard_selector,
+)
+from e2e.standin.emrcontainers import EMRContainersStandIn
+
+# Shard counts to run, comma separated
+SHARDS = [int(n) for n in os.environ.get("EMR_SHARDING_SHARDS", "1,2,4").split(",")]
+MODE = os.environ.get("EMR_SHARDING_MODE", NAMESPACE_MODE)
+JOBRUNS = int(os.environ.get("EMR_SHARDING_JOBRUNS", "200"))
+
+# Lowest acceptable speedup of the largest shard count over a single shard
+MIN_SPEEDUP = 1.5
+
+
+def _result(shards: int, throughput: float) -> ShardingResult:
+    return ShardingResult(
+        shards=shards, mode=NAMESPACE_MODE, count=10, synced=10, elapsed_seconds=10,
+        throughput=throughput, time_to_sync_p99_seconds=1.0, calls_per_second=5, throttle_fraction=0,
+        per_shard=[ShardResult(shard, 10 // shards, 10 // shards, 5, 0.5) for shard in range(shards)],
+    )
+
+
+@service_marker
+class Test_ShardingScale:
+    def test_namespace_assignment_partitions_namespaces(self):
+        namespaces = [f"ns-{i}" for i in range(10)]
+        for shards in range(1, 9):
+            assigned = [shard_namespaces(namespaces, shards, shard) for shard in range(shards)]
+            assert sorted(sum(assigned, [])) == sorted(namespaces)
+            assert max(map(len, assigned)) - min(map(len, assigned)) <= 1
+
+        with pytest.raises(ValueError):
+            shard_namespaces(namespaces[:2], 3, 0)
+
+    def test_label_assignment(self):
+        manifest = {"metadata": {"name": "jobrun-1", "namespace": "team-a", "labels": {}}}
+        bucket = label_bucket(manifest, 16)
+
+        assert bucket == bucket_of("team-a", "jobrun-1", 16)
+        assert manifest["metadata"]["labels"][SHARD_LABEL] == str(bucket)
+        assert [shard_buckets(3, shard, 8) for shard in range(3)] == [[0, 3, 6], [1, 4, 7], [2, 5]]
+        assert shard_selector(4, 1, 8) == f"{SHARD_LABEL} in (1,5)"
+        assert shard_selector(4, 1, 8, "team=a") == f"team=a,{SHARD_LABEL} in (1,5)"
+
+    def test_standin_counts_calls_by_access_key(self):
+        with EMRContainersStandIn() as standin:
+            request = urllib.request.Request(
+                f"{standin.endpoint_url}/virtualclusters",
+                headers={"Authorization": (
+                    "AWS4-HMAC-SHA256 Credential=shard-1/20260101/us-west-2/emr-containers/aws4_request, "
+                    "SignedHeaders=host, Signature=0"
+                )},
+            )
+            urllib.request.urlopen(request).read()
+
+            assert standin.counters()["calls_by_caller"] == {"shard-1": 1}
+
+    def test_speedups(self):
+        assert speedups([_result(1, 2.0), _result(2, 3.8), _result(4, 6.0)]) == {1: 1.0, 2: 1.9, 4: 3.0}
+        assert "| 4 | 6.00 | 3.00 | 75% |" in render_table([_result(1, 2.0), _result(4, 6.0)])
+
+    @pytest.mark.slow
+    def test_sharding_sweep(self, record_property):
+        if controller_binary() is None:
+            pytest.skip("controller binary not configured")
+
+        results = run_sweep(SHARDS, MODE, JOBRUNS)
+        speedup = speedups(results)
+
+        for result in results:
+            prefix = f"shards{result.shards}"
+            record_property(f"{prefix}.jobrun_throughput", result.throughput)
+            record_property(f"{prefix}.jobrun_p99_seconds", result.time_to_sync_p99_seconds)
+            record_property(f"{prefix}.calls_per_second", result.calls_per_second)
+            record_property(f"{prefix}.speedup", speedup.get(result.shards))
+            for shard in result.per_shard:
+                record_property(f"{prefix}.shard{shard.shard}.calls_per_second", shard.calls_per_second)
+        logging.info("sharding sweep:\n%s", render_table(results))
+
+        assert all(result.all_synced for result in results)
+        for result in results:
+            assert all(shard.synced == shard.jobruns for shard in result.per_shard)
+        if len(results) > 1:
+            assert speedup[max(SHARDS)] >= MIN_SPEEDUP
@@ -0,0 +1,39 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Startup regression checks for the e2e harness itself.
+
+Runs `e2e.benchmarks.startup`, which times the harness imports and test
+collection in subprocesses against wall-clock thresholds, so it only runs with
+--runslow.
+"""
+
+import logging
+import pytest
+
+from e2e import service_marker
+from e2e.benchmarks.startup import run_benchmark
+
+
+@service_marker
+class Test_Startup:
+    @pytest.mark.slow
+    def test_import_and_collection_time(self, record_property):
+        report = run_benchmark()
+        for result in report.imports:
+            logging.info("import %s: %.3fs", result.module, result.total_seconds)
+            record_property(f"import.{result.module}_seconds", round(result.total_seconds, 3))
+        logging.info("collect: %.3fs", report.collect_seconds)
+        record_property("collect_seconds", round(report.collect_seconds, 3))
+
+        assert report.passed, "\n".join(report.failures)
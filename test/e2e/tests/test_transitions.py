@@ -0,0 +1,147 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Tests for the JobRun state transition recorder.
+"""
+
+import pytest
+
+from e2e import service_marker
+from e2e.common import transitions
+from e2e.common.transitions import TransitionRecorder
+
+CREATED_AT = "2024-01-01T00:00:00Z"
+T0 = 1704067200.0
+
+
+def jobrun(uid: str, vc: str, state=None) -> dict:
+    obj = {
+        "metadata": {"uid": uid, "name": uid, "namespace": "default", "creationTimestamp": CREATED_AT},
+        "spec": {"virtualClusterID": vc},
+    }
+    if state is not None:
+        obj["status"] = {"state": state}
+    return obj
+
+
+def feed(recorder: TransitionRecorder, uid: str, vc: str, states):
+    """Feeds watch events moving the JobRun through `states`, given as
+    (state, seconds after creation) pairs.
+    """
+    recorder.observe("ADDED", jobrun(uid, vc))
+    for state, offset in states:
+        recorder.observe("MODIFIED", jobrun(uid, vc, state), timestamp=T0 + offset)
+
+
+@service_marker
+class Test_Transitions:
+    def test_records_only_state_changes(self):
+        recorder = TransitionRecorder()
+        feed(recorder, "a", "vc1", [("PENDING", 2), ("PENDING", 3), ("RUNNING", 10), ("RUNNING", 20)])
+        recorder.observe("DELETED", jobrun("a", "vc1", "COMPLETED"), timestamp=T0 + 30)
+
+        assert len(recorder) == 3
+        assert [recorder.state_names[code] for code in recorder.states] == ["CREATED", "PENDING", "RUNNING"]
+        assert list(recorder.times) == [T0, T0 + 2, T0 + 10]
+
+    def test_run_times(self):
+        recorder = TransitionRecorder()
+        feed(recorder, "a", "vc1", [("PENDING", 2), ("SUBMITTED", 5), ("RUNNING", 10), ("COMPLETED", 70)])
+        feed(recorder, "b", "vc1", [("PENDING", 2)])
+
+        a, b = recorder.run_times()
+        assert (a.queue_seconds, a.emr_queue_seconds, a.run_seconds, a.state) == (10, 8, 60, "COMPLETED")
+        assert (b.queue_seconds, b.emr_queue_seconds, b.run_seconds, b.state) == (None, None, None, "PENDING")
+
+    def test_report_per_virtual_cluster(self):
+        recorder = TransitionRecorder()
+        for i in range(100):
+            feed(recorder, f"a{i}", "vc-a", [("PENDING", 1), ("RUNNING", 1 + i), ("COMPLETED", 101 + i)])
+        feed(recorder, "b0", "vc-b", [("PENDING", 1), ("RUNNING", 5), ("FAILED", 6)])
+
+        vc_a, vc_b = recorder.report()
+        assert vc_a.virtual_cluster == "vc-a"
+        assert vc_a.runs == 100
+        assert vc_a.states == {"COMPLETED": 100}
+        assert vc_a.queue_seconds == {"p50": 50, "p90": 90, "p99": 99}
+        assert vc_a.run_seconds == {"p50": 100, "p90": 100, "p99": 100}
+        assert vc_b.states == {"FAILED": 1}
+        assert vc_b.emr_queue_seconds == {"p50": 4, "p90": 4, "p99": 4}
+        assert "| vc-b | 1 | FAILED 1 |" in transitions.render_report([vc_a, vc_b])
+
+    def test_report_percentiles_use_the_nearest_rank(self):
+        recorder = TransitionRecorder()
+        # Queue times of 1..10 seconds and run times of 10..60 seconds
+        for i in range(10):
+            feed(recorder, f"a{i}", "vc1", [("RUNNING", 1 + i), ("COMPLETED", 1 + i + 10 * (1 + i % 6))])
+
+        [report] = recorder.report(percentiles=(50, 90, 99))
+        assert report.queue_seconds == {"p50": 5, "p90": 9, "p99": 10}
+        # Run times sorted: 10, 10, 20, 20, 30, 30, 40, 40, 50, 60
+        assert report.run_seconds == {"p50": 30, "p90": 50, "p99": 60}
+
+    def test_initial_listing_states_are_untimed(self):
+        recorder = TransitionRecorder()
+        # Already running when the recording starts, hours after creation
+        recorder.observe_all([jobrun("a", "vc1", "RUNNING"), jobrun("b", "vc1", "PENDING")])
+        recorder.observe("MODIFIED", jobrun("a", "vc1", "COMPLETED"), timestamp=T0 + 7200)
+        recorder.observe("MODIFIED", jobrun("b", "vc1", "RUNNING"), timestamp=T0 + 7200)
+
+        a, b = recorder.run_times()
+        assert (a.queue_seconds, a.emr_queue_seconds, a.run_seconds, a.state) == (None, None, None, "COMPLETED")
+        # RUNNING was seen happen, so the queue time since creation is known
+        assert (b.queue_seconds, b.emr_queue_seconds, b.run_seconds) == (7200, None, None)
+
+    def test_virtual_cluster_ref_resolves_to_id(self):
+        ids = {}
+        recorder = TransitionRecorder(resolve_virtual_cluster=lambda namespace, name: ids.get((namespace, name)))
+        ref = jobrun("a", "vc1")
+        ref["spec"] = {"virtualClusterRef": {"from": {"name": "my-vc"}}}
+        recorder.observe("ADDED", ref)
+        ids[("default", "my-vc")] = "vc1"
+        feed(recorder, "b", "vc1", [("RUNNING", 1)])
+        recorder.observe("MODIFIED", dict(ref, status={"state": "RUNNING"}), timestamp=T0 + 1)
+
+        [report] = recorder.report()
+        assert (report.virtual_cluster, report.runs) == ("vc1", 2)
+
+    def test_save_and_load(self, tmp_path):
+        recorder = TransitionRecorder()
+        feed(recorder, "a", "vc1", [("PENDING", 2), ("RUNNING", 10), ("COMPLETED", 70)])
+        feed(recorder, "b", "vc2", [("PENDING", 2), ("SOME_NEW_STATE", 3)])
+        path = tmp_path / "runs.jrt"
+        recorder.save(path)
+
+        loaded = TransitionRecorder.load(path)
+        assert list(loaded.runs) == list(recorder.runs)
+        assert list(loaded.times) == list(recorder.times)
+        assert loaded.report() == recorder.report()
+        # Recording continues where the file left off
+        loaded.observe("MODIFIED", jobrun("b", "vc2", "SOME_NEW_STATE"), timestamp=T0 + 4)
+        loaded.observe("MODIFIED", jobrun("b", "vc2", "RUNNING"), timestamp=T0 + 5)
+        assert len(loaded) == len(recorder) + 1
+        assert loaded.run_times()[1].emr_queue_seconds == 3
+
+    def test_load_rejects_other_files(self, tmp_path):
+        path = tmp_path / "other"
+        path.write_bytes(b"not a recording")
+        with pytest.raises(ValueError):
+            TransitionRecorder.load(path)
+
+    def test_report_cli(self, tmp_path, capsys):
+        recorder = TransitionRecorder()
+        feed(recorder, "a", "vc1", [("PENDING", 2), ("RUNNING", 10), ("COMPLETED", 70)])
+        recorder.save(tmp_path / "runs.jrt")
+
+        assert transitions.main(["report", str(tmp_path / "runs.jrt"), "--percentiles", "50"]) == 0
+        assert "| vc1 | 1 | COMPLETED 1 | 10.0s | 8.0s | 60.0s |" in capsys.readouterr().out
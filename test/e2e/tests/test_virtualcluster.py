@@ -14,22 +14,22 @@
 """Integration tests for the EMR on EKS VirtualCluster resource
 """
 
-import boto3
 import json
 import logging
 import time
 from typing import Dict
 import pytest
 
-from acktest.k8s import resource as k8s
-from acktest.resources import random_suffix_name
-from acktest.aws.identity import get_account_id
-from acktest import tags
-from acktest.k8s import condition, resource
+from e2e.common.lazy import lazy_import
 from e2e import service_marker, CRD_GROUP, CRD_VERSION, load_resource
 from e2e.replacement_values import REPLACEMENT_VALUES
 from e2e.bootstrap_resources import get_bootstrap_resources
 
+boto3 = lazy_import("boto3")
+k8s = lazy_import("acktest.k8s.resource")
+condition = lazy_import("acktest.k8s.condition")
+tags = lazy_import("acktest.tags")
+
 VC_RESOURCE_PLURAL = "virtualclusters"
 UPDATE_WAIT_SECONDS = 5
 
@@ -38,7 +38,9 @@ def iam_client():
     return boto3.client("iam")
 
 @pytest.fixture
-def virtualcluster():
+def virtualcluster(aws_endpoints):
+    from acktest.resources import random_suffix_name
+
     virtual_cluster_name = random_suffix_name("emr-virtual-cluster", 32)
 
     replacements = REPLACEMENT_VALUES.copy()
@@ -76,8 +78,6 @@ def virtualcluster():
 @pytest.mark.canary
 class Test_VirtualCluster:
     def test_create_delete_virtualcluster(self, virtualcluster, emrcontainers_client, iam_client):
-        oidc_provider_arn = get_bootstrap_resources().HostCluster_VC.export_oidc_arn
-
         (vc_ref, vc_cr) = virtualcluster
         assert vc_cr
 
@@ -127,12 +127,8 @@ class Test_VirtualCluster:
         tags.assert_ack_system_tags(aws_res["virtualCluster"]["tags"])
         tags.assert_equal_without_ack_tags(expected=updated_tags, actual=aws_res["virtualCluster"]["tags"])
 
-        # delete oidc provider
-        try:
-            aws_res = iam_client.delete_open_id_connect_provider(OpenIDConnectProviderArn=oidc_provider_arn)
-            assert aws_res is not None
-        except iam_client.exceptions.InvalidInputException:
-            pytest.fail(f"Could not delete oidc identity provider")
+        # The OIDC provider is shared with the other tests and is deleted by
+        # the bootstrap cleanup once nothing references it.
 
         # check if VirtualCluster is deleted
         try:
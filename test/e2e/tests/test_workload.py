@@ -0,0 +1,30 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Tests for the workload helpers that do not need a cluster.
+"""
+
+from e2e import service_marker
+from e2e.common.workload import percentile
+
+
+@service_marker
+class Test_Workload:
+    def test_percentile_nearest_rank(self):
+        assert percentile(list(range(1, 101)), 99) == 99
+        assert percentile(list(range(1, 101)), 7) == 7
+        assert percentile([1, 2, 3, 4, 5, 6], 50) == 3
+        assert percentile(list(range(1, 11)), 90) == 9
+        assert percentile([5, 1, 3], 0) == 1
+        assert percentile([5, 1, 3], 100) == 5
+        assert percentile([], 50) is None